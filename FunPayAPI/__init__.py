@@ -1,5 +1,7 @@
 from .account import Account
+from .async_account import AsyncAccount
 from .updater.runner import Runner
+from .updater.async_runner import AsyncRunner
 from .updater import events
-from .common import exceptions, utils, enums
+from .common import exceptions, utils, enums, limiter, cache, pool, metrics
 from . import types
@@ -1,10 +1,11 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING, Literal, Any, Optional, IO
+from typing import TYPE_CHECKING, Literal, Any, Optional, IO, Generator, Callable
 if TYPE_CHECKING:
     from .updater.runner import Runner
 
 from requests_toolbelt import MultipartEncoder
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from bs4 import BeautifulSoup, Tag
 from datetime import datetime, timedelta
 import requests
 import logging
@@ -14,12 +15,14 @@ import json
 import time
 import re
 
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 from typing import Any, Literal
 
 from . import types
 from .common import exceptions, utils, enums
+from .common.limiter import RateLimiter
+from .common.cache import ResponseCache
+from .common.pool import AccountingHTTPAdapter
+from .common.metrics import RequestMetrics, TimedRetry
 
 
 logger = logging.getLogger("FunPayAPI.account")
@@ -41,9 +44,32 @@ class Account:
 
     :param proxy: прокси для запросов.
     :type proxy: :obj:`dict` {:obj:`str`: :obj:`str` or :obj:`None`
+
+    :param html_parser: бэкенд BeautifulSoup для парсинга HTML ("html.parser", "lxml", "html5lib").
+        Если необходимый модуль не установлен, используется "html.parser".
+    :type html_parser: :obj:`str`, опционально
+
+    :param html_retention: режим хранения HTML кода в объектах :mod:`FunPayAPI.types` и в :py:obj:`.Account.html`.\n
+        * `full` - хранить как есть.\n
+        * `compressed` - хранить в сжатом виде (распаковывается при обращении к атрибуту `html`).\n
+        * `none` - не хранить (атрибут `html` равен `None`, HTML виджетов не сериализуется).
+    :type html_retention: :obj:`str` `full`, `compressed` or `none`, опционально
+
+    :param pool_size: макс. кол-во соединений с FunPay, которые хранятся для повторного использования.
+        Должно быть не меньше кол-ва потоков, одновременно отправляющих запросы.
+    :type pool_size: :obj:`int`, опционально
+
+    :param pool_block: ждать ли свободное соединение, если все соединения заняты (иначе открывается временное
+        соединение).
+    :type pool_block: :obj:`bool`, опционально
     """
+    html = types.HTMLAttribute()
+
     def __init__(self, golden_key: str, user_agent: str | None = None,
-                 requests_timeout: int | float = 10, proxy: Optional[dict] = None):
+                 requests_timeout: int | float = 10, proxy: Optional[dict] = None,
+                 html_parser: str = "html.parser",
+                 html_retention: Literal["full", "compressed", "none"] = "full",
+                 pool_size: int = 10, pool_block: bool = False):
         self.golden_key: str = golden_key
         """Токен (golden_key) аккаунта."""
         self.user_agent: str | None = user_agent
@@ -51,6 +77,10 @@ class Account:
         self.requests_timeout: int | float = requests_timeout
         """Тайм-аут ожидания ответа на запросы."""
         self.proxy = proxy
+        self.html_parser: str = utils.resolve_html_parser(html_parser)
+        """Бэкенд BeautifulSoup, используемый для парсинга HTML."""
+        self.html_retention: Literal["full", "compressed", "none"] = html_retention
+        """Режим хранения HTML кода в объектах FunPayAPI.types."""
 
         self.html: str | None = None
         """HTML основной страницы FunPay."""
@@ -77,6 +107,11 @@ class Account:
         self.__initiated: bool = False
 
         self.__saved_chats: dict[int, types.ChatShortcut] = {}
+        self.__saved_chats_by_name: dict[str, types.ChatShortcut] = {}
+        self.__missed_chat_names: dict[str, float] = {}
+        self.missed_chats_ttl: int | float = 60
+        """Время (в секундах), в течение которого get_chat_by_name не запрашивает список чатов повторно для названия,
+        которое не было найдено."""
         self.runner: Runner | None = None
         """Объект Runner'а."""
 
@@ -93,23 +128,42 @@ class Account:
         """Если сообщение начинается с этого символа, значит оно отправлено ботом."""
 
         self.session = requests.Session()
-        retry_strategy = Retry(
+        retry_strategy = TimedRetry(
             total=6,              # Количество попыток
             connect=6,            # Попытки при ошибке соединения (ConnectionError)
             read=6,               # Попытки при ошибке чтения (ReadError)
             redirect=6,           # Попытки при редиректе (HTTP 301, 302 и т. д.)
             status=6,             
             backoff_factor=1,  # Время ожидания: 0.5, 1, 2, 4, 8 сек
-            status_forcelist=[429, 443, 500, 502, 503, 504],  # Ошибки, при которых повторяем
+            status_forcelist=[443, 500, 502, 503, 504],  # Ошибки, при которых повторяем (429 - см. self.limiter)
             allowed_methods={"GET", "POST"}  # Методы, для которых делаем повтор
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("https://", adapter)
+        self.adapter: AccountingHTTPAdapter = AccountingHTTPAdapter(pool_size, pool_block,
+                                                                    max_retries=retry_strategy)
+        """HTTP адаптер сессии: пул соединений с FunPay и его счетчики
+        (см. :meth:`FunPayAPI.common.pool.AccountingHTTPAdapter.get_stats`)."""
+        self.session.mount("https://", self.adapter)
+        self.metrics: RequestMetrics = RequestMetrics()
+        """Метрики запросов к FunPay по логическим методам API (время ответа, размер, статус-коды, повторы)."""
+        self.limiter: RateLimiter = RateLimiter()
+        """Ограничитель частоты запросов, общий для всех потоков, использующих аккаунт."""
+        self.single_flight: utils.SingleFlight = utils.SingleFlight()
+        """Объединитель одновременных одинаковых запросов (:meth:`request_chats` и методов, результаты которых можно
+        кэшировать, см. :py:obj:`.Account.cache`)."""
+        self.single_flight_ttl: int | float = 0
+        """Время (в секундах), в течение которого результат этих запросов выдается повторно без нового запроса.
+        0 - объединяются только одновременные запросы."""
+        self.cache: ResponseCache = ResponseCache(shared=lambda: (*self.__categories, *self.__subcategories))
+        """Кэш результатов методов, читающих редко изменяющиеся данные (выключен по умолчанию, см.
+        :meth:`FunPayAPI.common.cache.ResponseCache.enable`)."""
 
     def method(self, request_method: Literal["post", "get"], api_method: str, headers: dict, payload: Any,
                exclude_phpsessid: bool = False, raise_not_200: bool = False) -> requests.Response:
         """
         Отправляет запрос к FunPay. Добавляет в заголовки запроса user_agent и куки.
+        Частота запросов ограничивается :py:obj:`.Account.limiter`, на ответ 429 запрос повторяется
+        (не более :py:obj:`FunPayAPI.common.limiter.RateLimiter.MAX_THROTTLED_RETRIES` раз).
+        Каждый запрос учитывается в :py:obj:`.Account.metrics`.
 
         :param request_method: метод запроса ("get" / "post").
         :type request_method: :obj:`str` `post` or `get`
@@ -137,27 +191,97 @@ class Account:
         if self.user_agent:
             headers["user-agent"] = self.user_agent
         link = api_method if api_method.startswith("https://funpay.com") else "https://funpay.com/" + api_method
-        
+
+        throttled = 0
         while True:
-            response = self.session.request(
-                method=request_method,
-                url=link,
-                headers=headers,
-                data=payload,
-                timeout=self.requests_timeout,
-                proxies=self.proxy or {}
-            )
-            if response.status_code == 429:
-                time.sleep(0.4)
-                continue
-            break
-            
+            endpoint = self.limiter.acquire(link)
+            started = self.metrics.start()
+            try:
+                response = self.session.request(
+                    method=request_method,
+                    url=link,
+                    headers=headers,
+                    data=payload,
+                    timeout=self.requests_timeout,
+                    proxies=self.proxy or {}
+                )
+            except:
+                self.metrics.record(link, started)
+                raise
+            self.metrics.record(link, started, response)
+            if response.status_code != 429:
+                self.limiter.on_success(endpoint)
+                break
+            self.limiter.on_throttled(endpoint, self.limiter.get_retry_after(response.headers.get("Retry-After")))
+            throttled += 1
+            if throttled > self.limiter.MAX_THROTTLED_RETRIES:
+                break
+
         if response.status_code == 403:
             raise exceptions.UnauthorizedError(response)
         elif response.status_code != 200 and raise_not_200:
             raise exceptions.RequestFailedError(response)
         return response
 
+    def get_metrics(self) -> dict[str, Any]:
+        """
+        Возвращает метрики запросов к FunPay вместе со счетчиками ограничителя частоты, пула соединений, кэша и
+        объединителя запросов.
+
+        :return: {"since": время начала сбора метрик, "methods": метрики по логическим методам API
+            (см. :meth:`FunPayAPI.common.metrics.RequestMetrics.get_stats`), "throttled": {класс запросов: кол-во
+            ответов 429}, "pool": счетчики пула соединений, "cache": счетчики кэша, "coalesced": кол-во объединенных
+            запросов}.
+        :rtype: :obj:`dict`
+        """
+        return {"since": int(self.metrics.started), "methods": self.metrics.get_stats(),
+                "throttled": {i.name: i.throttled for i in self.limiter.endpoint_classes},
+                "pool": self.adapter.get_stats(), "cache": self.cache.get_stats(),
+                "coalesced": self.single_flight.coalesced}
+
+    def warm_up(self, connections: int = 2) -> int:
+        """
+        Заранее открывает соединения с FunPay (через прокси, если он указан), чтобы первые запросы разных потоков
+        не тратили время на установку соединения.
+
+        :param connections: кол-во соединений (не больше размера пула).
+        :type connections: :obj:`int`, опционально
+
+        :return: кол-во открытых соединений.
+        :rtype: :obj:`int`
+        """
+        settings = self.session.merge_environment_settings("https://funpay.com", self.proxy or {}, None, None, None)
+        return self.adapter.warm_up("https://funpay.com", connections, settings["proxies"], self.requests_timeout,
+                                    settings["verify"])
+
+    def parse_html(self, html: str | bytes) -> BeautifulSoup:
+        """
+        Создает дерево BeautifulSoup с помощью выбранного бэкенда (:py:obj:`.Account.html_parser`).
+
+        :param html: HTML-код.
+        :type html: :obj:`str` or :obj:`bytes`
+
+        :return: дерево BeautifulSoup.
+        :rtype: :class:`bs4.BeautifulSoup`
+        """
+        return BeautifulSoup(html, self.html_parser)
+
+    def retain_html(self, html: str | Tag | None) -> str | types.CompressedHTML | None:
+        """
+        Подготавливает HTML код для хранения в объекте согласно :py:obj:`.Account.html_retention`.
+        Тег сериализуется в строку, только если HTML нужно сохранить.
+
+        :param html: HTML код / тег BeautifulSoup.
+        :type html: :obj:`str`, :class:`bs4.Tag` or :obj:`None`
+
+        :return: HTML код, сжатый HTML код или `None`.
+        :rtype: :obj:`str`, :class:`FunPayAPI.types.CompressedHTML` or :obj:`None`
+        """
+        if html is None or self.html_retention == "none":
+            return None
+        html = html if isinstance(html, str) else str(html)
+        return types.CompressedHTML(html) if self.html_retention == "compressed" else html
+
     def get(self, update_phpsessid: bool = False) -> Account:
         """
         Получает / обновляет данные об аккаунте. Необходимо вызывать каждые 40-60 минут, дабы обновить
@@ -170,14 +294,24 @@ class Account:
         :rtype: :class:`FunPayAPI.account.Account`
         """
         response = self.method("get", "https://funpay.com", {}, {}, update_phpsessid, raise_not_200=True)
+        return self._parse_main_page(response, update_phpsessid)
+
+    def _parse_main_page(self, response: requests.Response, update_phpsessid: bool = False) -> Account:
+        """
+        Парсит главную страницу FunPay и обновляет данные аккаунта (для :meth:`FunPayAPI.account.Account.get`).
 
+        :param response: ответ FunPay.
+        :param update_phpsessid: обновить ли :py:obj:`.Account.phpsessid`.
+
+        :return: объект аккаунта с обновленными данными.
+        """
         html_response = response.content.decode()
-        parser = BeautifulSoup(html_response, "html.parser")
+        parser = self.parse_html(html_response)
 
         username = parser.find("div", {"class": "user-link-name"})
         if not username:
             raise exceptions.UnauthorizedError(response)
-        
+
         available_currencies = ["rub", "usd", "eur"]
         dropdown_currencies = parser.find_all("a", {"class": f"user-cy-switcher menu-item-currency"})
         for dropdown_currency in dropdown_currencies:
@@ -203,7 +337,7 @@ class Account:
             self.__setup_categories(html_response)
 
         self.last_update = int(time.time())
-        self.html = html_response
+        self.html = self.retain_html(html_response)
         self.__initiated = True
         return self
 
@@ -223,10 +357,15 @@ class Account:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
 
+        return self.__cached("get_subcategory_public_lots", (subcategory_type, subcategory_id),
+                             lambda: self.__get_subcategory_public_lots(subcategory_type, subcategory_id))
+
+    def __get_subcategory_public_lots(self, subcategory_type: enums.SubCategoryTypes,
+                                      subcategory_id: int) -> list[types.LotShortcut]:
         meth = f"lots/{subcategory_id}/" if subcategory_type is enums.SubCategoryTypes.COMMON else f"chips/{subcategory_id}/"
         response = self.method("get", meth, {"accept": "*/*"}, {}, raise_not_200=True)
         html_response = response.content.decode()
-        parser = BeautifulSoup(html_response, "html.parser")
+        parser = self.parse_html(html_response)
 
         username = parser.find("div", {"class": "user-link-name"})
         if not username:
@@ -257,7 +396,7 @@ class Account:
             raise exceptions.AccountNotInitiatedError()
         response = self.method("get", f"lots/offer?id={lot_id}", {"accept": "*/*"}, {}, raise_not_200=True)
         html_response = response.content.decode()
-        parser = BeautifulSoup(html_response, "html.parser")
+        parser = self.parse_html(html_response)
 
         username = parser.find("div", {"class": "user-link-name"})
         if not username:
@@ -328,6 +467,18 @@ class Account:
         :return: словарь с историями чатов в формате {ID чата: [список сообщений]}
         :rtype: :obj:`dict` {:obj:`int`: :obj:`list` of :class:`FunPayAPI.types.Message`}
         """
+        headers, payload = self._chats_histories_request(chats_data)
+        response = self.method("post", "runner/", headers, payload, raise_not_200=True)
+        return self._parse_chats_histories(response.json(), chats_data)
+
+    def _chats_histories_request(self, chats_data: dict[int | str, str | None]) -> tuple[dict, dict]:
+        """
+        Формирует заголовки и полезную нагрузку запроса для :meth:`FunPayAPI.account.Account.get_chats_histories`.
+
+        :param chats_data: ID чатов и никнеймы собеседников.
+
+        :return: (заголовки, полезная нагрузка).
+        """
         headers = {
             "accept": "*/*",
             "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
@@ -340,9 +491,18 @@ class Account:
             "request": False,
             "csrf_token": self.csrf_token
         }
-        response = self.method("post", "runner/", headers, payload, raise_not_200=True)
-        json_response = response.json()
+        return headers, payload
 
+    def _parse_chats_histories(self, json_response: dict,
+                               chats_data: dict[int | str, str | None]) -> dict[int, list[types.Message]]:
+        """
+        Парсит ответ FunPay на запрос историй чатов (для :meth:`FunPayAPI.account.Account.get_chats_histories`).
+
+        :param json_response: ответ FunPay.
+        :param chats_data: ID чатов и никнеймы собеседников.
+
+        :return: словарь с историями чатов в формате {ID чата: [список сообщений]}
+        """
         result = {}
         for i in json_response["objects"]:
             if not i.get("data"):
@@ -439,6 +599,21 @@ class Account:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
 
+        headers, payload = self._send_message_request(chat_id, text, image_id)
+        response = self.method("post", "runner/", headers, payload, raise_not_200=True)
+        return self._parse_sent_message(response, chat_id, chat_name, add_to_ignore_list, update_last_saved_message)
+
+    def _send_message_request(self, chat_id: int | str, text: Optional[str] = None,
+                              image_id: Optional[int] = None) -> tuple[dict, dict]:
+        """
+        Формирует заголовки и полезную нагрузку запроса для :meth:`FunPayAPI.account.Account.send_message`.
+
+        :param chat_id: ID чата.
+        :param text: текст сообщения.
+        :param image_id: ID изображения.
+
+        :return: (заголовки, полезная нагрузка).
+        """
         headers = {
             "accept": "*/*",
             "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
@@ -468,8 +643,22 @@ class Account:
             "request": json.dumps(request),
             "csrf_token": self.csrf_token
         }
+        return headers, payload
 
-        response = self.method("post", "runner/", headers, payload, raise_not_200=True)
+    def _parse_sent_message(self, response: requests.Response, chat_id: int | str, chat_name: Optional[str] = None,
+                            add_to_ignore_list: bool = True,
+                            update_last_saved_message: bool = False) -> types.Message:
+        """
+        Парсит ответ FunPay на отправку сообщения (для :meth:`FunPayAPI.account.Account.send_message`).
+
+        :param response: ответ FunPay.
+        :param chat_id: ID чата.
+        :param chat_name: название чата.
+        :param add_to_ignore_list: добавлять ли ID отправленного сообщения в игнорируемый список Runner'а?
+        :param update_last_saved_message: обновлять ли последнее сохраненное сообщение на отправленное в Runner'е?
+
+        :return: экземпляр отправленного сообщения.
+        """
         json_response = response.json()
         if not (resp := json_response.get("response")):
             raise exceptions.MessageNotDeliveredError(response, None, chat_id)
@@ -478,7 +667,7 @@ class Account:
             raise exceptions.MessageNotDeliveredError(response, error_text, chat_id)
 
         mes = json_response["objects"][0]["data"]["messages"][-1]
-        parser = BeautifulSoup(mes["html"], "html.parser")
+        parser = self.parse_html(mes["html"])
         try:
             if image_link := parser.find("a", {"class": "chat-img-link"}):
                 image_link = image_link.get("href")
@@ -493,7 +682,7 @@ class Account:
             raise e
 
         message_obj = types.Message(int(mes["id"]), message_text, chat_id, chat_name, self.username, self.id,
-                                    mes["html"], image_link)
+                                    self.retain_html(mes["html"]), image_link)
         if self.runner and isinstance(chat_id, int):
             if add_to_ignore_list:
                 self.runner.mark_as_by_bot(chat_id, message_obj.id)
@@ -573,6 +762,7 @@ class Account:
         elif response.status_code != 200:
             raise exceptions.RequestFailedError(response)
 
+        self._invalidate("get_order", (order_id, ))
         return response.json().get("content")
 
     def delete_review(self, order_id: str) -> str:
@@ -607,6 +797,7 @@ class Account:
         elif response.status_code != 200:
             raise exceptions.RequestFailedError(response)
 
+        self._invalidate("get_order", (order_id, ))
         return response.json().get("content")
 
     def refund(self, order_id):
@@ -631,6 +822,7 @@ class Account:
         }
 
         response = self.method("post", "orders/refund", headers, payload, raise_not_200=True)
+        self._invalidate("get_order", (order_id, ))
 
         if response.json().get("error"):
             raise exceptions.RefundError(response, response.json().get("msg"), order_id)
@@ -684,6 +876,22 @@ class Account:
         """
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
+        category, headers, payload = self._raise_lots_request(category_id, subcategories, exclude)
+        response = self.method("post", "lots/raise", headers, payload, raise_not_200=True)
+        self._invalidate("get_subcategory_public_lots")
+        return self._parse_raise_lots(response, category)
+
+    def _raise_lots_request(self, category_id: int, subcategories: Optional[list[int | types.SubCategory]] = None,
+                            exclude: list[int] | None = None) -> tuple[types.Category, dict, dict]:
+        """
+        Формирует заголовки и полезную нагрузку запроса для :meth:`FunPayAPI.account.Account.raise_lots`.
+
+        :param category_id: ID категории (игры).
+        :param subcategories: список подкатегорий, которые необходимо поднять.
+        :param exclude: ID подкатегорий, которые не нужно поднимать.
+
+        :return: (объект категории, заголовки, полезная нагрузка).
+        """
         if not (category := self.get_category(category_id)):
             raise Exception("Not Found")  # todo
 
@@ -711,8 +919,17 @@ class Account:
             "node_id": subcats[0].id,
             "node_ids[]": [i.id for i in subcats]
         }
+        return category, headers, payload
 
-        response = self.method("post", "lots/raise", headers, payload, raise_not_200=True)
+    def _parse_raise_lots(self, response: requests.Response, category: types.Category) -> bool:
+        """
+        Парсит ответ FunPay на поднятие лотов (для :meth:`FunPayAPI.account.Account.raise_lots`).
+
+        :param response: ответ FunPay.
+        :param category: объект категории.
+
+        :return: `True`
+        """
         json_response = response.json()
         logger.debug(f"Ответ FunPay (поднятие категорий): {json_response}.")
         if not json_response.get("error"):
@@ -736,9 +953,22 @@ class Account:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
 
-        response = self.method("get", f"users/{user_id}/", {"accept": "*/*"}, {}, raise_not_200=True)
+        def get_user() -> types.UserProfile:
+            response = self.method("get", f"users/{user_id}/", {"accept": "*/*"}, {}, raise_not_200=True)
+            return self._parse_user(response, user_id)
+        return self.__cached("get_user", (int(user_id), ), get_user)
+
+    def _parse_user(self, response: requests.Response, user_id: int) -> types.UserProfile:
+        """
+        Парсит страницу пользователя (для :meth:`FunPayAPI.account.Account.get_user`).
+
+        :param response: ответ FunPay.
+        :param user_id: ID пользователя.
+
+        :return: объект профиля пользователя.
+        """
         html_response = response.content.decode()
-        parser = BeautifulSoup(html_response, "html.parser")
+        parser = self.parse_html(html_response)
 
         username = parser.find("div", {"class": "user-link-name"})
         if not username:
@@ -761,7 +991,7 @@ class Account:
             reviews_amount = int("".join(reviews.text.split(" ")[:-4])) if reviews else 0
         
         user_obj = types.UserProfile(user_id, username, avatar_link, "Онлайн" in user_status,
-                                     banned, rating, reviews_amount, html_response)
+                                     banned, rating, reviews_amount, self.retain_html(html_response))
 
         subcategories_divs = parser.find_all("div", {"class": "offer-list-title-container"})
 
@@ -799,7 +1029,7 @@ class Account:
 
         response = self.method("get", f"chat/?node={chat_id}", {"accept": "*/*"}, {}, raise_not_200=True)
         html_response = response.content.decode()
-        parser = BeautifulSoup(html_response, "html.parser")
+        parser = self.parse_html(html_response)
         if (name := parser.find("div", {"class": "chat-header"}).find("div", {"class": "media-user-name"}).find("a").text) == "Чат":
             raise Exception("chat not found")  # todo
 
@@ -810,7 +1040,7 @@ class Account:
             text, link = a.text, a["href"]
 
         history = self.get_chat_history(chat_id, interlocutor_username=name)
-        return types.Chat(chat_id, name, link, text, html_response, history)
+        return types.Chat(chat_id, name, link, text, self.retain_html(html_response), history)
 
     def get_order(self, order_id: str) -> types.Order:
         """
@@ -824,12 +1054,16 @@ class Account:
         """
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
+        return self.__cached("get_order", (order_id, ), lambda: self.__get_order(order_id),
+                             lambda order: order.status is not types.OrderStatuses.PAID)
+
+    def __get_order(self, order_id: str) -> types.Order:
         headers = {
             "accept": "*/*"
         }
         response = self.method("get", f"orders/{order_id}/", headers, {}, raise_not_200=True)
         html_response = response.content.decode()
-        parser = BeautifulSoup(html_response, "html.parser")
+        parser = self.parse_html(html_response)
         username = parser.find("div", {"class": "user-link-name"})
         if not username:
             raise exceptions.UnauthorizedError(response)
@@ -896,18 +1130,19 @@ class Account:
         if all([not text, not reply]):
             review = None
         else:
-            review = types.Review(stars, text, reply, False, str(reply_obj), order_id, buyer_username, buyer_id)
+            review = types.Review(stars, text, reply, False, self.retain_html(reply_obj), order_id, buyer_username, buyer_id)
             
         amount = 1
         if (amount_in_fields := fields.get("Количество")):
             amount = int(amount_in_fields.replace(" ", "")[:-3])
 
         order = types.Order(order_id, status, amount, subcategory, short_description, full_description, sum_,
-                            buyer_id, buyer_username, seller_id, seller_username, html_response, fields, review, delivered_products)
+                            buyer_id, buyer_username, seller_id, seller_username, self.retain_html(html_response), fields, review, delivered_products)
         return order
 
     def get_sells(self, start_from: str | None = None, include_paid: bool = True, include_closed: bool = True,
                   include_refunded: bool = True, exclude_ids: list[str] | None = None,
+                  known_orders: dict[str, types.OrderStatuses] | None = None,
                   id: Optional[int] = None, buyer: Optional[str] = None,
                   state: Optional[Literal["closed", "paid", "refunded"]] = None, game: Optional[int] = None,
                   section: Optional[str] = None, server: Optional[int] = None,
@@ -930,6 +1165,11 @@ class Account:
         :param exclude_ids: исключить заказы с ID из списка (ID заказа должен быть без '#'!).
         :type exclude_ids: :obj:`list` of :obj:`str`, опционально
 
+        :param known_orders: уже известные заказы и их статусы ({ID заказа: статус}). Заказы, ID и статус которых
+            совпадают с переданными, пропускаются без полного парсинга (в список попадают только новые заказы и
+            заказы с изменившимся статусом).
+        :type known_orders: :obj:`dict` {:obj:`str`: :class:`FunPayAPI.common.enums.OrderStatuses`}, опционально
+
         :param id: ID заказа.
         :type id: :obj:`int`, опционально
 
@@ -962,7 +1202,79 @@ class Account:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
 
-        exclude_ids = exclude_ids or []
+        request_method, link, filters = self._sells_request(start_from, id, buyer, state, game, section, server,
+                                                            side, **more_filters)
+        response = self.method(request_method, link, {}, filters, raise_not_200=True)
+        return self._parse_sells(response, include_paid, include_closed, include_refunded, exclude_ids,
+                                 known_orders)
+
+    def crawl_sells(self, start_from: str | None = None, prefetch: bool = True, page_delay: int | float = 0,
+                    attempts: int = 3, **kwargs) -> Generator[tuple[str | None, list[types.OrderShortcut]], None, None]:
+        """
+        Постранично обходит список заказов https://funpay.com/orders/trade (по ID след. заказа `continue`).
+
+        Пока обрабатывается текущая страница, следующая загружается в отдельном потоке. Страницы загружаются
+        через :meth:`get_sells` (а значит и через :meth:`method`), поэтому на них распространяются все ограничения
+        запросов аккаунта. Генератор можно закрыть досрочно (например, через `break`).
+
+        :param start_from: ID заказа, с которого начать обход (ID заказа должен быть без '#'!).
+        :type start_from: :obj:`str` or :obj:`None`, опционально
+
+        :param prefetch: загружать ли следующую страницу, пока обрабатывается текущая?
+        :type prefetch: :obj:`bool`, опционально
+
+        :param page_delay: минимальный интервал между запросами страниц (в секундах).
+        :type page_delay: :obj:`int` or :obj:`float`, опционально
+
+        :param attempts: кол-во попыток загрузки каждой страницы.
+        :type attempts: :obj:`int`, опционально
+
+        :param kwargs: остальные аргументы :meth:`get_sells` (фильтры и т.д.).
+
+        :return: генератор страниц (ID след. заказа (`None`, если страница последняя), список заказов страницы).
+        :rtype: :obj:`Generator` of :obj:`tuple` (:obj:`str` or :obj:`None`,
+            :obj:`list` of :class:`FunPayAPI.types.OrderShortcut`)
+        """
+        last_request = 0.0
+
+        def get_page(cursor: str | None) -> tuple[str | None, list[types.OrderShortcut]]:
+            nonlocal last_request
+            for attempt in range(attempts, 0, -1):
+                time.sleep(max(last_request + page_delay - time.time(), 0))
+                last_request = time.time()
+                try:
+                    return self.get_sells(start_from=cursor, **kwargs)
+                except exceptions.UnauthorizedError:
+                    raise
+                except:
+                    if attempt == 1:
+                        raise
+                    logger.debug(f"Не удалось получить страницу заказов (continue={cursor}). Пробую снова...")
+                    time.sleep(1)
+
+        executor = ThreadPoolExecutor(1, thread_name_prefix="FunPayAPI.crawl_sells") if prefetch else None
+        try:
+            page = get_page(start_from)
+            while True:
+                next_order_id = page[0]
+                future = executor.submit(get_page, next_order_id) if executor and next_order_id else None
+                yield page
+                if next_order_id is None:
+                    return
+                page = future.result() if future else get_page(next_order_id)
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def _sells_request(self, start_from: str | None = None, id: Optional[int] = None, buyer: Optional[str] = None,
+                       state: Optional[Literal["closed", "paid", "refunded"]] = None, game: Optional[int] = None,
+                       section: Optional[str] = None, server: Optional[int] = None,
+                       side: Optional[int] = None, **more_filters) -> tuple[Literal["post", "get"], str, dict]:
+        """
+        Формирует метод, ссылку и полезную нагрузку запроса для :meth:`FunPayAPI.account.Account.get_sells`.
+
+        :return: (метод запроса, ссылка, полезная нагрузка).
+        """
         filters = {"id": id, "buyer": buyer, "state": state, "game": game, "section": section, "server": server,
                    "side": side}
         filters = {name: filters[name] for name in filters if filters[name]}
@@ -975,11 +1287,28 @@ class Account:
 
         if start_from:
             filters["continue"] = start_from
+        return "post" if start_from else "get", link, filters
 
-        response = self.method("post" if start_from else "get", link, {}, filters, raise_not_200=True)
+    def _parse_sells(self, response: requests.Response, include_paid: bool = True, include_closed: bool = True,
+                     include_refunded: bool = True, exclude_ids: list[str] | None = None,
+                     known_orders: dict[str, types.OrderStatuses] | None = None) -> tuple[str | None,
+                                                                                          list[types.OrderShortcut]]:
+        """
+        Парсит страницу https://funpay.com/orders/trade (для :meth:`FunPayAPI.account.Account.get_sells`).
+
+        :param response: ответ FunPay.
+        :param include_paid: включить ли в список заказы, ожидающие выполнения?
+        :param include_closed: включить ли в список закрытые заказы?
+        :param include_refunded: включить ли в список заказы, за которые запрошен возврат средств?
+        :param exclude_ids: исключить заказы с ID из списка.
+        :param known_orders: уже известные заказы и их статусы (такие заказы пропускаются, если статус не изменился).
+
+        :return: (ID след. заказа (для start_from), список заказов)
+        """
+        exclude_ids = exclude_ids or []
         html_response = response.content.decode()
 
-        parser = BeautifulSoup(html_response, "html.parser")
+        parser = self.parse_html(html_response)
         check_user = parser.find("div", {"class": "content-account content-account-login"})
         if check_user:
             raise exceptions.UnauthorizedError(response)
@@ -1010,6 +1339,8 @@ class Account:
             order_id = div.find("div", {"class": "tc-order"}).text[1:]
             if order_id in exclude_ids:
                 continue
+            if known_orders is not None and known_orders.get(order_id) is order_status:
+                continue
 
             description = div.find("div", {"class": "order-desc"}).find("div").text
             *price, currency = div.find("div", {"class": "tc-price"}).text.split(" ")
@@ -1041,9 +1372,11 @@ class Account:
                 day, month, year = int(day), utils.MONTHS[month], int(year)
                 h, m = split[1].split(":")
                 order_date = datetime(year, month, day, int(h), int(m))
+            date_left_div = div.find("div", {"class": "tc-date-left"})
 
             order_obj = types.OrderShortcut(order_id, description, price, currency, buyer_username, buyer_id, order_status,
-                                            order_date, subcategory_name, str(div))
+                                            order_date, subcategory_name, self.retain_html(div),
+                                            date_left=date_left_div.text if date_left_div else None)
             sells.append(order_obj)
 
         return next_order_id, sells
@@ -1056,7 +1389,13 @@ class Account:
         :type chats: :obj:`list` of :class:`FunPayAPI.types.ChatShortcut`
         """
         for i in chats:
+            old_chat = self.__saved_chats.get(i.id)
+            if old_chat is not None and old_chat.name != i.name \
+                    and self.__saved_chats_by_name.get(old_chat.name) is old_chat:
+                del self.__saved_chats_by_name[old_chat.name]
             self.__saved_chats[i.id] = i
+            self.__saved_chats_by_name[i.name] = i
+            self.__missed_chat_names.pop(i.name, None)
 
     def request_chats(self) -> list[types.ChatShortcut]:
         """
@@ -1065,6 +1404,9 @@ class Account:
         :return: объекты чатов (не больше 50).
         :rtype: :obj:`list` of :class:`FunPayAPI.types.ChatShortcut`
         """
+        return list(self.single_flight.do(("request_chats", ), self.__request_chats, self.single_flight_ttl))
+
+    def __request_chats(self) -> list[types.ChatShortcut]:
         chats = {
             "type": "chat_bookmarks",
             "id": self.id,
@@ -1092,7 +1434,7 @@ class Account:
         if not msgs:
             return []
 
-        parser = BeautifulSoup(msgs, "html.parser")
+        parser = self.parse_html(msgs)
         chats = parser.find_all("a", {"class": "contact-item"})
         chats_objs = []
 
@@ -1101,7 +1443,7 @@ class Account:
             last_msg_text = msg.find("div", {"class": "contact-item-message"}).text
             unread = True if "unread" in msg.get("class") else False
             chat_with = msg.find("div", {"class": "media-user-name"}).text
-            chat_obj = types.ChatShortcut(chat_id, chat_with, last_msg_text, unread, str(msg))
+            chat_obj = types.ChatShortcut(chat_id, chat_with, last_msg_text, unread, self.retain_html(msg))
             chats_objs.append(chat_obj)
         return chats_objs
 
@@ -1125,6 +1467,8 @@ class Account:
     def get_chat_by_name(self, name: str, make_request: bool = False) -> types.ChatShortcut | None:
         """
         Возвращает чат по его названию (если он сохранен).
+        Если чат не был найден даже после обновления списка чатов, повторные запросы списка чатов для этого названия
+        не выполняются в течение :py:obj:`missed_chats_ttl` секунд.
 
         :param name: название чата.
         :type name: :obj:`str`
@@ -1138,16 +1482,23 @@ class Account:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
 
-        for i in self.__saved_chats:
-            if self.__saved_chats[i].name == name:
-                return self.__saved_chats[i]
+        chat = self.__saved_chats_by_name.get(name)
+        if chat is not None or not make_request:
+            return chat
 
-        if make_request:
-            self.add_chats(self.request_chats())
-            return self.get_chat_by_name(name)
-        else:
+        now = time.time()
+        missed_at = self.__missed_chat_names.get(name)
+        if missed_at is not None and now - missed_at < self.missed_chats_ttl:
             return None
 
+        self.add_chats(self.request_chats())
+        chat = self.__saved_chats_by_name.get(name)
+        if chat is None:
+            self.__missed_chat_names = {k: v for k, v in self.__missed_chat_names.items()
+                                        if now - v < self.missed_chats_ttl}
+            self.__missed_chat_names[name] = now
+        return chat
+
     def get_chat_by_id(self, chat_id: int, make_request: bool = False) -> types.ChatShortcut | None:
         """
         Возвращает личный чат по его ID (если он сохранен).
@@ -1191,6 +1542,11 @@ class Account:
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
         
+        return self.__cached("calculate", (subcategory_type, subcategory_id, price),
+                             lambda: self.__calculate(subcategory_type, subcategory_id, price))
+
+    def __calculate(self, subcategory_type: enums.SubCategoryTypes, subcategory_id: int,
+                    price: int | float) -> types.CalculateResult:
         headers = {
             "accept": "*/*",
             "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
@@ -1237,7 +1593,7 @@ class Account:
         endpoint = ("lots" if subcategory_type == enums.SubCategoryTypes.COMMON else "chips") + f"/{subcategory_id}/trade"
         response = self.method("get", endpoint, headers, {}, raise_not_200=True)
         html_response = response.content.decode()
-        parser = BeautifulSoup(html_response, "html.parser")
+        parser = self.parse_html(html_response)
         username = parser.find("div", {"class": "user-link-name"})
         if not username:
             raise exceptions.UnauthorizedError(response)
@@ -1264,7 +1620,7 @@ class Account:
                 *price_parts, _ = price_block.find("div").text.split()
                 price = float("".join(price_parts))
                 
-            lots.append(types.MyLotShortcut(id_, description, price, is_active, auto_delivery, server, amount, str(block)))
+            lots.append(types.MyLotShortcut(id_, description, price, is_active, auto_delivery, server, amount, self.retain_html(block)))
             
         return lots
     
@@ -1281,12 +1637,15 @@ class Account:
         """
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
+        return self.__cached("get_lot_page", (int(lot_id), ), lambda: self.__get_lot_page(lot_id))
+
+    def __get_lot_page(self, lot_id: int) -> types.LotPage | None:
         headers = {
             "accept": "*/*"
         }
         response = self.method("get", f"lots/offer?id={lot_id}", headers, {}, raise_not_200=True)
         html_response = response.content.decode()
-        parser = BeautifulSoup(html_response, "html.parser")
+        parser = self.parse_html(html_response)
         username = parser.find("div", {"class": "user-link-name"})
         if not username:
             raise exceptions.UnauthorizedError(response)
@@ -1326,11 +1685,14 @@ class Account:
         """
         if not self.is_initiated:
             raise exceptions.AccountNotInitiatedError()
+        return self.__cached("get_lot_fields", (int(lot_id), ), lambda: self.__get_lot_fields(lot_id))
+
+    def __get_lot_fields(self, lot_id: int) -> types.LotFields | None:
         headers = {}
         response = self.method("get", f"lots/offerEdit?offer={lot_id}", headers, {}, raise_not_200=True)
         html_response = response.content.decode()
 
-        bs = BeautifulSoup(html_response, "html.parser")
+        bs = self.parse_html(html_response)
         
         lot_not_found = bs.find("p", {"class": "lead"})
         if lot_not_found:
@@ -1383,6 +1745,7 @@ class Account:
         params = {"offer_id": str(lot_id), "deleted": "1", "csrf_token": self.csrf_token}
 
         response = self.method("post", "lots/offerSave", headers, params, raise_not_200=True)
+        self.invalidate_lot_cache(int(lot_id))
         json_response = response.json()
         if json_response.get("error"):
             raise exceptions.LotSavingError(response, json_response.get("error"), lot_id)
@@ -1406,6 +1769,7 @@ class Account:
         fields["location"] = "trade"
 
         response = self.method("post", "lots/offerSave", headers, fields, raise_not_200=True)
+        self.invalidate_lot_cache(int(lot_fields.lot_id))
         json_response = response.json()
         if json_response.get("error"):
             raise exceptions.LotSavingError(response, json_response.get("error"), lot_fields.lot_id)
@@ -1417,6 +1781,53 @@ class Account:
         )
 
 
+    def invalidate_lot_cache(self, lot_id: int | None = None) -> None:
+        """
+        Удаляет из кэша (:py:obj:`.Account.cache`) результаты методов, зависящие от лотов аккаунта: страницу и поля
+        лота, профиль аккаунта и списки лотов подкатегорий. Вызывается при сохранении / удалении лота.
+
+        :param lot_id: ID измененного лота (если не указан - удаляются страницы и поля всех лотов).
+        :type lot_id: :obj:`int` or :obj:`None`, опционально
+        """
+        key = (lot_id, ) if lot_id is not None else None
+        self._invalidate("get_lot_fields", key)
+        self._invalidate("get_lot_page", key)
+        self._invalidate("get_user", (self.id, ))
+        self._invalidate("get_subcategory_public_lots")
+
+    def _invalidate(self, method: str, key: tuple | None = None) -> None:
+        """
+        Удаляет результаты метода из кэша (:py:obj:`.Account.cache`) и результаты, сохраненные объединителем запросов
+        (:py:obj:`.Account.single_flight`, см. :py:obj:`.Account.single_flight_ttl`), чтобы после изменения данных
+        не выдавался устаревший результат.
+
+        :param method: название метода.
+        :param key: аргументы метода (если не указаны - удаляются результаты метода со всеми аргументами).
+        """
+        self.cache.invalidate(method, key)
+        self.single_flight.forget((method, *(key or ())), prefix=key is None)
+
+    def __cached(self, method: str, key: tuple, func: Callable[[], Any],
+                 cacheable: Callable[[Any], bool] | None = None) -> Any:
+        """
+        Возвращает результат метода из кэша (:py:obj:`.Account.cache`) или выполняет его (объединяя одновременные
+        одинаковые вызовы, см. :py:obj:`.Account.single_flight`) и сохраняет результат в кэш.
+
+        :param method: название метода.
+        :param key: аргументы метода.
+        :param func: функция, выполняющая метод.
+        :param cacheable: функция, определяющая, можно ли сохранить результат в кэш.
+
+        :return: результат метода.
+        """
+        found, value = self.cache.get(method, key)
+        if found:
+            return value
+        value = self.single_flight.do((method, *key), func, self.single_flight_ttl)
+        if cacheable is None or cacheable(value):
+            self.cache.put(method, key, value)
+        return value
+
     def get_category(self, category_id: int) -> types.Category | None:
         """
         Возвращает объект категории (игры).
@@ -1524,7 +1935,7 @@ class Account:
 
         return types.LotShortcut(
             offer_id, server, description, price, currency, subcategory_obj,
-            my_lot, seller, amount, autodelivery, promo, str(parser)
+            my_lot, seller, amount, autodelivery, promo, self.retain_html(parser)
         )
     
     def _parse_seller_shortcut(self, parser: BeautifulSoup) -> types.SellerShortcut | None:
@@ -1549,7 +1960,7 @@ class Account:
         avatar_block = seller_block.find("div", {"class": "avatar-photo pseudo-a"})
         avatar_link = avatar_block.get("style").split("(")[1].split(")")[0]
 
-        return types.SellerShortcut(seller_username, seller_id, seller_online, avatar_link, stars_amount, reviews_amount, str(seller_block))
+        return types.SellerShortcut(seller_username, seller_id, seller_online, avatar_link, stars_amount, reviews_amount, self.retain_html(seller_block))
 
     def __setup_categories(self, html: str):
         """
@@ -1557,7 +1968,7 @@ class Account:
 
         :param html: HTML страница.
         """
-        parser = BeautifulSoup(html, "html.parser")
+        parser = self.parse_html(html)
         games_table = parser.find_all("div", {"class": "promo-game-list"})
         if not games_table:
             return
@@ -1609,33 +2020,29 @@ class Account:
             if i["id"] < from_id:
                 continue
             author_id = i["author"]
-            parser = BeautifulSoup(i["html"], "html.parser")
+            message_text = None
+            extractor = utils.MessageHTMLExtractor().extract(i["html"])
 
             # Если ник или бейдж написавшего неизвестен, но есть блок с данными об авторе сообщения
-            if None in [ids.get(author_id), badges.get(author_id)] and (author_div := parser.find("div", {"class": "media-user-name"})):
+            if None in [ids.get(author_id), badges.get(author_id)] and extractor.author_div_found:
                 if badges.get(author_id) is None:
-                    badge = author_div.find("span")
-                    badges[author_id] = badge.text if badge else 0
+                    badges[author_id] = extractor.badge if extractor.badge is not None else 0
                 if ids.get(author_id) is None:
-                    author = author_div.find("a").text.strip()
+                    author = extractor.author.strip()
                     ids[author_id] = author
                     if self.chat_id_private(chat_id) and author_id == interlocutor_id and not interlocutor_username:
                         interlocutor_username = author
                         ids[interlocutor_id] = interlocutor_username
 
-            if self.chat_id_private and (image_link := parser.find("a", {"class": "chat-img-link"})):
-                image_link = image_link.get("href")
-                message_text = None
+            if self.chat_id_private and extractor.image_link is not None:
+                image_link = extractor.image_link
             else:
                 image_link = None
                 if author_id == 0:
-                    message_text_obj = parser.find("div", {"class": "alert alert-with-icon alert-info"})
-                    if message_text_obj:
-                        message_text = message_text_obj.text.strip()
-                else:
-                    message_text_obj = parser.find("div", {"class": "chat-msg-text"})
-                    if message_text_obj:
-                        message_text = message_text_obj.text
+                    if extractor.alert_text is not None:
+                        message_text = extractor.alert_text.strip()
+                elif extractor.text is not None:
+                    message_text = extractor.text
 
             by_bot = False
             if message_text and message_text.startswith(self.__bot_character):
@@ -1643,7 +2050,8 @@ class Account:
                 by_bot = True
 
             message_obj = types.Message(i["id"], message_text, chat_id, interlocutor_username,
-                                        None, author_id, i["html"], image_link, determine_msg_type=False)
+                                        None, author_id, self.retain_html(i["html"]), image_link,
+                                        determine_msg_type=False)
             message_obj.by_bot = by_bot
             message_obj.type = types.MessageTypes.NON_SYSTEM if author_id != 0 else message_obj.get_message_type()
             messages.append(message_obj)
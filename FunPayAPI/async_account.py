@@ -0,0 +1,317 @@
+"""
+В данном модуле описан асинхронный аналог класса :class:`FunPayAPI.account.Account`, работающий на aiohttp.
+Парсинг ответов FunPay общий с синхронным классом.
+"""
+from __future__ import annotations
+from typing import TYPE_CHECKING, Literal, Any, Optional, IO, AsyncGenerator
+
+if TYPE_CHECKING:
+    from .updater.async_runner import AsyncRunner
+
+from requests.structures import CaseInsensitiveDict
+from requests.cookies import cookiejar_from_dict
+from urllib.parse import urlencode
+import requests
+import aiohttp
+import asyncio
+import logging
+import time
+
+from .account import Account
+from . import types
+from .common import exceptions
+
+
+logger = logging.getLogger("FunPayAPI.async_account")
+
+
+class AsyncAccount(Account):
+    """
+    Асинхронный аналог класса :class:`FunPayAPI.account.Account`.
+
+    Методы :meth:`get`, :meth:`get_chats_histories`, :meth:`send_message`, :meth:`send_image`, :meth:`raise_lots`,
+    :meth:`get_user` и :meth:`get_sells` являются корутинами, а :meth:`crawl_sells` - асинхронным генератором.
+    Они выполняют запросы через :class:`aiohttp.ClientSession`.
+    Остальные методы унаследованы от :class:`FunPayAPI.account.Account` и работают синхронно.
+
+    :param golden_key: токен (golden_key) аккаунта.
+    :type golden_key: :obj:`str`
+
+    :param user_agent: user-agent браузера, с которого был произведен вход в аккаунт.
+    :type user_agent: :obj:`str`
+
+    :param requests_timeout: тайм-аут ожидания ответа на запросы.
+    :type requests_timeout: :obj:`int` or :obj:`float`
+
+    :param proxy: прокси для запросов.
+    :type proxy: :obj:`dict` {:obj:`str`: :obj:`str` or :obj:`None`
+
+    :param html_parser: бэкенд BeautifulSoup для парсинга HTML ("html.parser", "lxml", "html5lib").
+    :type html_parser: :obj:`str`, опционально
+
+    :param html_retention: режим хранения HTML кода (`full`, `compressed` или `none`).
+    :type html_retention: :obj:`str`, опционально
+    """
+    def __init__(self, golden_key: str, user_agent: str | None = None,
+                 requests_timeout: int | float = 10, proxy: Optional[dict] = None,
+                 html_parser: str = "html.parser",
+                 html_retention: Literal["full", "compressed", "none"] = "full"):
+        super(AsyncAccount, self).__init__(golden_key, user_agent, requests_timeout, proxy, html_parser,
+                                           html_retention)
+        self.async_session: aiohttp.ClientSession | None = None
+        """Сессия aiohttp. Создается при первом асинхронном запросе."""
+        self.runner: AsyncRunner | None = None
+        """Объект AsyncRunner'а."""
+        self.__inflight: dict[tuple, asyncio.Future] = {}
+
+    async def __aenter__(self) -> AsyncAccount:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        """
+        Закрывает сессию aiohttp.
+        """
+        if self.async_session and not self.async_session.closed:
+            await self.async_session.close()
+        self.async_session = None
+
+    async def async_method(self, request_method: Literal["post", "get"], api_method: str, headers: dict,
+                           payload: Any, exclude_phpsessid: bool = False,
+                           raise_not_200: bool = False) -> requests.Response:
+        """
+        Асинхронный аналог :meth:`FunPayAPI.account.Account.method`. Использует тот же ограничитель частоты запросов
+        (:py:obj:`.Account.limiter`) и сборщик метрик (:py:obj:`.Account.metrics`, каждая попытка учитывается как
+        отдельный запрос).
+        Ответ aiohttp преобразуется в :class:`requests.Response`, чтобы его можно было передать в общие парсеры.
+
+        :param request_method: метод запроса ("get" / "post").
+        :type request_method: :obj:`str` `post` or `get`
+
+        :param api_method: метод API / полная ссылка.
+        :type api_method: :obj:`str`
+
+        :param headers: заголовки запроса.
+        :type headers: :obj:`dict`
+
+        :param payload: полезная нагрузка.
+        :type payload: :obj:`dict`
+
+        :param exclude_phpsessid: исключить ли PHPSESSID из добавляемых куки?
+        :type exclude_phpsessid: :obj:`bool`
+
+        :param raise_not_200: возбуждать ли исключение, если статус код ответа != 200?
+        :type raise_not_200: :obj:`bool`
+
+        :return: объект ответа.
+        :rtype: :class:`requests.Response`
+        """
+        headers["cookie"] = f"golden_key={self.golden_key}"
+        headers["cookie"] += f"; PHPSESSID={self.phpsessid}" if self.phpsessid and not exclude_phpsessid else ""
+        if self.user_agent:
+            headers["user-agent"] = self.user_agent
+        link = api_method if api_method.startswith("https://funpay.com") else "https://funpay.com/" + api_method
+
+        data = urlencode(payload, doseq=True) if payload else None
+        if data is not None and "content-type" not in headers:
+            headers["content-type"] = "application/x-www-form-urlencoded"
+
+        if self.async_session is None or self.async_session.closed:
+            self.async_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.requests_timeout),
+                                                       cookie_jar=aiohttp.DummyCookieJar())
+        proxy = (self.proxy or {}).get("https")
+
+        attempts, throttled = 6, 0
+        while True:
+            endpoint = await self.limiter.acquire_async(link)
+            started = self.metrics.start()
+            try:
+                async with self.async_session.request(request_method.upper(), link, headers=headers, data=data,
+                                                      proxy=proxy) as resp:
+                    content = await resp.read()
+                    response = self.__to_requests_response(request_method, link, headers, data, resp, content)
+                    self.metrics.record(link, started, response, 0, 0)
+                    if resp.status == 429 and throttled < self.limiter.MAX_THROTTLED_RETRIES:
+                        throttled += 1
+                        self.limiter.on_throttled(endpoint,
+                                                  self.limiter.get_retry_after(resp.headers.get("Retry-After")))
+                        continue
+                    if resp.status in (500, 502, 503, 504) and attempts:
+                        attempts -= 1
+                        await asyncio.sleep(1)
+                        continue
+                    if resp.status != 429:
+                        self.limiter.on_success(endpoint)
+                    break
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                self.metrics.record(link, started, retries=0, retry_time=0)
+                if not attempts:
+                    raise
+                attempts -= 1
+                await asyncio.sleep(1)
+
+        if response.status_code == 403:
+            raise exceptions.UnauthorizedError(response)
+        elif response.status_code != 200 and raise_not_200:
+            raise exceptions.RequestFailedError(response)
+        return response
+
+    @staticmethod
+    def __to_requests_response(request_method: str, link: str, headers: dict, data: str | None,
+                               resp: aiohttp.ClientResponse, content: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = resp.status
+        response.reason = resp.reason
+        response.url = str(resp.url)
+        response.headers = CaseInsensitiveDict(resp.headers)
+        response.encoding = resp.charset or "utf-8"
+        response.cookies = cookiejar_from_dict({name: cookie.value for name, cookie in resp.cookies.items()})
+        response.request = requests.Request(request_method.upper(), link, headers=headers, data=data).prepare()
+        response._content = content
+        return response
+
+    async def get(self, update_phpsessid: bool = False) -> AsyncAccount:
+        """
+        Асинхронный аналог :meth:`FunPayAPI.account.Account.get`.
+        """
+        response = await self.async_method("get", "https://funpay.com", {}, {}, update_phpsessid,
+                                           raise_not_200=True)
+        return self._parse_main_page(response, update_phpsessid)
+
+    async def get_chats_histories(self, chats_data: dict[int | str, str | None]) -> dict[int, list[types.Message]]:
+        """
+        Асинхронный аналог :meth:`FunPayAPI.account.Account.get_chats_histories`.
+        """
+        headers, payload = self._chats_histories_request(chats_data)
+        response = await self.async_method("post", "runner/", headers, payload, raise_not_200=True)
+        return self._parse_chats_histories(response.json(), chats_data)
+
+    async def send_message(self, chat_id: int | str, text: Optional[str] = None, chat_name: Optional[str] = None,
+                           image_id: Optional[int] = None, add_to_ignore_list: bool = True,
+                           update_last_saved_message: bool = False) -> types.Message:
+        """
+        Асинхронный аналог :meth:`FunPayAPI.account.Account.send_message`.
+        """
+        if not self.is_initiated:
+            raise exceptions.AccountNotInitiatedError()
+
+        headers, payload = self._send_message_request(chat_id, text, image_id)
+        response = await self.async_method("post", "runner/", headers, payload, raise_not_200=True)
+        return self._parse_sent_message(response, chat_id, chat_name, add_to_ignore_list, update_last_saved_message)
+
+    async def send_image(self, chat_id: int, image: int | str | IO[bytes], chat_name: Optional[str] = None,
+                         add_to_ignore_list: bool = True, update_last_saved_message: bool = False) -> types.Message:
+        """
+        Асинхронный аналог :meth:`FunPayAPI.account.Account.send_image`.
+        Выгрузка изображения (:meth:`FunPayAPI.account.Account.upload_image`) выполняется в отдельном потоке.
+        """
+        if not self.is_initiated:
+            raise exceptions.AccountNotInitiatedError()
+
+        if not isinstance(image, int):
+            image = await asyncio.to_thread(self.upload_image, image)
+        return await self.send_message(chat_id, None, chat_name, image, add_to_ignore_list, update_last_saved_message)
+
+    async def raise_lots(self, category_id: int, subcategories: Optional[list[int | types.SubCategory]] = None,
+                         exclude: list[int] | None = None) -> bool:
+        """
+        Асинхронный аналог :meth:`FunPayAPI.account.Account.raise_lots`.
+        """
+        if not self.is_initiated:
+            raise exceptions.AccountNotInitiatedError()
+        category, headers, payload = self._raise_lots_request(category_id, subcategories, exclude)
+        response = await self.async_method("post", "lots/raise", headers, payload, raise_not_200=True)
+        self._invalidate("get_subcategory_public_lots")
+        return self._parse_raise_lots(response, category)
+
+    async def get_user(self, user_id: int) -> types.UserProfile:
+        """
+        Асинхронный аналог :meth:`FunPayAPI.account.Account.get_user`.
+        """
+        if not self.is_initiated:
+            raise exceptions.AccountNotInitiatedError()
+
+        async def get_user() -> types.UserProfile:
+            response = await self.async_method("get", f"users/{user_id}/", {"accept": "*/*"}, {},
+                                               raise_not_200=True)
+            return self._parse_user(response, user_id)
+        found, user = self.cache.get("get_user", (int(user_id), ))
+        if found:
+            return user
+        user = await self.__single_flight(("get_user", int(user_id)), get_user)
+        self.cache.put("get_user", (int(user_id), ), user)
+        return user
+
+    async def __single_flight(self, key: tuple, coroutine_function) -> Any:
+        """
+        Асинхронный аналог :meth:`FunPayAPI.common.utils.SingleFlight.do` (без хранения результата): одновременные
+        вызовы с одинаковым ключом ждут одну задачу.
+        """
+        future = self.__inflight.get(key)
+        if future is not None:
+            self.single_flight.coalesced += 1
+            return await asyncio.shield(future)
+        future = self.__inflight[key] = asyncio.ensure_future(coroutine_function())
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if self.__inflight.get(key) is future:
+                del self.__inflight[key]
+
+    async def get_sells(self, start_from: str | None = None, include_paid: bool = True, include_closed: bool = True,
+                        include_refunded: bool = True, exclude_ids: list[str] | None = None,
+                        known_orders: dict[str, types.OrderStatuses] | None = None, id: Optional[int] = None, buyer: Optional[str] = None,
+                        state: Optional[Literal["closed", "paid", "refunded"]] = None, game: Optional[int] = None,
+                        section: Optional[str] = None, server: Optional[int] = None,
+                        side: Optional[int] = None, **more_filters) -> tuple[str | None, list[types.OrderShortcut]]:
+        """
+        Асинхронный аналог :meth:`FunPayAPI.account.Account.get_sells`.
+        """
+        if not self.is_initiated:
+            raise exceptions.AccountNotInitiatedError()
+
+        request_method, link, filters = self._sells_request(start_from, id, buyer, state, game, section, server,
+                                                            side, **more_filters)
+        response = await self.async_method(request_method, link, {}, filters, raise_not_200=True)
+        return self._parse_sells(response, include_paid, include_closed, include_refunded, exclude_ids,
+                                 known_orders)
+
+    async def crawl_sells(self, start_from: str | None = None, prefetch: bool = True, page_delay: int | float = 0,
+                          attempts: int = 3, **kwargs) -> AsyncGenerator[tuple[str | None,
+                                                                               list[types.OrderShortcut]], None]:
+        """
+        Асинхронный аналог :meth:`FunPayAPI.account.Account.crawl_sells`.
+        Следующая страница загружается в отдельной задаче asyncio.
+        """
+        last_request = 0.0
+
+        async def get_page(cursor: str | None) -> tuple[str | None, list[types.OrderShortcut]]:
+            nonlocal last_request
+            for attempt in range(attempts, 0, -1):
+                await asyncio.sleep(max(last_request + page_delay - time.time(), 0))
+                last_request = time.time()
+                try:
+                    return await self.get_sells(start_from=cursor, **kwargs)
+                except exceptions.UnauthorizedError:
+                    raise
+                except Exception:
+                    if attempt == 1:
+                        raise
+                    logger.debug(f"Не удалось получить страницу заказов (continue={cursor}). Пробую снова...")
+                    await asyncio.sleep(1)
+
+        task = None
+        try:
+            page = await get_page(start_from)
+            while True:
+                next_order_id = page[0]
+                task = asyncio.create_task(get_page(next_order_id)) if prefetch and next_order_id else None
+                yield page
+                if next_order_id is None:
+                    return
+                page = await task if task else await get_page(next_order_id)
+        finally:
+            if task and not task.done():
+                task.cancel()
@@ -0,0 +1,172 @@
+"""
+В данном модуле описан кэш результатов методов :class:`FunPayAPI.account.Account`, читающих редко изменяющиеся данные
+(профили пользователей, страницы и поля лотов, комиссии и т.д.).
+
+Кэш выключен по умолчанию: метод кэшируется, только если для него задано время хранения (:attr:`ResponseCache.ttls`).
+Размер кэша ограничен, при переполнении удаляются давно не использовавшиеся записи (LRU).
+"""
+from __future__ import annotations
+from typing import Any, Callable, Hashable, Iterable
+
+from collections import OrderedDict
+import threading
+import copy
+import time
+
+
+DEFAULT_TTLS = {
+    "get_user": 60,
+    "get_lot_page": 300,
+    "get_lot_fields": 300,
+    "calculate": 600,
+    "get_subcategory_public_lots": 60,
+    "get_order": 3600
+}
+"""Рекомендуемое время хранения результатов методов ({название метода: время (в секундах)}).
+Заказы кэшируются, только если они закрыты или возвращены."""
+
+
+class ResponseCache:
+    """
+    Кэш результатов методов с ограниченным временем хранения (для каждого метода свое) и размером.
+
+    Результаты копируются при сохранении и при выдаче, поэтому изменение полученного объекта не затрагивает кэш.
+    Общие объекты (`shared`, например, категории и подкатегории аккаунта) не копируются: копии результатов
+    ссылаются на те же объекты, что и исходные результаты.
+
+    :param max_size: макс. кол-во записей.
+    :type max_size: :obj:`int`, опционально
+
+    :param ttls: время хранения результатов методов ({название метода: время (в секундах)}).
+    :type ttls: :obj:`dict` {:obj:`str`: :obj:`int` or :obj:`float`}, опционально
+
+    :param shared: функция, возвращающая общие объекты, которые не нужно копировать.
+    :type shared: :obj:`callable`, опционально
+    """
+    def __init__(self, max_size: int = 512, ttls: dict[str, int | float] | None = None,
+                 shared: Callable[[], Iterable[Any]] | None = None):
+        self.max_size: int = max_size
+        """Макс. кол-во записей."""
+        self.ttls: dict[str, int | float] = dict(ttls or {})
+        """Время хранения результатов методов ({название метода: время (в секундах)}). Методы, которых нет в словаре,
+        не кэшируются."""
+        self.hits: dict[str, int] = {}
+        """Кол-во попаданий в кэш ({название метода: кол-во})."""
+        self.misses: dict[str, int] = {}
+        """Кол-во промахов кэша ({название метода: кол-во})."""
+        self.evictions: int = 0
+        """Кол-во записей, удаленных из-за переполнения кэша."""
+        self.shared: Callable[[], Iterable[Any]] | None = shared
+        """Функция, возвращающая общие объекты, которые не нужно копировать."""
+        self.__entries: OrderedDict[tuple, tuple[float, Any, dict[int, Any] | None]] = OrderedDict()
+        self.__memo: dict[int, Any] | None = None
+        self.__lock = threading.Lock()
+
+    def enable(self, ttls: dict[str, int | float] | None = None) -> None:
+        """
+        Включает кэширование методов.
+
+        :param ttls: время хранения результатов методов (по умолчанию - :data:`DEFAULT_TTLS`).
+        """
+        self.ttls.update(DEFAULT_TTLS if ttls is None else ttls)
+
+    def is_enabled(self, method: str) -> bool:
+        """
+        Проверяет, кэшируется ли метод.
+
+        :param method: название метода.
+
+        :return: True, если метод кэшируется.
+        """
+        return self.ttls.get(method, 0) > 0
+
+    def get(self, method: str, key: tuple[Hashable, ...]) -> tuple[bool, Any]:
+        """
+        Возвращает сохраненный результат метода.
+
+        :param method: название метода.
+        :param key: аргументы метода.
+
+        :return: (найден ли результат, копия результата).
+        """
+        if not self.is_enabled(method):
+            return False, None
+        with self.__lock:
+            entry = self.__entries.get((method, *key))
+            if entry is not None and entry[0] <= time.monotonic():
+                del self.__entries[(method, *key)]
+                entry = None
+            if entry is None:
+                self.misses[method] = self.misses.get(method, 0) + 1
+                return False, None
+            self.__entries.move_to_end((method, *key))
+            self.hits[method] = self.hits.get(method, 0) + 1
+        return True, self.__copy(entry[1], entry[2])
+
+    def put(self, method: str, key: tuple[Hashable, ...], value: Any) -> None:
+        """
+        Сохраняет результат метода.
+
+        :param method: название метода.
+        :param key: аргументы метода.
+        :param value: результат.
+        """
+        if not self.is_enabled(method):
+            return
+        memo = self.__get_memo()
+        value = self.__copy(value, memo)
+        with self.__lock:
+            self.__entries[(method, *key)] = (time.monotonic() + self.ttls[method], value, memo)
+            self.__entries.move_to_end((method, *key))
+            while len(self.__entries) > self.max_size:
+                self.__entries.popitem(last=False)
+                self.evictions += 1
+
+    def __get_memo(self) -> dict[int, Any] | None:
+        """
+        Строит memo для :func:`copy.deepcopy`, в котором общие объекты отображаются сами на себя.
+        Если общие объекты не изменились, возвращает memo, построенное при прошлом сохранении (записи кэша ссылаются
+        на один и тот же словарь).
+        """
+        if self.shared is None:
+            return None
+        memo = {id(i): i for i in self.shared()}
+        with self.__lock:
+            if self.__memo is not None and self.__memo.keys() == memo.keys():
+                return self.__memo
+            self.__memo = memo
+        return memo
+
+    @staticmethod
+    def __copy(value: Any, memo: dict[int, Any] | None) -> Any:
+        # deepcopy дописывает в memo скопированные объекты, поэтому сохраненное memo копируется.
+        return copy.deepcopy(value, dict(memo) if memo is not None else None)
+
+    def invalidate(self, method: str | None = None, key: tuple[Hashable, ...] | None = None) -> None:
+        """
+        Удаляет сохраненные результаты.
+
+        :param method: название метода (если не указано - удаляются все результаты).
+        :param key: аргументы метода (если не указаны - удаляются все результаты метода).
+        """
+        with self.__lock:
+            if method is None:
+                self.__entries.clear()
+            elif key is not None:
+                self.__entries.pop((method, *key), None)
+            else:
+                for i in [i for i in self.__entries if i[0] == method]:
+                    del self.__entries[i]
+
+    def get_stats(self) -> dict[str, dict[str, int]]:
+        """
+        Возвращает счетчики попаданий / промахов.
+
+        :return: {название метода: {"hits": кол-во попаданий, "misses": кол-во промахов}}.
+        """
+        with self.__lock:
+            return {method: {"hits": self.hits.get(method, 0), "misses": self.misses.get(method, 0)}
+                    for method in {*self.hits, *self.misses}}
+
+    def __len__(self) -> int:
+        return len(self.__entries)
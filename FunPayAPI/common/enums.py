@@ -117,3 +117,15 @@ class Currency(Enum):
     EUR = 2
     """Евро"""
 
+
+
+class RequestPriorities(Enum):
+    """
+    В данном классе перечислены приоритеты запросов к FunPay (см. :class:`FunPayAPI.common.limiter.RateLimiter`).
+    """
+    HIGH = 0
+    """Высокий приоритет (получение событий Runner'ом, отправка сообщений, выдача товаров)."""
+    NORMAL = 1
+    """Обычный приоритет."""
+    LOW = 2
+    """Низкий приоритет (фоновые запросы: поднятие лотов, сбор статистики)."""
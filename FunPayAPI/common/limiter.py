@@ -0,0 +1,333 @@
+"""
+В данном модуле описан ограничитель частоты запросов к FunPay (token bucket), общий для всех потоков, использующих
+один аккаунт.
+
+Запросы делятся на классы по адресу (см. :data:`ENDPOINT_CLASSES`). У каждого класса свой бюджет запросов, кроме того
+все запросы расходуют общий бюджет аккаунта. Запросы низкого приоритета не расходуют последние токены общего
+бюджета и ждут, пока не будут отправлены ожидающие запросы более высокого приоритета.
+
+При ответе 429 частота запросов класса и общая частота снижаются вдвое, а запросы приостанавливаются на время
+из заголовка Retry-After. После каждого успешного ответа частота постепенно восстанавливается.
+"""
+from __future__ import annotations
+from typing import Iterable, Iterator
+
+from email.utils import parsedate_to_datetime
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
+import asyncio
+import logging
+import time
+import re
+
+from .enums import RequestPriorities
+
+
+logger = logging.getLogger("FunPayAPI.limiter")
+
+_priority: ContextVar[RequestPriorities | None] = ContextVar("FunPayAPI.limiter.priority", default=None)
+
+
+class TokenBucket:
+    """
+    Бюджет запросов (token bucket) с адаптивной частотой.
+
+    :param rate: частота пополнения бюджета (запросов в секунду).
+    :type rate: :obj:`int` or :obj:`float`
+
+    :param burst: емкость бюджета (макс. кол-во запросов подряд).
+    :type burst: :obj:`int`
+    """
+    __slots__ = ("base_rate", "rate", "burst", "tokens", "updated", "blocked_until")
+
+    MIN_RATE_FACTOR = 0.05
+    """Минимальная частота (доля от исходной), до которой она может быть снижена после ответов 429."""
+    RECOVERY_FACTOR = 0.05
+    """Доля исходной частоты, на которую частота восстанавливается после каждого успешного ответа."""
+
+    def __init__(self, rate: int | float, burst: int):
+        self.base_rate: float = rate
+        """Исходная частота пополнения бюджета (запросов в секунду)."""
+        self.rate: float = rate
+        """Текущая частота пополнения бюджета (запросов в секунду)."""
+        self.burst: int = burst
+        """Емкость бюджета."""
+        self.tokens: float = burst
+        """Текущее кол-во токенов."""
+        self.updated: float = time.monotonic()
+        """Время последнего пополнения бюджета."""
+        self.blocked_until: float = 0
+        """Время, до которого запросы приостановлены."""
+
+    def refill(self, now: float) -> None:
+        """
+        Пополняет бюджет на момент времени `now`.
+
+        :param now: текущее время (:func:`time.monotonic`).
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def get_wait_time(self, now: float, reserve: float = 0) -> float:
+        """
+        Возвращает время, через которое в бюджете будет токен (не считая `reserve` токенов).
+
+        :param now: текущее время (:func:`time.monotonic`).
+        :param reserve: кол-во токенов, которое нельзя расходовать.
+
+        :return: время ожидания (в секундах), 0, если токен есть.
+        """
+        self.refill(now)
+        wait = max(self.blocked_until - now, 0)
+        if self.tokens < 1 + reserve:
+            wait = max(wait, (1 + reserve - self.tokens) / self.rate)
+        return wait
+
+    def penalize(self, now: float, delay: float) -> None:
+        """
+        Снижает частоту вдвое, обнуляет бюджет и приостанавливает запросы на `delay` секунд.
+
+        :param now: текущее время (:func:`time.monotonic`).
+        :param delay: время приостановки запросов (в секундах).
+        """
+        self.refill(now)
+        self.rate = max(self.rate / 2, self.base_rate * self.MIN_RATE_FACTOR)
+        self.tokens = min(self.tokens, 0)
+        self.blocked_until = max(self.blocked_until, now + delay)
+
+    def recover(self) -> None:
+        """
+        Частично восстанавливает частоту после успешного ответа.
+        """
+        self.rate = min(self.base_rate, self.rate + self.base_rate * self.RECOVERY_FACTOR)
+
+
+class EndpointClass:
+    """
+    Класс запросов к FunPay со своим бюджетом.
+
+    :param name: название класса.
+    :type name: :obj:`str`
+
+    :param pattern: регулярное выражение адреса (без https://funpay.com/).
+    :type pattern: :obj:`str`
+
+    :param rate: частота запросов (запросов в секунду).
+    :type rate: :obj:`int` or :obj:`float`
+
+    :param burst: макс. кол-во запросов подряд.
+    :type burst: :obj:`int`
+
+    :param priority: приоритет запросов.
+    :type priority: :class:`FunPayAPI.common.enums.RequestPriorities`
+    """
+    __slots__ = ("name", "pattern", "bucket", "priority", "throttled")
+
+    def __init__(self, name: str, pattern: str, rate: int | float, burst: int, priority: RequestPriorities):
+        self.name: str = name
+        """Название класса."""
+        self.pattern: re.Pattern = re.compile(pattern)
+        """Регулярное выражение адреса (без https://funpay.com/)."""
+        self.bucket: TokenBucket = TokenBucket(rate, burst)
+        """Бюджет запросов класса."""
+        self.priority: RequestPriorities = priority
+        """Приоритет запросов."""
+        self.throttled: int = 0
+        """Кол-во ответов 429 на запросы данного класса."""
+
+
+ENDPOINT_CLASSES = [
+    ("runner", r"^runner/", 4, 8, RequestPriorities.HIGH),
+    ("trade", r"^orders/trade", 1, 2, RequestPriorities.LOW),
+    ("orders", r"^orders/", 4, 8, RequestPriorities.HIGH),
+    ("raise", r"^lots/raise", 1, 3, RequestPriorities.LOW),
+    ("default", r"", 4, 8, RequestPriorities.NORMAL)
+]
+"""Классы запросов по умолчанию ([(название, регулярное выражение адреса, частота, макс. кол-во запросов подряд,
+приоритет)]). Запрос относится к первому подходящему классу."""
+
+
+class RateLimiter:
+    """
+    Ограничитель частоты запросов к FunPay.
+
+    :param rate: общая частота запросов (запросов в секунду).
+    :type rate: :obj:`int` or :obj:`float`, опционально
+
+    :param burst: общее макс. кол-во запросов подряд.
+    :type burst: :obj:`int`, опционально
+
+    :param endpoint_classes: классы запросов (см. :data:`ENDPOINT_CLASSES`).
+    :type endpoint_classes: :obj:`list` of :obj:`tuple`, опционально
+    """
+    LOW_PRIORITY_RESERVE = 0.3
+    """Доля общего бюджета, которую не могут расходовать запросы низкого приоритета."""
+    MAX_THROTTLED_RETRIES = 10
+    """Макс. кол-во повторов запроса после ответов 429."""
+
+    def __init__(self, rate: int | float = 8, burst: int = 16, endpoint_classes: Iterable[tuple] | None = None):
+        self.bucket: TokenBucket = TokenBucket(rate, burst)
+        """Общий бюджет запросов."""
+        self.endpoint_classes: list[EndpointClass] = [EndpointClass(*i)
+                                                      for i in (endpoint_classes or ENDPOINT_CLASSES)]
+        """Классы запросов."""
+        self.__lock = threading.Condition()
+        self.__waiting: dict[RequestPriorities, int] = {i: 0 for i in RequestPriorities}
+
+    def classify(self, link: str) -> EndpointClass:
+        """
+        Определяет класс запроса по адресу.
+
+        :param link: адрес запроса (полный или без https://funpay.com/).
+
+        :return: класс запроса.
+        """
+        path = link.removeprefix("https://funpay.com").lstrip("/")
+        for endpoint in self.endpoint_classes:
+            if endpoint.pattern.search(path):
+                return endpoint
+        return self.endpoint_classes[-1]
+
+    @staticmethod
+    @contextmanager
+    def priority(priority: RequestPriorities) -> Iterator[None]:
+        """
+        Контекстный менеджер, задающий приоритет всех запросов внутри него (в текущем потоке / задаче asyncio)
+        вместо приоритета их класса.
+
+        :param priority: приоритет запросов.
+        """
+        token = _priority.set(priority)
+        try:
+            yield
+        finally:
+            _priority.reset(token)
+
+    @staticmethod
+    def get_priority(endpoint: EndpointClass) -> RequestPriorities:
+        """
+        Возвращает приоритет запроса с учетом :meth:`priority`.
+
+        :param endpoint: класс запроса.
+
+        :return: приоритет запроса.
+        """
+        return _priority.get() or endpoint.priority
+
+    def try_acquire(self, endpoint: EndpointClass, priority: RequestPriorities | None = None) -> float:
+        """
+        Пытается израсходовать токен на запрос.
+
+        :param endpoint: класс запроса.
+        :param priority: приоритет запроса (по умолчанию - см. :meth:`get_priority`).
+
+        :return: 0, если токен израсходован, иначе время (в секундах), через которое стоит попробовать снова.
+        """
+        priority = priority or self.get_priority(endpoint)
+        with self.__lock:
+            now = time.monotonic()
+            reserve = self.bucket.burst * self.LOW_PRIORITY_RESERVE if priority is RequestPriorities.LOW else 0
+            wait = max(self.bucket.get_wait_time(now, reserve), endpoint.bucket.get_wait_time(now))
+            if not wait and any(count for waiting_priority, count in self.__waiting.items()
+                                if waiting_priority.value < priority.value):
+                # Пропускаем вперед ожидающие запросы более высокого приоритета.
+                wait = 0.05
+            if wait:
+                return wait
+            self.bucket.tokens -= 1
+            endpoint.bucket.tokens -= 1
+            return 0
+
+    def acquire(self, link: str) -> EndpointClass:
+        """
+        Ожидает, пока запрос можно будет отправить, и расходует на него токен.
+
+        :param link: адрес запроса.
+
+        :return: класс запроса.
+        """
+        endpoint = self.classify(link)
+        priority = self.get_priority(endpoint)
+        wait = self.try_acquire(endpoint, priority)
+        if not wait:
+            return endpoint
+        with self.__lock:
+            self.__waiting[priority] += 1
+        try:
+            while wait:
+                with self.__lock:
+                    self.__lock.wait(wait)
+                wait = self.try_acquire(endpoint, priority)
+        finally:
+            with self.__lock:
+                self.__waiting[priority] -= 1
+                self.__lock.notify_all()
+        return endpoint
+
+    async def acquire_async(self, link: str) -> EndpointClass:
+        """
+        Асинхронный аналог :meth:`acquire`.
+        """
+        endpoint = self.classify(link)
+        priority = self.get_priority(endpoint)
+        wait = self.try_acquire(endpoint, priority)
+        if not wait:
+            return endpoint
+        with self.__lock:
+            self.__waiting[priority] += 1
+        try:
+            while wait:
+                await asyncio.sleep(wait)
+                wait = self.try_acquire(endpoint, priority)
+        finally:
+            with self.__lock:
+                self.__waiting[priority] -= 1
+                self.__lock.notify_all()
+        return endpoint
+
+    def on_throttled(self, endpoint: EndpointClass, retry_after: float | None = None) -> None:
+        """
+        Учитывает ответ 429: снижает частоту запросов и приостанавливает их.
+
+        :param endpoint: класс запроса.
+        :param retry_after: значение заголовка Retry-After (в секундах), если есть.
+        """
+        with self.__lock:
+            now = time.monotonic()
+            endpoint.throttled += 1
+            delay = retry_after if retry_after is not None else 1 / endpoint.bucket.rate
+            endpoint.bucket.penalize(now, delay)
+            self.bucket.penalize(now, delay if retry_after is not None else 0)
+        logger.warning(f"FunPay ограничил частоту запросов ({endpoint.name}). "
+                       f"Частота снижена до {endpoint.bucket.rate:.2f} запросов / сек.")
+
+    def on_success(self, endpoint: EndpointClass) -> None:
+        """
+        Учитывает успешный ответ: постепенно восстанавливает частоту запросов.
+
+        :param endpoint: класс запроса.
+        """
+        with self.__lock:
+            endpoint.bucket.recover()
+            self.bucket.recover()
+
+    @staticmethod
+    def get_retry_after(value: str | None) -> float | None:
+        """
+        Парсит значение заголовка Retry-After (кол-во секунд или HTTP дата).
+
+        :param value: значение заголовка.
+
+        :return: время ожидания (в секундах) или `None`, если заголовка нет или он некорректен.
+        """
+        if not value:
+            return None
+        try:
+            return max(float(value), 0)
+        except ValueError:
+            pass
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+        except (TypeError, ValueError):
+            return None
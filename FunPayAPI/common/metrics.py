@@ -0,0 +1,257 @@
+"""
+В данном модуле описан сбор метрик запросов к FunPay (:meth:`FunPayAPI.account.Account.method`).
+
+Запросы группируются по логическим методам API (см. :data:`METHOD_CLASSES`). Для каждого метода считаются
+гистограмма времени ответа, кол-во отправленных / полученных байт, кол-во ответов по статус-кодам, кол-во ошибок
+соединения, а также кол-во повторов urllib3 и время, потраченное на них.
+"""
+from __future__ import annotations
+from typing import Callable, Any
+
+from urllib3.util.retry import Retry
+import threading
+import requests
+import logging
+import time
+import re
+
+
+logger = logging.getLogger("FunPayAPI.metrics")
+
+_retries = threading.local()
+
+METHOD_CLASSES = [
+    ("runner", r"^runner/"),
+    ("chat_history", r"^chat/history"),
+    ("chat", r"^chat/"),
+    ("orders", r"^orders/"),
+    ("users", r"^users/"),
+    ("raise", r"^lots/raise"),
+    ("offer_save", r"^lots/offerSave"),
+    ("lots", r"^lots/"),
+    ("upload", r"^file/"),
+    ("main", r"^$"),
+    ("other", r"")
+]
+"""Логические методы API ([(название, регулярное выражение адреса (без https://funpay.com/))]).
+Запрос относится к первому подходящему методу."""
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, float("inf"))
+"""Верхние границы интервалов гистограммы времени ответа (в секундах)."""
+
+
+class TimedRetry(Retry):
+    """
+    Стратегия повторов urllib3, запоминающая (для текущего потока) момент окончания последнего ожидания перед
+    повтором. Используется :class:`RequestMetrics` для подсчета времени, потраченного на повторы.
+    """
+    def sleep(self, response=None) -> None:
+        super().sleep(response)
+        _retries.last = time.monotonic()
+
+
+class RequestSample:
+    """
+    Данные об одном запросе к FunPay (передаются в хуки :attr:`RequestMetrics.hooks`).
+    """
+    __slots__ = ("method", "link", "status", "latency", "sent", "received", "retries", "retry_time")
+
+    def __init__(self, method: str, link: str, status: int | None, latency: float, sent: int, received: int,
+                 retries: int, retry_time: float):
+        self.method: str = method
+        """Логический метод API."""
+        self.link: str = link
+        """Адрес запроса."""
+        self.status: int | None = status
+        """Статус-код ответа (`None`, если ответ не получен)."""
+        self.latency: float = latency
+        """Время выполнения запроса, включая повторы (в секундах)."""
+        self.sent: int = sent
+        """Размер тела запроса (в байтах)."""
+        self.received: int = received
+        """Размер тела ответа (в байтах)."""
+        self.retries: int = retries
+        """Кол-во повторов urllib3."""
+        self.retry_time: float = retry_time
+        """Время, потраченное на неудачные попытки и ожидание перед повторами (в секундах)."""
+
+
+class MethodStats:
+    """
+    Метрики запросов одного логического метода API.
+    """
+    __slots__ = ("requests", "errors", "latency_buckets", "latency_sum", "latency_max", "sent", "received",
+                 "statuses", "retries", "retry_time")
+
+    def __init__(self):
+        self.requests: int = 0
+        """Кол-во запросов."""
+        self.errors: int = 0
+        """Кол-во запросов, на которые не был получен ответ (ошибки соединения, тайм-ауты)."""
+        self.latency_buckets: list[int] = [0] * len(LATENCY_BUCKETS)
+        """Гистограмма времени ответа (кол-во запросов в интервалах :data:`LATENCY_BUCKETS`)."""
+        self.latency_sum: float = 0
+        """Суммарное время ответа (в секундах)."""
+        self.latency_max: float = 0
+        """Макс. время ответа (в секундах)."""
+        self.sent: int = 0
+        """Отправлено байт."""
+        self.received: int = 0
+        """Получено байт."""
+        self.statuses: dict[int, int] = {}
+        """Кол-во ответов по статус-кодам ({статус-код: кол-во})."""
+        self.retries: int = 0
+        """Кол-во повторов urllib3."""
+        self.retry_time: float = 0
+        """Время, потраченное на повторы urllib3 (в секундах)."""
+
+    def add(self, sample: RequestSample) -> None:
+        """
+        Учитывает запрос.
+
+        :param sample: данные о запросе.
+        """
+        self.requests += 1
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if sample.latency <= bound:
+                self.latency_buckets[i] += 1
+                break
+        self.latency_sum += sample.latency
+        self.latency_max = max(self.latency_max, sample.latency)
+        self.sent += sample.sent
+        self.received += sample.received
+        if sample.status is None:
+            self.errors += 1
+        else:
+            self.statuses[sample.status] = self.statuses.get(sample.status, 0) + 1
+        self.retries += sample.retries
+        self.retry_time += sample.retry_time
+
+    def percentile(self, q: float) -> float:
+        """
+        Оценивает перцентиль времени ответа по гистограмме (верхняя граница интервала, макс. время для последнего).
+
+        :param q: перцентиль (от 0 до 1).
+
+        :return: время ответа (в секундах).
+        """
+        if not self.requests:
+            return 0
+        rank, count = q * self.requests, 0
+        for bound, bucket in zip(LATENCY_BUCKETS, self.latency_buckets):
+            count += bucket
+            if count >= rank:
+                return min(bound, self.latency_max)
+        return self.latency_max
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        :return: метрики в виде словаря (для экспорта).
+        """
+        return {"requests": self.requests, "errors": self.errors,
+                "latency": {"sum": round(self.latency_sum, 4), "max": round(self.latency_max, 4),
+                            "p50": round(self.percentile(0.5), 4), "p95": round(self.percentile(0.95), 4),
+                            "buckets": {str(bound): count for bound, count in zip(LATENCY_BUCKETS,
+                                                                                   self.latency_buckets)}},
+                "sent": self.sent, "received": self.received,
+                "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+                "retries": self.retries, "retry_time": round(self.retry_time, 4)}
+
+
+class RequestMetrics:
+    """
+    Сборщик метрик запросов к FunPay.
+
+    :param method_classes: логические методы API (см. :data:`METHOD_CLASSES`).
+    :type method_classes: :obj:`list` of :obj:`tuple`, опционально
+    """
+    def __init__(self, method_classes: list[tuple[str, str]] | None = None):
+        self.method_classes: list[tuple[str, re.Pattern]] = [(name, re.compile(pattern)) for name, pattern
+                                                             in (method_classes or METHOD_CLASSES)]
+        """Логические методы API ([(название, регулярное выражение адреса)])."""
+        self.methods: dict[str, MethodStats] = {}
+        """Метрики по логическим методам API ({название: метрики})."""
+        self.hooks: list[Callable[[RequestSample], Any]] = []
+        """Функции, вызываемые после каждого запроса (принимают :class:`RequestSample`)."""
+        self.started: float = time.time()
+        """Время начала сбора метрик."""
+        self.__lock = threading.Lock()
+
+    def classify(self, link: str) -> str:
+        """
+        Определяет логический метод API по адресу.
+
+        :param link: адрес запроса (полный или без https://funpay.com/).
+
+        :return: название метода.
+        """
+        path = link.removeprefix("https://funpay.com").lstrip("/")
+        for name, pattern in self.method_classes:
+            if pattern.search(path):
+                return name
+        return self.method_classes[-1][0]
+
+    @staticmethod
+    def start() -> float:
+        """
+        Отмечает начало запроса в текущем потоке.
+
+        :return: время начала запроса (:func:`time.monotonic`), которое нужно передать в :meth:`record`.
+        """
+        _retries.last = None
+        return time.monotonic()
+
+    def record(self, link: str, started: float, response: requests.Response | None = None,
+               retries: int | None = None, retry_time: float | None = None) -> RequestSample:
+        """
+        Учитывает завершенный запрос и вызывает хуки.
+
+        :param link: адрес запроса.
+        :param started: время начала запроса (см. :meth:`start`).
+        :param response: ответ (`None`, если ответ не получен).
+        :param retries: кол-во повторов (по умолчанию - из истории повторов urllib3).
+        :param retry_time: время, потраченное на повторы (по умолчанию - до окончания последнего ожидания
+            :class:`TimedRetry` в текущем потоке).
+
+        :return: данные о запросе.
+        """
+        now = time.monotonic()
+        if retries is None:
+            history = getattr(getattr(getattr(response, "raw", None), "retries", None), "history", None)
+            retries = len(history) if history else 0
+        if retry_time is None:
+            last = getattr(_retries, "last", None)
+            retry_time = last - started if last is not None and last >= started else 0
+        sent, received = 0, 0
+        if response is not None:
+            sent = int(response.request.headers.get("Content-Length") or 0) if response.request is not None else 0
+            received = len(response.content)
+        sample = RequestSample(self.classify(link), link, response.status_code if response is not None else None,
+                               now - started, sent, received, retries, retry_time)
+
+        with self.__lock:
+            self.methods.setdefault(sample.method, MethodStats()).add(sample)
+        for hook in self.hooks:
+            try:
+                hook(sample)
+            except:
+                logger.error(f"Произошла ошибка при выполнении хука метрик {hook.__name__}.")
+                logger.debug("TRACEBACK", exc_info=True)
+        return sample
+
+    def get_stats(self) -> dict[str, dict[str, Any]]:
+        """
+        Возвращает метрики по логическим методам API.
+
+        :return: {название метода: метрики (см. :meth:`MethodStats.to_dict`)}.
+        """
+        with self.__lock:
+            return {name: stats.to_dict() for name, stats in sorted(self.methods.items())}
+
+    def reset(self) -> None:
+        """
+        Сбрасывает метрики.
+        """
+        with self.__lock:
+            self.methods.clear()
+            self.started = time.time()
@@ -0,0 +1,149 @@
+"""
+В данном модуле описан HTTP адаптер для :class:`requests.Session` аккаунта с настраиваемым пулом соединений
+и учетом его использования.
+
+Одна сессия используется потоком Runner'а, потоками поднятия лотов, хэндлерами и Telegram ботом одновременно.
+Если одновременных запросов больше, чем соединений в пуле, лишние соединения открываются заново и закрываются после
+запроса (или, если :attr:`AccountingHTTPAdapter.pool_block` = `True`, запросы ждут свободное соединение). Счетчики
+адаптера (:meth:`AccountingHTTPAdapter.get_stats`) показывают, как часто это происходит и какие потоки отправляют
+запросы.
+"""
+from __future__ import annotations
+from typing import Any
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.timeout import Timeout
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import requests
+import logging
+
+
+logger = logging.getLogger("FunPayAPI.pool")
+
+
+class AccountingHTTPAdapter(HTTPAdapter):
+    """
+    HTTP адаптер с настраиваемым пулом соединений, учетом запросов и предварительным открытием соединений.
+
+    :param pool_maxsize: макс. кол-во соединений, которые хранятся в пуле для повторного использования.
+    :type pool_maxsize: :obj:`int`, опционально
+
+    :param pool_block: ждать ли свободное соединение, если все соединения пула заняты (иначе открывается
+        временное соединение).
+    :type pool_block: :obj:`bool`, опционально
+
+    :param kwargs: остальные аргументы :class:`requests.adapters.HTTPAdapter` (например, `max_retries`).
+    """
+    def __init__(self, pool_maxsize: int = 10, pool_block: bool = False, **kwargs):
+        self.__lock = threading.Lock()
+        self.requests: int = 0
+        """Кол-во отправленных запросов."""
+        self.in_flight: int = 0
+        """Кол-во выполняющихся запросов."""
+        self.peak_in_flight: int = 0
+        """Макс. кол-во одновременно выполнявшихся запросов."""
+        self.exhausted: int = 0
+        """Кол-во запросов, отправленных, когда все соединения пула были заняты."""
+        self.threads: dict[str, int] = {}
+        """Кол-во запросов по потокам ({название потока: кол-во})."""
+        self.warmed: int = 0
+        """Кол-во соединений, открытых заранее (:meth:`warm_up`)."""
+        super().__init__(pool_maxsize=pool_maxsize, pool_block=pool_block, **kwargs)
+
+    @property
+    def pool_maxsize(self) -> int:
+        """Макс. кол-во соединений в пуле."""
+        return self._pool_maxsize
+
+    @property
+    def pool_block(self) -> bool:
+        """Ждут ли запросы свободное соединение, если все соединения пула заняты."""
+        return self._pool_block
+
+    def send(self, request, *args, **kwargs):
+        thread = threading.current_thread().name
+        with self.__lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            if self.in_flight > self._pool_maxsize:
+                self.exhausted += 1
+            self.threads[thread] = self.threads.get(thread, 0) + 1
+        try:
+            return super().send(request, *args, **kwargs)
+        finally:
+            with self.__lock:
+                self.in_flight -= 1
+
+    def __get_pools(self) -> list:
+        managers = [self.poolmanager, *self.proxy_manager.values()]
+        pools = []
+        for manager in managers:
+            container = manager.pools
+            with container.lock:
+                pools.extend(container._container.values())
+        return pools
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Возвращает счетчики использования пула.
+
+        :return: {"requests": кол-во запросов, "in_flight": кол-во выполняющихся запросов, "peak_in_flight": макс. кол-во
+            одновременных запросов, "exhausted": кол-во запросов при занятом пуле, "connections": кол-во открытых
+            соединений, "reused": кол-во запросов через уже открытое соединение, "pool_maxsize": размер пула,
+            "threads": {название потока: кол-во запросов}}.
+        """
+        pools = self.__get_pools()
+        connections = sum(pool.num_connections for pool in pools)
+        pool_requests = sum(pool.num_requests for pool in pools)
+        with self.__lock:
+            return {"requests": self.requests, "in_flight": self.in_flight, "peak_in_flight": self.peak_in_flight,
+                    "exhausted": self.exhausted, "connections": connections,
+                    "reused": max(pool_requests - connections, 0), "pool_maxsize": self._pool_maxsize,
+                    "threads": dict(self.threads)}
+
+    def warm_up(self, url: str, connections: int = 2, proxies: dict | None = None,
+                timeout: int | float = 5, verify: bool | str = True) -> int:
+        """
+        Заранее открывает соединения с хостом и оставляет их в пуле, чтобы первые запросы не тратили время
+        на установку соединения (TCP + TLS).
+
+        Соединения открываются одновременными HEAD запросами (без повторов) через тот же пул, что и обычные запросы,
+        поэтому прокси и туннель (CONNECT) настраиваются urllib3 так же, как для обычных запросов.
+
+        :param url: адрес хоста (например, https://funpay.com).
+        :param connections: кол-во соединений (не больше размера пула).
+        :param proxies: прокси (как в :meth:`requests.Session.request`).
+        :param timeout: тайм-аут подключения и ожидания ответа (в секундах).
+        :param verify: проверка сертификата (как в :meth:`requests.Session.request`). Должна совпадать с проверкой
+            обычных запросов (с учетом REQUESTS_CA_BUNDLE), иначе соединения откроются в другом пуле.
+
+        :return: кол-во открытых соединений.
+        """
+        proxies = proxies or {}
+        request = requests.Request("HEAD", url).prepare()
+        if hasattr(self, "get_connection_with_tls_context"):
+            pool = self.get_connection_with_tls_context(request, verify, proxies)
+        else:  # requests < 2.32.2
+            pool = self.get_connection(url, proxies)
+        self.cert_verify(pool, url, verify, None)
+        link = self.request_url(request, proxies)
+        self.add_headers(request)
+        before = pool.num_connections
+
+        def head():
+            pool.urlopen("HEAD", link, headers=request.headers, redirect=False, assert_same_host=False,
+                         retries=False, timeout=Timeout(connect=timeout, read=timeout))
+
+        count = min(connections, self._pool_maxsize)
+        with ThreadPoolExecutor(count, thread_name_prefix="FunPayAPI.warm_up") as executor:
+            results = [executor.submit(head) for _ in range(count)]
+        errors = [i.exception() for i in results if i.exception() is not None]
+        opened = min(pool.num_connections - before, count - len(errors))
+        with self.__lock:
+            self.warmed += opened
+        if errors and not opened:
+            raise errors[0]
+        logger.debug(f"Открыто соединений с {url}: {opened}.")
+        return opened
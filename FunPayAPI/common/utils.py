@@ -1,10 +1,20 @@
 """
 В данном модуле написаны вспомогательные функции.
 """
+from __future__ import annotations
+from typing import Any, Callable, Hashable
 
 import string
 import random
+import importlib.util
+import threading
+import logging
+import time
 import re
+from html.parser import HTMLParser
+
+
+logger = logging.getLogger("FunPayAPI.utils")
 
 
 MONTHS = {
@@ -23,6 +33,37 @@ MONTHS = {
 }
 
 
+HTML_PARSERS = {
+    "html.parser": None,
+    "lxml": "lxml",
+    "html5lib": "html5lib"
+}
+"""
+Поддерживаемые бэкенды BeautifulSoup ({название бэкенда: модуль, необходимый для его работы}).
+"""
+
+
+def resolve_html_parser(name: str) -> str:
+    """
+    Проверяет, доступен ли указанный бэкенд парсинга HTML.
+    Если бэкенд неизвестен или необходимый для него модуль не установлен, возвращает встроенный "html.parser".
+
+    :param name: название бэкенда ("html.parser", "lxml", "html5lib").
+    :type name: :obj:`str`
+
+    :return: название доступного бэкенда.
+    :rtype: :obj:`str`
+    """
+    if name not in HTML_PARSERS:
+        logger.warning(f"Неизвестный бэкенд парсинга HTML \"{name}\". Использую \"html.parser\".")
+        return "html.parser"
+    module = HTML_PARSERS[name]
+    if module and importlib.util.find_spec(module) is None:
+        logger.warning(f"Модуль {module} не установлен. Использую \"html.parser\" вместо \"{name}\".")
+        return "html.parser"
+    return name
+
+
 def get_currency_code(currency_symbol: str) -> str | None:
     if currency_symbol == "₽":
         return "RUB"
@@ -70,6 +111,183 @@ def parse_wait_time(response: str) -> int:
         return 10
 
 
+class MessageHTMLExtractor(HTMLParser):
+    """
+    Легковесный извлекатель данных из HTML сообщения (без построения дерева BeautifulSoup).
+
+    Извлекает те же данные, что и :meth:`FunPayAPI.account.Account._Account__parse_messages`:
+    ник и бейдж автора (div.media-user-name), ссылку на изображение (a.chat-img-link),
+    текст сообщения (div.chat-msg-text) и текст системного сообщения (div.alert.alert-with-icon.alert-info).
+    """
+    VOID_TAGS = frozenset({"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param",
+                           "source", "track", "wbr"})
+    """Теги без закрывающего тега."""
+
+    def __init__(self):
+        super(MessageHTMLExtractor, self).__init__(convert_charrefs=True)
+        self.author_div_found: bool = False
+        """Найден ли блок с данными об авторе сообщения."""
+        self.author: str | None = None
+        """Ник автора сообщения (текст первой ссылки в блоке автора)."""
+        self.badge: str | None = None
+        """Бейдж автора сообщения (текст первого span в блоке автора)."""
+        self.image_link: str | None = None
+        """Ссылка на изображение."""
+        self.text: str | None = None
+        """Текст сообщения."""
+        self.alert_text: str | None = None
+        """Текст системного сообщения."""
+        self.__stack: list[str] = []
+        self.__captures: list[list] = []  # [название поля, глубина, буфер]
+
+    def extract(self, html: str) -> MessageHTMLExtractor:
+        """
+        Парсит HTML сообщения.
+
+        :param html: HTML сообщения.
+        :type html: :obj:`str`
+
+        :return: этот же объект с заполненными полями.
+        :rtype: :class:`FunPayAPI.common.utils.MessageHTMLExtractor`
+        """
+        self.feed(html)
+        self.close()
+        for field, _, buffer in self.__captures:
+            self.__finish_capture(field, buffer)
+        self.__captures.clear()
+        return self
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.VOID_TAGS:
+            return
+        attrs = dict(attrs)
+        css = attrs.get("class") or ""
+        classes = css.split()
+        self.__stack.append(tag)
+        depth = len(self.__stack)
+
+        if tag == "div":
+            if not self.author_div_found and "media-user-name" in classes:
+                self.author_div_found = True
+                self.__captures.append(["author_div", depth, None])
+            elif self.text is None and "chat-msg-text" in classes:
+                self.text = ""
+                self.__captures.append(["text", depth, []])
+            elif self.alert_text is None and css == "alert alert-with-icon alert-info":
+                self.alert_text = ""
+                self.__captures.append(["alert_text", depth, []])
+        elif tag == "a" and self.image_link is None and "chat-img-link" in classes:
+            self.image_link = attrs.get("href")
+
+        if any(i[0] == "author_div" for i in self.__captures):
+            if tag == "a" and self.author is None:
+                self.author = ""
+                self.__captures.append(["author", depth, []])
+            elif tag == "span" and self.badge is None:
+                self.badge = ""
+                self.__captures.append(["badge", depth, []])
+
+    def handle_endtag(self, tag):
+        if tag not in self.__stack:
+            return
+        while self.__stack:
+            closed = self.__stack.pop()
+            depth = len(self.__stack)
+            while self.__captures and self.__captures[-1][1] > depth:
+                field, _, buffer = self.__captures.pop()
+                self.__finish_capture(field, buffer)
+            if closed == tag:
+                break
+
+    def handle_data(self, data):
+        for _, _, buffer in self.__captures:
+            if buffer is not None:
+                buffer.append(data)
+
+    def __finish_capture(self, field: str, buffer: list[str] | None):
+        if buffer is not None:
+            setattr(self, field, "".join(buffer))
+
+
+class SingleFlight:
+    """
+    Объединяет одновременные одинаковые вызовы: пока вызов с некоторым ключом выполняется, остальные вызовы с тем же
+    ключом не выполняются, а ждут и получают его результат (или исключение). Результат можно дополнительно хранить
+    `ttl` секунд.
+    """
+    class _Call:
+        __slots__ = ("event", "result", "error")
+
+        def __init__(self):
+            self.event = threading.Event()
+            self.result: Any = None
+            self.error: BaseException | None = None
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__calls: dict[Hashable, SingleFlight._Call] = {}
+        self.__results: dict[Hashable, tuple[float, Any]] = {}
+        self.coalesced: int = 0
+        """Кол-во вызовов, получивших результат чужого вызова (в т.ч. сохраненный результат)."""
+
+    def do(self, key: Hashable, func: Callable[[], Any], ttl: int | float = 0) -> Any:
+        """
+        Выполняет `func` или ждет результат уже выполняющегося вызова с тем же ключом.
+
+        :param key: ключ вызова.
+        :param func: функция без аргументов.
+        :param ttl: время (в секундах), в течение которого результат выдается без повторного вызова.
+
+        :return: результат `func`.
+        """
+        with self.__lock:
+            if (saved := self.__results.get(key)) is not None:
+                if saved[0] > time.monotonic():
+                    self.coalesced += 1
+                    return saved[1]
+                del self.__results[key]
+            call = self.__calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.__calls[key] = SingleFlight._Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+        else:
+            try:
+                call.result = func()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self.__lock:
+                    del self.__calls[key]
+                    if call.error is None and ttl > 0:
+                        self.__results[key] = (time.monotonic() + ttl, call.result)
+                call.event.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def forget(self, key: Hashable | None = None, prefix: bool = False) -> None:
+        """
+        Удаляет сохраненный результат (не влияет на выполняющиеся вызовы).
+
+        :param key: ключ вызова (если не указан - удаляет все сохраненные результаты).
+        :param prefix: удалить результаты всех вызовов, ключи которых (кортежи) начинаются с `key`.
+        """
+        with self.__lock:
+            if key is None:
+                self.__results.clear()
+            elif prefix:
+                for i in [i for i in self.__results if isinstance(i, tuple) and i[:len(key)] == key]:
+                    del self.__results[i]
+            else:
+                self.__results.pop(key, None)
+
+
 class RegularExpressions(object):
     """
     В данном классе хранятся скомпилированные регулярные выражения, описывающие системные сообщения FunPay и прочие
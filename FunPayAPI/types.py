@@ -6,6 +6,43 @@ from typing import Literal, overload, Optional
 from .common.utils import RegularExpressions, get_currency_code
 from .common.enums import MessageTypes, OrderStatuses, SubCategoryTypes
 import datetime
+import zlib
+
+
+class CompressedHTML:
+    """
+    HTML код, сжатый с помощью zlib (используется, если :py:obj:`FunPayAPI.account.Account.html_retention` ==
+    "compressed").
+
+    :param html: HTML код.
+    :type html: :obj:`str`
+    """
+    __slots__ = ("data", )
+
+    def __init__(self, html: str):
+        self.data: bytes = zlib.compress(html.encode(), 6)
+        """Сжатый HTML код."""
+
+    def __str__(self):
+        return zlib.decompress(self.data).decode()
+
+
+class HTMLAttribute:
+    """
+    Дескриптор атрибута с HTML кодом. Хранит значение как есть (:obj:`str`, :class:`CompressedHTML` или `None`)
+    и распаковывает сжатый HTML при обращении.
+    """
+    def __set_name__(self, owner, name):
+        self.name = f"_{name}"
+
+    def __get__(self, instance, owner=None) -> str | None:
+        if instance is None:
+            return self
+        value = getattr(instance, self.name, None)
+        return str(value) if isinstance(value, CompressedHTML) else value
+
+    def __set__(self, instance, value: str | CompressedHTML | None):
+        setattr(instance, self.name, value)
 
 
 class ChatShortcut:
@@ -30,6 +67,9 @@ class ChatShortcut:
     :param determine_msg_type: определять ли тип последнего сообщения?
     :type determine_msg_type: :obj:`bool`, опционально
     """
+    __slots__ = ("id", "name", "last_message_text", "unread", "last_message_type", "_html")
+    html = HTMLAttribute()
+
     def __init__(self, id_: int, name: str, last_message_text: str,
                  unread: bool, html: str, determine_msg_type: bool = True):
         self.id: int = id_
@@ -42,7 +82,7 @@ class ChatShortcut:
         """Флаг \"непрочитанности\" (если True - в чате есть непрочитанные сообщения)."""
         self.last_message_type: MessageTypes | None = None if not determine_msg_type else self.get_last_message_type()
         """Тип последнего сообщения."""
-        self.html: str = html
+        self.html: str | None = html
         """HTML код виджета чата."""
 
     def get_last_message_type(self) -> MessageTypes:
@@ -118,6 +158,8 @@ class Chat:
     :param messages: последние 100 сообщений чата.
     :type messages: :obj:`list` of :class:`FunPayAPI.types.Message` or :obj:`None`
     """
+    html = HTMLAttribute()
+
     def __init__(self, id_: int, name: str, looking_link: str | None, looking_text: str | None,
                  html: str, messages: Optional[list[Message]] = None):
         self.id: int = id_
@@ -128,7 +170,7 @@ class Chat:
         """Ссылка на лот, который в данный момент смотрит собеседник."""
         self.looking_text: str | None = looking_text
         """Название лота, который в данный момент смотрит собеседник."""
-        self.html: str = html
+        self.html: str | None = html
         """HTML код чата."""
         self.messages: list[Message] = messages or []
         """Последние 100 сообщений чата."""
@@ -165,6 +207,10 @@ class Message:
     :param determine_msg_type: определять ли тип сообщения.
     :type determine_msg_type: :obj:`bool`, опционально
     """
+    __slots__ = ("id", "text", "chat_id", "chat_name", "type", "author", "author_id", "_html", "image_link", "by_bot",
+                 "badge")
+    html = HTMLAttribute()
+
     def __init__(self, id_: int, text: str | None, chat_id: int | str, chat_name: str | None,
                  author: str | None, author_id: int, html: str,
                  image_link: str | None = None, determine_msg_type: bool = True, badge_text: Optional[str] = None):
@@ -182,7 +228,7 @@ class Message:
         """Автор сообщения."""
         self.author_id: int = author_id
         """ID автора сообщения."""
-        self.html: str = html
+        self.html: str | None = html
         """HTML-код сообщения."""
         self.image_link: str | None = image_link
         """Ссылка на изображение в сообщении (если оно есть)."""
@@ -281,10 +327,18 @@ class OrderShortcut:
 
     :param dont_search_amount: не искать кол-во товара.
     :type dont_search_amount: :obj:`bool`, опционально
+
+    :param date_left: время, прошедшее с оплаты заказа, как его показывает FunPay (например, "2 часа назад").
+    :type date_left: :obj:`str` or :obj:`None`, опционально
     """
+    __slots__ = ("id", "description", "price", "currency", "amount", "buyer_username", "buyer_id", "status", "date",
+                 "date_left", "subcategory_name", "_html")
+    html = HTMLAttribute()
+
     def __init__(self, id_: str, description: str, price: float, currency: Literal["RUB", "USD", "EUR"],
                  buyer_username: str, buyer_id: int, status: OrderStatuses,
-                 date: datetime.datetime, subcategory_name: str, html: str, dont_search_amount: bool = False):
+                 date: datetime.datetime, subcategory_name: str, html: str, dont_search_amount: bool = False,
+                 date_left: str | None = None):
         self.id: str = id_ if not id_.startswith("#") else id_[1:]
         """ID заказа."""
         self.description: str = description
@@ -303,9 +357,12 @@ class OrderShortcut:
         """Статус заказа."""
         self.date: datetime.datetime = date
         """Дата создания заказа."""
+        self.date_left: str | None = date_left
+        """Время, прошедшее с оплаты заказа (текст FunPay, например, "2 часа назад"). Считается сервером FunPay,
+        поэтому не зависит от часового пояса бота."""
         self.subcategory_name: str = subcategory_name
         """Название подкатегории, к которой относится заказ."""
-        self.html: str = html
+        self.html: str | None = html
         """HTML код виджета заказа."""
 
     def parse_amount(self) -> int:
@@ -374,6 +431,8 @@ class Order:
     :param review: объект отзыва на заказ.
     :type review: :class:`FunPayAPI.types.Review` or :obj:`None`
     """
+    html = HTMLAttribute()
+
     def __init__(self, id_: str, status: OrderStatuses, amount: int, subcategory: SubCategory,
                  short_description: str | None, full_description: str | None, sum_: float,
                  buyer_id: int, buyer_username: str, seller_id: int, seller_username: str,
@@ -402,7 +461,7 @@ class Order:
         """ID продавца."""
         self.seller_username: str = seller_username
         """Никнейм продавца."""
-        self.html: str = html
+        self.html: str | None = html
         """HTML код заказа."""
         self.fields: dict = fields
         """Поля заказа."""
@@ -657,6 +716,10 @@ class LotShortcut:
     :param html: HTML код виджета лота.
     :type html: :obj:`str`
     """
+    __slots__ = ("id", "server", "description", "title", "price", "currency", "subcategory", "my_lot", "seller", "amount",
+                 "auto_delivery", "promo", "_html", "public_link")
+    html = HTMLAttribute()
+
     def __init__(self, id_: int | str, server: str | None, description: str | None,
                  price: float, currency: Literal["RUB", "USD", "EUR"] | None, subcategory: SubCategory,
                  my_lot: bool, seller: SellerShortcut | None, amount: int | None,
@@ -687,7 +750,7 @@ class LotShortcut:
         """Автоматическая доставка."""
         self.promo: bool = promo
         """Промо-лот."""
-        self.html: str = html
+        self.html: str | None = html
         """HTML-код виджета лота."""
         self.public_link: str = f"https://funpay.com/chips/offer?id={self.id}" \
             if self.subcategory.type is SubCategoryTypes.CURRENCY else f"https://funpay.com/lots/offer?id={self.id}"
@@ -719,6 +782,8 @@ class SellerShortcut:
     :param html: HTML код виджета продавца.
     :type html: :obj:`str`
     """
+    html = HTMLAttribute()
+
     def __init__(self, username: str, seller_id: int, seller_online: bool,
                  avatar_link: str, stars_amount: int,
                  reviews_amount: int, html: str) -> None:
@@ -734,7 +799,7 @@ class SellerShortcut:
         """Кол-во звезд продавца."""
         self.reviews_amount: int = reviews_amount
         """Кол-во отзывов продавца."""
-        self.html: str = html
+        self.html: str | None = html
         """HTML код виджета продавца."""
 
     @property
@@ -771,6 +836,8 @@ class MyLotShortcut:
     :param html: HTML код виджета лота.
     :type html: :obj:`str`
     """
+    html = HTMLAttribute()
+
     def __init__(self, id_: int, description: str, price: float, is_active: bool,
                  auto_delivery: bool, server: str | None, amount: int | None, html: str) -> None:
         self.id: int = id_
@@ -787,7 +854,7 @@ class MyLotShortcut:
         """Название сервера (если указан)."""
         self.amount: int | None = amount
         """Кол-во товара."""
-        self.html: str = html
+        self.html: str | None = html
         """HTML-код виджета лота."""
 
 
@@ -820,6 +887,8 @@ class UserProfile:
     :param html: HTML код страницы пользователя.
     :type html: :obj:`str`
     """
+    html = HTMLAttribute()
+
     def __init__(self, id_: int, username: str, profile_photo: str, online: bool,
                  banned: bool, rating: float | None, reviews_amount: int, html: str):
         self.id: int = id_
@@ -836,7 +905,7 @@ class UserProfile:
         """Кол-во звезд пользователя."""
         self.reviews_amount: int = reviews_amount
         """Кол-во отзывов пользователя."""
-        self.html: str = html
+        self.html: str | None = html
         """HTML код страницы пользователя."""
         self.__lots: list[LotShortcut] = []
         """Все лоты пользователя."""
@@ -973,6 +1042,8 @@ class Review:
     :param author_id: ID автора отзыва.
     :type author_id: :obj:`int` or :obj:`None`, опционально
     """
+    html = HTMLAttribute()
+
     def __init__(self, stars: int | None, text: str | None, reply: str | None, anonymous: bool, html: str,
                  order_id: str | None = None, author: str | None = None, author_id: int | None = None):
         self.stars: int | None = stars
@@ -983,7 +1054,7 @@ class Review:
         """Текст ответа на отзыв."""
         self.anonymous: bool = anonymous
         """Анонимный ли отзыв?"""
-        self.html: str = html
+        self.html: str | None = html
         """HTML код отзыва."""
         self.order_id: str | None = order_id[1:] if order_id and order_id.startswith("#") else order_id
         """ID заказа, к которому относится отзыв."""
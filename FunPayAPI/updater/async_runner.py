@@ -0,0 +1,190 @@
+"""
+В данном модуле описан асинхронный аналог класса :class:`FunPayAPI.updater.runner.Runner`.
+Парсинг событий общий с синхронным классом.
+"""
+from __future__ import annotations
+from typing import TYPE_CHECKING, AsyncGenerator
+
+if TYPE_CHECKING:
+    from ..async_account import AsyncAccount
+
+import asyncio
+import logging
+
+from ..common import exceptions
+from ..common.enums import RequestPriorities
+from .runner import Runner
+from .events import *
+
+
+logger = logging.getLogger("FunPayAPI.async_runner")
+
+
+class AsyncRunner(Runner):
+    """
+    Асинхронный аналог класса :class:`FunPayAPI.updater.runner.Runner`.
+
+    :param account: экземпляр асинхронного аккаунта (должен быть инициализирован с помощью метода
+        :meth:`FunPayAPI.async_account.AsyncAccount.get`).
+    :type account: :class:`FunPayAPI.async_account.AsyncAccount`
+
+    :param disable_message_requests: отключить ли запросы для получения истории чатов?
+    :type disable_message_requests: :obj:`bool`, опционально
+
+    :param disabled_order_requests: отключить ли запросы для получения списка заказов?
+    :type disabled_order_requests: :obj:`bool`, опционально
+
+    :param chat_requests_concurrency: максимальное кол-во одновременных запросов для получения истории чатов.
+    :type chat_requests_concurrency: :obj:`int`, опционально
+    """
+    def __init__(self, account: AsyncAccount, disable_message_requests: bool = False,
+                 disabled_order_requests: bool = False, chat_requests_concurrency: int = 1):
+        super(AsyncRunner, self).__init__(account, disable_message_requests, disabled_order_requests,
+                                          chat_requests_concurrency)
+        self.account: AsyncAccount = account
+        """Экземпляр аккаунта, к которому привязан AsyncRunner."""
+
+    async def get_updates(self) -> dict:
+        """
+        Асинхронный аналог :meth:`FunPayAPI.updater.runner.Runner.get_updates`.
+        """
+        headers, payload = self._updates_request()
+        response = await self.account.async_method("post", "runner/", headers, payload, raise_not_200=True)
+        return response.json()
+
+    async def parse_updates(self, updates: dict) -> AsyncGenerator[InitialChatEvent | ChatsListChangedEvent |
+                                                                   LastChatMessageChangedEvent | NewMessageEvent |
+                                                                   InitialOrderEvent | OrdersListChangedEvent |
+                                                                   NewOrderEvent | OrderStatusChangedEvent, None]:
+        """
+        Асинхронный аналог :meth:`FunPayAPI.updater.runner.Runner.parse_updates`.
+        """
+        for obj in updates["objects"]:
+            if obj.get("type") == "chat_bookmarks":
+                async for event in self.parse_chat_updates(obj):
+                    yield event
+            elif obj.get("type") == "orders_counters":
+                for event in await self.parse_order_updates(obj):
+                    yield event
+
+        self._end_first_request()
+
+    async def parse_chat_updates(self, obj) -> AsyncGenerator[InitialChatEvent | ChatsListChangedEvent |
+                                                              LastChatMessageChangedEvent | NewMessageEvent, None]:
+        """
+        Асинхронный аналог :meth:`FunPayAPI.updater.runner.Runner.parse_chat_updates`.
+        """
+        events, lcmc_events = self._parse_chats_list(obj)
+        for event in events:
+            yield event
+        if not self.make_msg_requests:
+            for event in lcmc_events:
+                yield event
+            return
+
+        chats_packs = self._split_chats_packs(lcmc_events)
+        semaphore = asyncio.Semaphore(self.chat_requests_concurrency)
+
+        async def get_pack_histories(chats_pack: list[LastChatMessageChangedEvent]):
+            async with semaphore:
+                return await self._get_chats_histories({i.chat.id: i.chat.name for i in chats_pack})
+
+        # Истории чатов запрашиваются параллельно, а события генерируются последовательно в исходном порядке.
+        tasks = [asyncio.create_task(get_pack_histories(i)) for i in chats_packs]
+        try:
+            for chats_pack, task in zip(chats_packs, tasks):
+                chats = await task
+                new_msg_events = self._process_chats_histories(chats) if chats is not None else {}
+                for event in self._merge_chats_pack(chats_pack, new_msg_events):
+                    yield event
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def generate_new_message_events(self, chats_data: dict[int, str]) -> dict[int, list[NewMessageEvent]]:
+        """
+        Асинхронный аналог :meth:`FunPayAPI.updater.runner.Runner.generate_new_message_events`.
+        """
+        chats = await self._get_chats_histories(chats_data)
+        if chats is None:
+            return {}
+        return self._process_chats_histories(chats)
+
+    async def _get_chats_histories(self, chats_data: dict[int, str]) -> dict[int, list[types.Message]] | None:
+        """
+        Асинхронный аналог :meth:`FunPayAPI.updater.runner.Runner._get_chats_histories`.
+        """
+        attempts = 3
+        while attempts:
+            attempts -= 1
+            try:
+                chats = await self.account.get_chats_histories(chats_data)
+                break
+            except exceptions.RequestFailedError as e:
+                logger.error(e)
+            except:
+                logger.error(f"Не удалось получить истории чатов {list(chats_data.keys())}.")
+                logger.debug("TRACEBACK", exc_info=True)
+            await asyncio.sleep(1)
+        else:
+            logger.error(f"Не удалось получить истории чатов {list(chats_data.keys())}: превышено кол-во попыток.")
+            return None
+        return chats
+
+    async def parse_order_updates(self, obj) -> list[InitialOrderEvent | OrdersListChangedEvent | NewOrderEvent |
+                                                     OrderStatusChangedEvent]:
+        """
+        Асинхронный аналог :meth:`FunPayAPI.updater.runner.Runner.parse_order_updates`.
+        """
+        events = self._parse_orders_counters(obj)
+        if not self.make_order_requests:
+            return events
+
+        attempts = 3
+        while attempts:
+            attempts -= 1
+            try:
+                with self.account.limiter.priority(RequestPriorities.HIGH):
+                    orders_list = await self.account.get_sells(known_orders=self.saved_orders)
+                break
+            except exceptions.RequestFailedError as e:
+                logger.error(e)
+            except:
+                logger.error("Не удалось обновить список заказов.")
+                logger.debug("TRACEBACK", exc_info=True)
+            await asyncio.sleep(1)
+        else:
+            logger.error("Не удалось обновить список продаж: превышено кол-во попыток.")
+            return events
+        events.extend(self._process_orders_list(orders_list[1]))
+        return events
+
+    async def listen(self, requests_delay: int | float = 6.0,
+                     ignore_exceptions: bool = True) -> AsyncGenerator[InitialChatEvent | ChatsListChangedEvent |
+                                                                       LastChatMessageChangedEvent | NewMessageEvent |
+                                                                       InitialOrderEvent | OrdersListChangedEvent |
+                                                                       NewOrderEvent | OrderStatusChangedEvent, None]:
+        """
+        Асинхронный аналог :meth:`FunPayAPI.updater.runner.Runner.listen`.
+
+        :param requests_delay: задержка между запросами (в секундах).
+        :type requests_delay: :obj:`int` or :obj:`float`, опционально
+
+        :param ignore_exceptions: игнорировать ошибки?
+        :type ignore_exceptions: :obj:`bool`, опционально
+
+        :return: асинхронный генератор событий FunPay.
+        """
+        while True:
+            try:
+                updates = await self.get_updates()
+                async for event in self.parse_updates(updates):
+                    yield event
+            except Exception as e:
+                if not ignore_exceptions:
+                    raise e
+                else:
+                    logger.error("Произошла ошибка при получении событий. "
+                                 "(ничего страшного, если это сообщение появляется нечасто).")
+                    logger.debug("TRACEBACK", exc_info=True)
+            await asyncio.sleep(requests_delay)
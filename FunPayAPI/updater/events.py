@@ -1,4 +1,5 @@
 from __future__ import annotations
+from typing import Any
 import time
 from ..common import utils
 from ..common.enums import *
@@ -9,6 +10,10 @@ class BaseEvent:
     """
     Базовый класс события.
 
+    События используют __slots__. Атрибуты, не объявленные в классе события (например, добавленные хэндлерами
+    с помощью setattr), сохраняются в __dict__ события (см. :py:obj:`extra`), который создается только при
+    добавлении первого такого атрибута.
+
     :param runner_tag: тег Runner'а.
     :type runner_tag: :obj:`str`
 
@@ -18,11 +23,20 @@ class BaseEvent:
     :param event_time: время события (лучше не указывать, будет генерироваться автоматически).
     :type event_time: :obj:`int` or :obj:`float` or :obj:`None`, опционально.
     """
+    __slots__ = ("runner_tag", "type", "time", "__dict__")
+
     def __init__(self, runner_tag: str, event_type: EventTypes, event_time: int | float | None = None):
         self.runner_tag = runner_tag
         self.type = event_type
         self.time = event_time if event_type is not None else time.time()
 
+    @property
+    def extra(self) -> dict[str, Any]:
+        """
+        Дополнительные атрибуты события, добавленные хэндлерами ({название атрибута: значение}).
+        """
+        return self.__dict__
+
 
 class InitialChatEvent(BaseEvent):
     """
@@ -34,6 +48,8 @@ class InitialChatEvent(BaseEvent):
     :param chat_obj: объект обнаруженного чата.
     :type chat_obj: :class:`FunPayAPI.types.ChatShortcut`
     """
+    __slots__ = ("chat", )
+
     def __init__(self, runner_tag: str, chat_obj: types.ChatShortcut):
         super(InitialChatEvent, self).__init__(runner_tag, EventTypes.INITIAL_CHAT)
         self.chat: types.ChatShortcut = chat_obj
@@ -47,6 +63,8 @@ class ChatsListChangedEvent(BaseEvent):
     :param runner_tag: тег Runner'а.
     :type runner_tag: :obj:`str`
     """
+    __slots__ = ()
+
     def __init__(self, runner_tag: str):
         super(ChatsListChangedEvent, self).__init__(runner_tag, EventTypes.CHATS_LIST_CHANGED)
         # todo: добавить список всех чатов.
@@ -62,6 +80,8 @@ class LastChatMessageChangedEvent(BaseEvent):
     :param chat_obj: объект чата, в котором изменилось полседнее сообщение.
     :type chat_obj: :class:`FunPayAPI.types.ChatShortcut`
     """
+    __slots__ = ("chat", )
+
     def __init__(self, runner_tag: str, chat_obj: types.ChatShortcut):
         super(LastChatMessageChangedEvent, self).__init__(runner_tag, EventTypes.LAST_CHAT_MESSAGE_CHANGED)
         self.chat: types.ChatShortcut = chat_obj
@@ -81,6 +101,8 @@ class NewMessageEvent(BaseEvent):
     :param stack: объект стэка событий новых собщений.
     :type stack: :class:`FunPayAPI.updater.events.MessageEventsStack` or :obj:`None`, опционально
     """
+    __slots__ = ("message", "stack")
+
     def __init__(self, runner_tag: str, message_obj: types.Message, stack: MessageEventsStack | None = None):
         super(NewMessageEvent, self).__init__(runner_tag, EventTypes.NEW_MESSAGE)
         self.message: types.Message = message_obj
@@ -94,6 +116,8 @@ class MessageEventsStack:
     Данный класс представляет стэк событий новых сообщений.
     Нужен для того, чтобы сразу предоставить доступ ко всем событиям новых сообщений от одного пользователя и одного запроса Runner'а.
     """
+    __slots__ = ("__id", "__stack")
+
     def __init__(self):
         self.__id = utils.random_tag()
         self.__stack = []
@@ -136,6 +160,8 @@ class InitialOrderEvent(BaseEvent):
     :param order_obj: объект обнаруженного заказа.
     :type order_obj: :class:`FunPayAPI.types.OrderShortcut`
     """
+    __slots__ = ("order", )
+
     def __init__(self, runner_tag: str, order_obj: types.OrderShortcut):
         super(InitialOrderEvent, self).__init__(runner_tag, EventTypes.INITIAL_ORDER)
         self.order: types.OrderShortcut = order_obj
@@ -155,6 +181,8 @@ class OrdersListChangedEvent(BaseEvent):
     :param sales: кол-во незавершенных продаж.
     :type sales: :obj:`int`
     """
+    __slots__ = ("purchases", "sales")
+
     def __init__(self, runner_tag: str, purchases: int, sales: int):
         super(OrdersListChangedEvent, self).__init__(runner_tag, EventTypes.ORDERS_LIST_CHANGED)
         self.purchases: int = purchases
@@ -173,6 +201,8 @@ class NewOrderEvent(BaseEvent):
     :param order_obj: объект нового заказа.
     :type order_obj: :class:`FunPayAPI.types.OrderShortcut`
     """
+    __slots__ = ("order", )
+
     def __init__(self, runner_tag: str, order_obj: types.OrderShortcut):
         super(NewOrderEvent, self).__init__(runner_tag, EventTypes.NEW_ORDER)
         self.order: types.OrderShortcut = order_obj
@@ -189,6 +219,8 @@ class OrderStatusChangedEvent(BaseEvent):
     :param order_obj: объект измененного заказа.
     :type order_obj: :class:`FunPayAPI.types.OrderShortcut`
     """
+    __slots__ = ("order", )
+
     def __init__(self, runner_tag: str, order_obj: types.OrderShortcut):
         super(OrderStatusChangedEvent, self).__init__(runner_tag, EventTypes.ORDER_STATUS_CHANGED)
         self.order: types.OrderShortcut = order_obj
@@ -7,9 +7,10 @@ if TYPE_CHECKING:
 
 import json
 import logging
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
 
 from ..common import exceptions
+from ..common.enums import RequestPriorities
 from .events import *
 
 
@@ -39,9 +40,14 @@ class Runner:
         Из событий, связанных с заказами, будет возвращаться только
         :class:`FunPayAPI.updater.events.OrdersListChangedEvent`.
     :type disabled_order_requests: :obj:`bool`, опционально
+
+    :param chat_requests_concurrency: максимальное кол-во одновременных запросов для получения истории чатов
+        (по 10 чатов на запрос). Если `1`, запросы выполняются последовательно.
+        Порядок событий не зависит от этого параметра.
+    :type chat_requests_concurrency: :obj:`int`, опционально
     """
     def __init__(self, account: Account, disable_message_requests: bool = False,
-                 disabled_order_requests: bool = False):
+                 disabled_order_requests: bool = False, chat_requests_concurrency: int = 1):
         # todo добавить события и исключение событий о новых покупках (не продажах!)
         if not account.is_initiated:
             raise exceptions.AccountNotInitiatedError()
@@ -57,8 +63,10 @@ class Runner:
         self.__last_msg_event_tag = utils.random_tag()
         self.__last_order_event_tag = utils.random_tag()
 
-        self.saved_orders: dict[str, types.OrderShortcut] = {}
-        """Сохраненные состояния заказов ({ID заказа: экземпляр types.OrderShortcut})."""
+        self.saved_orders: dict[str, types.OrderStatuses] = {}
+        """Индекс сохраненных состояний заказов ({ID заказа: статус заказа}).
+        Раньше хранил объекты заказов ({ID заказа: :class:`FunPayAPI.types.OrderShortcut`}): вместо
+        `saved_orders[id].status` используйте `saved_orders[id]`, заказ целиком приходит в событиях заказов."""
 
         self.last_messages: dict[int, list[str, str | None]] = {}
         """ID последний сообщений ({ID чата: (текст сообщения (до 250 символов), время сообщения)})."""
@@ -74,6 +82,10 @@ class Runner:
 
         self.account: Account = account
         """Экземпляр аккаунта, к которому привязан Runner."""
+
+        self.chat_requests_concurrency: int = max(1, chat_requests_concurrency)
+        """Максимальное кол-во одновременных запросов для получения истории чатов."""
+        self.__executor: ThreadPoolExecutor | None = None
         self.account.runner = self
 
         self.__msg_time_re = re.compile(r"\d{2}:\d{2}")
@@ -85,6 +97,18 @@ class Runner:
         :return: ответ FunPay.
         :rtype: :obj:`dict`
         """
+        headers, payload = self._updates_request()
+        response = self.account.method("post", "runner/", headers, payload, raise_not_200=True)
+        json_response = response.json()
+        # logger.debug(f"Получены данные о событиях: {json_response}")
+        return json_response
+
+    def _updates_request(self) -> tuple[dict, dict]:
+        """
+        Формирует заголовки и полезную нагрузку запроса для :meth:`FunPayAPI.updater.runner.Runner.get_updates`.
+
+        :return: (заголовки, полезная нагрузка).
+        """
         orders = {
             "type": "orders_counters",
             "id": self.account.id,
@@ -107,23 +131,22 @@ class Runner:
             "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
             "x-requested-with": "XMLHttpRequest"
         }
+        return headers, payload
 
-        response = self.account.method("post", "runner/", headers, payload, raise_not_200=True)
-        json_response = response.json()
-        # logger.debug(f"Получены данные о событиях: {json_response}")
-        return json_response
-
-    def parse_updates(self, updates: dict) -> list[InitialChatEvent | ChatsListChangedEvent |
-                                                   LastChatMessageChangedEvent | NewMessageEvent | InitialOrderEvent |
-                                                   OrdersListChangedEvent | NewOrderEvent | OrderStatusChangedEvent]:
+    def parse_updates(self, updates: dict) -> Generator[InitialChatEvent | ChatsListChangedEvent |
+                                                        LastChatMessageChangedEvent | NewMessageEvent |
+                                                        InitialOrderEvent | OrdersListChangedEvent | NewOrderEvent |
+                                                        OrderStatusChangedEvent]:
         """
         Парсит ответ FunPay и создает события.
+        События отдаются по мере готовности: события заказов - сразу после получения списка продаж,
+        события чатов - по мере получения историй каждой пачки чатов.
 
         :param updates: результат выполнения :meth:`FunPayAPI.updater.runner.Runner.get_updates`
         :type updates: :obj:`dict`
 
-        :return: список событий.
-        :rtype: :obj:`list` of :class:`FunPayAPI.updater.events.InitialChatEvent`,
+        :return: генератор событий.
+        :rtype: :obj:`Generator` of :class:`FunPayAPI.updater.events.InitialChatEvent`,
             :class:`FunPayAPI.updater.events.ChatsListChangedEvent`,
             :class:`FunPayAPI.updater.events.LastChatMessageChangedEvent`,
             :class:`FunPayAPI.updater.events.NewMessageEvent`, :class:`FunPayAPI.updater.events.InitialOrderEvent`,
@@ -131,35 +154,92 @@ class Runner:
             :class:`FunPayAPI.updater.events.NewOrderEvent`,
             :class:`FunPayAPI.updater.events.OrderStatusChangedEvent`
         """
-        events = []
         for obj in updates["objects"]:
             if obj.get("type") == "chat_bookmarks":
-                events.extend(self.parse_chat_updates(obj))
+                yield from self.parse_chat_updates(obj)
             elif obj.get("type") == "orders_counters":
-                events.extend(self.parse_order_updates(obj))
+                yield from self.parse_order_updates(obj)
+
+        self._end_first_request()
 
+    def _end_first_request(self):
+        """
+        Отмечает, что первый запрос Runner'а обработан (последующие события не будут "инициализирующими").
+        """
         if self.__first_request:
             self.__first_request = False
-        return events
 
-    def parse_chat_updates(self, obj) -> list[InitialChatEvent | ChatsListChangedEvent | LastChatMessageChangedEvent |
-                                              NewMessageEvent]:
+    def parse_chat_updates(self, obj) -> Generator[InitialChatEvent | ChatsListChangedEvent |
+                                                   LastChatMessageChangedEvent | NewMessageEvent]:
         """
-        Парсит события, связанные с чатами.
+        Парсит события, связанные с чатами. События каждой пачки чатов отдаются сразу после получения их историй.
 
         :param obj: словарь из результата выполнения :meth:`FunPayAPI.updater.runner.Runner.get_updates`, где
             "type" == "chat_bookmarks".
         :type obj: :obj:`dict`
 
-        :return: список событий, связанных с чатами.
-        :rtype: :obj:list of :class:`FunPayAPI.updater.events.InitialChatEvent`,
+        :return: генератор событий, связанных с чатами.
+        :rtype: :obj:`Generator` of :class:`FunPayAPI.updater.events.InitialChatEvent`,
             :class:`FunPayAPI.updater.events.ChatsListChangedEvent`,
             :class:`FunPayAPI.updater.events.LastChatMessageChangedEvent`,
             :class:`FunPayAPI.updater.events.NewMessageEvent`
         """
+        events, lcmc_events = self._parse_chats_list(obj)
+        yield from events
+        if not self.make_msg_requests:
+            yield from lcmc_events
+            return
+
+        chats_packs = self._split_chats_packs(lcmc_events)
+        if self.chat_requests_concurrency == 1 or len(chats_packs) == 1:
+            for chats_pack in chats_packs:
+                chats_data = {i.chat.id: i.chat.name for i in chats_pack}
+                new_msg_events = self.generate_new_message_events(chats_data)
+                yield from self._merge_chats_pack(chats_pack, new_msg_events)
+            return
+
+        # Истории чатов запрашиваются параллельно, а события генерируются последовательно в исходном порядке.
+        packs_data = [{i.chat.id: i.chat.name for i in chats_pack} for chats_pack in chats_packs]
+        histories = self._get_executor().map(self._get_chats_histories, packs_data)
+        for chats_pack, chats in zip(chats_packs, histories):
+            new_msg_events = self._process_chats_histories(chats) if chats is not None else {}
+            yield from self._merge_chats_pack(chats_pack, new_msg_events)
+
+    @staticmethod
+    def _split_chats_packs(lcmc_events: list[LastChatMessageChangedEvent],
+                           pack_size: int = 10) -> list[list[LastChatMessageChangedEvent]]:
+        """
+        Разбивает события изменения последних сообщений на пачки (по одному запросу истории на пачку).
+
+        :param lcmc_events: события изменения последних сообщений.
+        :param pack_size: размер пачки.
+
+        :return: список пачек событий.
+        """
+        return [lcmc_events[i:i + pack_size] for i in range(0, len(lcmc_events), pack_size)]
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+        Возвращает пул потоков для параллельного получения историй чатов (создает его при первом вызове).
+        """
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(max_workers=self.chat_requests_concurrency,
+                                                 thread_name_prefix="FunPayAPI.runner")
+        return self.__executor
+
+    def _parse_chats_list(self, obj) -> tuple[list[InitialChatEvent | ChatsListChangedEvent],
+                                              list[LastChatMessageChangedEvent]]:
+        """
+        Парсит список чатов из ответа FunPay (для :meth:`FunPayAPI.updater.runner.Runner.parse_chat_updates`).
+
+        :param obj: словарь из результата выполнения :meth:`FunPayAPI.updater.runner.Runner.get_updates`, где
+            "type" == "chat_bookmarks".
+
+        :return: (список событий инит. чатов / изменения списка чатов, список событий изменения последних сообщений).
+        """
         events, lcmc_events = [], []
         self.__last_msg_event_tag = obj.get("tag")
-        parser = BeautifulSoup(obj["data"]["html"], "html.parser")
+        parser = self.account.parse_html(obj["data"]["html"])
         chats = parser.find_all("a", {"class": "contact-item"})
 
         # Получаем все изменившиеся чаты
@@ -187,7 +267,8 @@ class Runner:
 
             unread = True if "unread" in chat.get("class") else False
             chat_with = chat.find("div", {"class": "media-user-name"}).text
-            chat_obj = types.ChatShortcut(chat_id, chat_with, last_msg_text, unread, str(chat))
+            chat_obj = types.ChatShortcut(chat_id, chat_with, last_msg_text, unread,
+                                          self.account.retain_html(chat))
             self.account.add_chats([chat_obj])
             self.last_messages[chat_id] = [last_msg_text, last_msg_time]
 
@@ -201,21 +282,25 @@ class Runner:
         # Если есть события изменения чатов, значит это не первый запрос и ChatsListChangedEvent будет первым событием
         if lcmc_events:
             events.append(ChatsListChangedEvent(self.__last_msg_event_tag))
+        return events, lcmc_events
 
-        if not self.make_msg_requests:
-            events.extend(lcmc_events)
-            return events
+    @staticmethod
+    def _merge_chats_pack(chats_pack: list[LastChatMessageChangedEvent],
+                          new_msg_events: dict[int, list[NewMessageEvent]]) -> list[LastChatMessageChangedEvent |
+                                                                                   NewMessageEvent]:
+        """
+        Объединяет события изменения последних сообщений пачки чатов с событиями новых сообщений.
 
-        while lcmc_events:
-            chats_pack = lcmc_events[:10]
-            del lcmc_events[:10]
-            chats_data = {i.chat.id: i.chat.name for i in chats_pack}
-            new_msg_events = self.generate_new_message_events(chats_data)
-            # [LastChatMessageChanged, NewMSG, NewMSG ..., LastChatMessageChanged, MewMSG, NewMSG ...]
-            for i in chats_pack:
-                events.append(i)
-                if new_msg_events.get(i.chat.id):
-                    events.extend(new_msg_events[i.chat.id])
+        :param chats_pack: события изменения последних сообщений.
+        :param new_msg_events: события новых сообщений ({ID чата: [список событий]}).
+
+        :return: [LastChatMessageChanged, NewMSG, NewMSG ..., LastChatMessageChanged, NewMSG, NewMSG ...]
+        """
+        events = []
+        for i in chats_pack:
+            events.append(i)
+            if new_msg_events.get(i.chat.id):
+                events.extend(new_msg_events[i.chat.id])
         return events
 
     def generate_new_message_events(self, chats_data: dict[int, str]) -> dict[int, list[NewMessageEvent]]:
@@ -229,6 +314,20 @@ class Runner:
         :return: словарь с событиями новых сообщений в формате {ID чата: [список событий]}
         :rtype: :obj:`dict` {:obj:`int`: :obj:`list` of :class:`FunPayAPI.updater.events.NewMessageEvent`}
         """
+        chats = self._get_chats_histories(chats_data)
+        if chats is None:
+            return {}
+        return self._process_chats_histories(chats)
+
+    def _get_chats_histories(self, chats_data: dict[int, str]) -> dict[int, list[types.Message]] | None:
+        """
+        Получает истории переданных чатов (3 попытки).
+
+        :param chats_data: ID чатов и никнеймы собеседников (None, если никнейм неизвестен).
+
+        :return: словарь с историями чатов в формате {ID чата: [список сообщений]} или `None`,
+            если получить истории не удалось.
+        """
         attempts = 3
         while attempts:
             attempts -= 1
@@ -243,8 +342,18 @@ class Runner:
             time.sleep(1)
         else:
             logger.error(f"Не удалось получить истории чатов {list(chats_data.keys())}: превышено кол-во попыток.")
-            return {}
+            return None
+        return chats
 
+    def _process_chats_histories(self, chats: dict[int, list[types.Message]]) -> dict[int, list[NewMessageEvent]]:
+        """
+        Генерирует события новых сообщений из историй чатов
+        (для :meth:`FunPayAPI.updater.runner.Runner.generate_new_message_events`).
+
+        :param chats: истории чатов ({ID чата: [список сообщений]}).
+
+        :return: словарь с событиями новых сообщений в формате {ID чата: [список событий]}
+        """
         result = {}
 
         for cid in chats:
@@ -320,11 +429,7 @@ class Runner:
             :class:`FunPayAPI.updater.events.NewOrderEvent`,
             :class:`FunPayAPI.updater.events.OrderStatusChangedEvent`
         """
-        events = []
-        self.__last_order_event_tag = obj.get("tag")
-        if not self.__first_request:
-            events.append(OrdersListChangedEvent(self.__last_order_event_tag,
-                                                 obj["data"]["buyer"], obj["data"]["seller"]))
+        events = self._parse_orders_counters(obj)
         if not self.make_order_requests:
             return events
 
@@ -332,7 +437,8 @@ class Runner:
         while attempts:
             attempts -= 1
             try:
-                orders_list = self.account.get_sells()
+                with self.account.limiter.priority(RequestPriorities.HIGH):
+                    orders_list = self.account.get_sells(known_orders=self.saved_orders)
                 break
             except exceptions.RequestFailedError as e:
                 logger.error(e)
@@ -343,8 +449,37 @@ class Runner:
         else:
             logger.error("Не удалось обновить список продаж: превышено кол-во попыток.")
             return events
+        events.extend(self._process_orders_list(orders_list[1]))
+        return events
+
+    def _parse_orders_counters(self, obj) -> list[OrdersListChangedEvent]:
+        """
+        Парсит счетчики заказов из ответа FunPay (для :meth:`FunPayAPI.updater.runner.Runner.parse_order_updates`).
+
+        :param obj: словарь из результата выполнения :meth:`FunPayAPI.updater.runner.Runner.get_updates`, где
+            "type" == "orders_counters".
 
-        for order in orders_list[1]:
+        :return: список с событием изменения списка заказов (пустой, если это первый запрос).
+        """
+        events = []
+        self.__last_order_event_tag = obj.get("tag")
+        if not self.__first_request:
+            events.append(OrdersListChangedEvent(self.__last_order_event_tag,
+                                                 obj["data"]["buyer"], obj["data"]["seller"]))
+        return events
+
+    def _process_orders_list(self, orders: list[types.OrderShortcut]) -> list[InitialOrderEvent | NewOrderEvent |
+                                                                             OrderStatusChangedEvent]:
+        """
+        Сравнивает список заказов с сохраненным и генерирует события
+        (для :meth:`FunPayAPI.updater.runner.Runner.parse_order_updates`).
+
+        :param orders: список заказов со страницы продаж.
+
+        :return: список событий новых заказов / изменения статусов заказов.
+        """
+        events = []
+        for order in orders:
             if order.id not in self.saved_orders:
                 if self.__first_request:
                     events.append(InitialOrderEvent(self.__last_order_event_tag, order))
@@ -354,7 +489,7 @@ class Runner:
                         events.append(OrderStatusChangedEvent(self.__last_order_event_tag, order))
                 self.update_order(order)
 
-            elif order.status != self.saved_orders[order.id].status:
+            elif order.status != self.saved_orders[order.id]:
                 events.append(OrderStatusChangedEvent(self.__last_order_event_tag, order))
                 self.update_order(order)
         return events
@@ -383,7 +518,7 @@ class Runner:
         :param order: экземпляр заказа, который нужно обновить.
         :type order: :class:`FunPayAPI.types.OrderShortcut`
         """
-        self.saved_orders[order.id] = order
+        self.saved_orders[order.id] = order.status
 
     def mark_as_by_bot(self, chat_id: int, message_id: int):
         """
@@ -426,8 +561,7 @@ class Runner:
         while True:
             try:
                 updates = self.get_updates()
-                events = self.parse_updates(updates)
-                for event in events:
+                for event in self.parse_updates(updates):
                     yield event
             except Exception as e:
                 if not ignore_exceptions:
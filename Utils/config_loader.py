@@ -139,7 +139,13 @@ def load_main_config(config_path: str):
         "Other": {
             "watermark": "any+empty",
             "requestsDelay": [str(i) for i in range(1, 101)],
-            "language": ["ru", "eng"]
+            "language": ["ru", "eng"],
+            "htmlParser": ["html.parser", "lxml", "html5lib"],
+            "chatRequestsConcurrency": [str(i) for i in range(1, 11)],
+            "htmlRetention": ["full", "compressed", "none"],
+            "deduplicateProducts": ["0", "1"],
+            "storageBackend": ["json", "sqlite"],
+            "connectionPoolSize": [str(i) for i in range(1, 51)]
         }
     }
 
@@ -167,6 +173,30 @@ def load_main_config(config_path: str):
                 config.set("Telegram", "proxy", "")
                 with open("configs/_main.cfg", "w", encoding="utf-8") as f:
                     config.write(f)
+            elif section_name == "Other" and param_name == "htmlParser" and param_name not in config[section_name]:
+                config.set("Other", "htmlParser", "html.parser")
+                with open("configs/_main.cfg", "w", encoding="utf-8") as f:
+                    config.write(f)
+            elif section_name == "Other" and param_name == "chatRequestsConcurrency" and param_name not in config[section_name]:
+                config.set("Other", "chatRequestsConcurrency", "1")
+                with open("configs/_main.cfg", "w", encoding="utf-8") as f:
+                    config.write(f)
+            elif section_name == "Other" and param_name == "htmlRetention" and param_name not in config[section_name]:
+                config.set("Other", "htmlRetention", "full")
+                with open("configs/_main.cfg", "w", encoding="utf-8") as f:
+                    config.write(f)
+            elif section_name == "Other" and param_name == "deduplicateProducts" and param_name not in config[section_name]:
+                config.set("Other", "deduplicateProducts", "0")
+                with open("configs/_main.cfg", "w", encoding="utf-8") as f:
+                    config.write(f)
+            elif section_name == "Other" and param_name == "storageBackend" and param_name not in config[section_name]:
+                config.set("Other", "storageBackend", "json")
+                with open("configs/_main.cfg", "w", encoding="utf-8") as f:
+                    config.write(f)
+            elif section_name == "Other" and param_name == "connectionPoolSize" and param_name not in config[section_name]:
+                config.set("Other", "connectionPoolSize", "10")
+                with open("configs/_main.cfg", "w", encoding="utf-8") as f:
+                    config.write(f)
 
             try:
                 if values[section_name][param_name] == "any":
@@ -74,6 +74,18 @@ class NoProductsError(Exception):
         return _("exc_goods_file_is_empty", self.goods_file_path)
 
 
+class ProductsFileChangedError(Exception):
+    """
+    Исключение, которое райзится, если товарный файл был изменен в обход хранилища и невозможно определить,
+    какие товары из него уже были выданы.
+    """
+    def __init__(self, goods_file_path: str):
+        self.goods_file_path = goods_file_path
+
+    def __str__(self):
+        return _("exc_goods_file_changed", self.goods_file_path)
+
+
 class NotEnoughProductsError(Exception):
     """
     Исключение, которое райзится, если запрошено больше товаров, чем есть в товарном файле.
@@ -0,0 +1,155 @@
+"""
+В данном модуле описана отложенная (write-behind) запись файлов FunPay Vertex.
+
+Запись файла не выполняется сразу: она ставится в очередь и выполняется фоновым потоком через :attr:`Persister.delay`
+секунд. Повторные записи одного и того же файла за это время объединяются (записывается только последняя версия).
+Файлы записываются атомарно: сначала во временный файл в той же папке, затем временный файл переименовывается.
+"""
+from __future__ import annotations
+from typing import Callable, Hashable
+
+import threading
+import tempfile
+import logging
+import atexit
+import time
+import os
+
+
+logger = logging.getLogger("FPV.persister")
+
+
+def atomic_write(path: str, data: str | bytes, encoding: str = "utf-8") -> None:
+    """
+    Атомарно записывает данные в файл: во временный файл в той же папке, затем переименовывает его.
+    При аварийном завершении файл остается либо в старом, либо в новом виде, но не обрезанным.
+
+    :param path: путь до файла.
+    :param data: данные.
+    :param encoding: кодировка (если данные - строка).
+    """
+    directory = os.path.dirname(path) or "."
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    if isinstance(data, str):
+        data = data.encode(encoding)
+
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class Persister:
+    """
+    Фоновый поток отложенной записи.
+
+    Задачи записи ставятся в очередь по ключу (как правило, по пути до файла): новая задача с тем же ключом заменяет
+    старую, если та еще не выполнена. Задачи выполняются фоновым потоком через :attr:`delay` секунд после постановки
+    первой задачи в пустую очередь или немедленно при вызове :meth:`flush`.
+
+    :param delay: окно объединения записей (в секундах).
+    """
+    def __init__(self, delay: int | float = 1.0):
+        self.delay: int | float = delay
+        """Окно объединения записей (в секундах)."""
+        self.__tasks: dict[Hashable, Callable[[], None]] = {}
+        self.__deadline: float | None = None
+        self.__condition = threading.Condition()
+        self.__io_lock = threading.Lock()
+        self.__thread: threading.Thread | None = None
+
+    def schedule(self, key: Hashable, task: Callable[[], None]) -> None:
+        """
+        Ставит задачу записи в очередь.
+
+        :param key: ключ задачи. Невыполненная задача с тем же ключом заменяется.
+        :param task: задача (функция без аргументов, выполняющая запись).
+        """
+        with self.__condition:
+            self.__tasks.pop(key, None)
+            self.__tasks[key] = task
+            if self.__deadline is None:
+                self.__deadline = time.monotonic() + self.delay
+            if self.__thread is None or not self.__thread.is_alive():
+                self.__thread = threading.Thread(target=self.__loop, name="FPV.persister", daemon=True)
+                self.__thread.start()
+            self.__condition.notify()
+
+    def write_file(self, path: str, data: str | bytes, encoding: str = "utf-8") -> None:
+        """
+        Ставит в очередь атомарную запись файла (см. :func:`atomic_write`).
+
+        :param path: путь до файла.
+        :param data: данные.
+        :param encoding: кодировка (если данные - строка).
+        """
+        self.schedule(os.path.abspath(path), lambda: atomic_write(path, data, encoding))
+
+    def is_pending(self, key: Hashable) -> bool:
+        """
+        Проверяет, есть ли в очереди задача с указанным ключом.
+
+        :param key: ключ задачи.
+
+        :return: True, если задача еще не выполнена.
+        """
+        with self.__condition:
+            return key in self.__tasks
+
+    def flush(self) -> None:
+        """
+        Немедленно выполняет все задачи из очереди в текущем потоке.
+        """
+        with self.__io_lock:
+            with self.__condition:
+                tasks, self.__tasks, self.__deadline = self.__tasks, {}, None
+            self.__run(tasks)
+
+    def __loop(self) -> None:
+        while True:
+            with self.__condition:
+                while self.__deadline is None or time.monotonic() < self.__deadline:
+                    self.__condition.wait(None if self.__deadline is None
+                                          else max(self.__deadline - time.monotonic(), 0))
+            self.flush()
+
+    @staticmethod
+    def __run(tasks: dict[Hashable, Callable[[], None]]) -> None:
+        for key, task in tasks.items():
+            try:
+                task()
+            except:
+                logger.error(f"Произошла ошибка при записи $YELLOW{key}$RESET.")
+                logger.debug("TRACEBACK", exc_info=True)
+
+
+persister = Persister()
+"""Общий экземпляр потока отложенной записи."""
+atexit.register(persister.flush)
+
+
+def write_file(path: str, data: str | bytes, encoding: str = "utf-8") -> None:
+    """
+    Ставит в очередь общего потока отложенной записи атомарную запись файла (см. :meth:`Persister.write_file`).
+
+    :param path: путь до файла.
+    :param data: данные.
+    :param encoding: кодировка (если данные - строка).
+    """
+    persister.write_file(path, data, encoding)
+
+
+def flush(*args) -> None:
+    """
+    Немедленно записывает все файлы из очереди общего потока отложенной записи.
+    Принимает любые аргументы, чтобы его можно было использовать в качестве хэндлера (например, BIND_TO_PRE_STOP).
+    """
+    persister.flush()
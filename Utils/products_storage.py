@@ -0,0 +1,632 @@
+"""
+В данном модуле описано хранилище товаров автовыдачи (storage/products/*.txt).
+
+Товарный файл остается обычным текстовым файлом (1 строка - 1 товар), но выданные товары не вырезаются из него
+при каждой продаже. Вместо этого в индексный файл (storage/cache/products/<имя файла>.json) сохраняется смещение
+(кол-во байт) выданной части файла и кол-во оставшихся товаров, а хэши выданных товаров дописываются в журнал
+(storage/cache/products/<имя файла>.consumed). Благодаря этому выдача N товаров требует O(N) операций ввода / вывода,
+а не перезаписи всего файла. При отмене резерва достаточно сдвинуть смещение назад.
+
+Товарный файл уплотняется (выданная часть вырезается), когда выданная часть становится не меньше оставшейся
+и нет незавершенных резервов, а также перед тем, как отдать файл пользователю (:func:`compact`).
+
+Товарные файлы без индекса (в т.ч. созданные до появления индексов) подхватываются автоматически.
+Если товарный файл был изменен в обход хранилища, индекс перестраивается. Если при этом изменилась зарезервированная
+часть файла, зарезервированные товары находятся по хэшам и вырезаются из файла, поэтому они не будут выданы повторно.
+"""
+from __future__ import annotations
+from typing import Iterable, Iterator
+
+import Utils.exceptions
+
+from collections import Counter
+import threading
+import tempfile
+import shutil
+import hashlib
+import logging
+import json
+import os
+
+
+logger = logging.getLogger("FPV.products_storage")
+
+INDEX_DIR = "storage/cache/products"
+"""Папка с индексами товарных файлов."""
+COMPACT_SIZE = 64 * 1024
+"""Товарные файлы не больше этого размера (в байтах) уплотняются после каждой выдачи."""
+FINGERPRINT_SIZE = 4096
+"""Кол-во байт перед смещением, по которым проверяется, что выданная часть файла не изменилась."""
+HASH_SIZE = 8
+"""Размер хэша товара (в байтах) в индексе дубликатов."""
+
+_indexes: dict[str, dict] = {}
+"""Кэш индексов товарных файлов ({путь до товарного файла: индекс}). Индекс актуален, пока размер и время
+изменения товарного файла совпадают с сохраненными в нем."""
+_locks: dict[str, threading.RLock] = {}
+"""Блокировки товарных файлов ({путь до товарного файла: блокировка})."""
+_locks_lock = threading.Lock()
+_hashes: dict[str, set[bytes]] = {}
+"""Кэш индексов дубликатов ({путь до товарного файла: хэши товаров})."""
+_reservations: dict[str, list[ProductsReservation]] = {}
+"""Незавершенные резервы ({путь до товарного файла: резервы}). Их товары остаются в выданной части файла при
+уплотнении."""
+
+
+def get_index_path(path: str) -> str:
+    """
+    Возвращает путь до индексного файла товарного файла.
+
+    :param path: путь до файла с товарами.
+
+    :return: путь до индексного файла.
+    """
+    return os.path.join(INDEX_DIR, os.path.basename(path) + ".json")
+
+
+def get_hashes_path(path: str) -> str:
+    """
+    Возвращает путь до индекса дубликатов товарного файла.
+
+    :param path: путь до файла с товарами.
+
+    :return: путь до индекса дубликатов.
+    """
+    return os.path.join(INDEX_DIR, os.path.basename(path) + ".hashes")
+
+
+def get_consumed_path(path: str) -> str:
+    """
+    Возвращает путь до журнала выданных товаров товарного файла.
+
+    :param path: путь до файла с товарами.
+
+    :return: путь до журнала выданных товаров.
+    """
+    return os.path.join(INDEX_DIR, os.path.basename(path) + ".consumed")
+
+
+def _read_line(line: bytes) -> str:
+    """
+    Возвращает товар из строки товарного файла (без символов переноса строки).
+    """
+    if line.endswith(b"\n"):
+        line = line[:-1]
+    if line.endswith(b"\r"):
+        line = line[:-1]
+    return line.decode("utf-8")
+
+
+def _get_fingerprint(f, offset: int) -> str:
+    """
+    Считает хэш последних FINGERPRINT_SIZE байт выданной части товарного файла.
+    """
+    start = max(0, offset - FINGERPRINT_SIZE)
+    f.seek(start)
+    return hashlib.sha1(f.read(offset - start)).hexdigest()
+
+
+def _count_products(f, offset: int) -> int:
+    """
+    Считает кол-во товаров в товарном файле после указанного смещения.
+    """
+    f.seek(offset)
+    return sum(1 for line in f if _read_line(line))
+
+
+def _save_index(path: str, offset: int, count: int, consumed: int = 0) -> dict:
+    """
+    Сохраняет индекс товарного файла.
+
+    :param consumed: кол-во товаров в файле до смещения (их хэши - первые записи журнала выданных товаров).
+    """
+    stat = os.stat(path)
+    with open(path, "rb") as f:
+        fingerprint = _get_fingerprint(f, offset)
+    index = {"offset": offset, "count": count, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+             "fingerprint": fingerprint, "consumed": consumed}
+
+    if not os.path.exists(INDEX_DIR):
+        os.makedirs(INDEX_DIR)
+    index_path = get_index_path(path)
+    with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(json.dumps(index))
+    os.replace(index_path + ".tmp", index_path)
+    _indexes[os.path.abspath(path)] = index
+    return index
+
+
+def _load_index(path: str) -> dict:
+    """
+    Загружает индекс товарного файла. Если индекса нет или товарный файл был изменен в обход хранилища,
+    перестраивает его.
+
+    :return: индекс товарного файла.
+    """
+    stat = os.stat(path)
+    index = _indexes.get(os.path.abspath(path))
+    if index and index["size"] == stat.st_size and index["mtime_ns"] == stat.st_mtime_ns:
+        return index
+
+    try:
+        with open(get_index_path(path), "r", encoding="utf-8") as f:
+            index = json.loads(f.read())
+    except (FileNotFoundError, json.decoder.JSONDecodeError):
+        index = None
+
+    if index and index["size"] == stat.st_size and index["mtime_ns"] == stat.st_mtime_ns:
+        if "consumed" not in index:
+            # Индекс старого формата: выданные товары могли остаться в файле, вырезаем их.
+            if index["offset"]:
+                _rewrite(path, b"", index["offset"])
+            return _save_index(path, 0, index["count"])
+        _indexes[os.path.abspath(path)] = index
+        return index
+
+    offset, consumed = 0, 0
+    if index and index["offset"]:
+        with open(path, "rb") as f:
+            unchanged = index["offset"] <= stat.st_size and \
+                _get_fingerprint(f, index["offset"]) == index["fingerprint"]
+        if unchanged and "consumed" not in index:
+            # Индекс старого формата: выданные товары могли остаться в файле, вырезаем их.
+            _rewrite(path, b"", index["offset"])
+        elif unchanged:
+            # Выданная часть файла не изменилась (например, товары были дописаны в конец).
+            offset, consumed = index["offset"], index["consumed"]
+        elif "consumed" not in index:
+            logger.error(f"Товарный файл $YELLOW{path}$RESET был изменен, а индекс старого формата не позволяет "
+                         f"определить выданные товары. Выдача из файла остановлена: проверь файл и удали "
+                         f"$YELLOW{get_index_path(path)}$RESET.")
+            raise Utils.exceptions.ProductsFileChangedError(path)
+        else:
+            missing = _cut_consumed(path, _load_consumed(path, index["consumed"]))
+            if missing:
+                logger.error(f"Товарный файл $YELLOW{path}$RESET был изменен: {missing} выданных товаров "
+                             f"не найдено (они были изменены или удалены), проверь файл.")
+            else:
+                logger.warning(f"Товарный файл $YELLOW{path}$RESET был изменен, выданные товары "
+                               f"вырезаны из файла.")
+
+    with open(path, "rb") as f:
+        count = _count_products(f, offset)
+    _drop_hashes(path)
+    return _save_index(path, offset, count, consumed)
+
+
+def _cut_consumed(path: str, consumed: list[bytes]) -> int:
+    """
+    Вырезает из товарного файла товары с указанными хэшами (каждый хэш - не более 1 товара).
+
+    :return: кол-во хэшей, для которых не нашлось товара.
+    """
+    remaining = Counter(consumed)
+    with open(path, "rb") as f, open(path + ".tmp", "wb") as new_file:
+        for line in f:
+            if product := _read_line(line):
+                product_hash = _get_hash(product.encode("utf-8"))
+                if remaining.get(product_hash):
+                    remaining[product_hash] -= 1
+                    continue
+            new_file.write(line)
+    os.replace(path + ".tmp", path)
+    return sum(remaining.values())
+
+
+def _load_consumed(path: str, count: int) -> list[bytes]:
+    """
+    Загружает первые count хэшей журнала выданных товаров (хэши товаров, находящихся в файле до смещения).
+    """
+    try:
+        with open(get_consumed_path(path), "rb") as f:
+            data = f.read(count * HASH_SIZE)
+    except FileNotFoundError:
+        data = b""
+    return [data[i:i + HASH_SIZE] for i in range(0, len(data), HASH_SIZE)]
+
+
+def _append_consumed(path: str, count: int, hashes: list[bytes]):
+    """
+    Дописывает хэши в журнал выданных товаров после первых count хэшей (остальные записи журнала устарели,
+    например, после отмены резерва).
+    """
+    if not os.path.exists(INDEX_DIR):
+        os.makedirs(INDEX_DIR)
+    with open(get_consumed_path(path), "ab") as f:
+        f.truncate(count * HASH_SIZE)
+        f.write(b"".join(hashes))
+
+
+def _get_hash(product: bytes) -> bytes:
+    """
+    Считает хэш товара для индекса дубликатов.
+    """
+    return hashlib.blake2b(product, digest_size=HASH_SIZE).digest()
+
+
+def _load_hashes(path: str) -> set[bytes]:
+    """
+    Загружает индекс дубликатов товарного файла (хэши всех товаров, добавленных в файл, в т.ч. уже выданных,
+    если файл еще не был уплотнен). Если индекса нет, строит его по товарному файлу.
+
+    :return: хэши товаров.
+    """
+    key = os.path.abspath(path)
+    if key in _hashes:
+        return _hashes[key]
+
+    hashes_path = get_hashes_path(path)
+    if os.path.exists(hashes_path):
+        with open(hashes_path, "rb") as f:
+            data = f.read()
+        hashes = {data[i:i + HASH_SIZE] for i in range(0, len(data), HASH_SIZE)}
+    else:
+        with open(path, "rb") as f:
+            hashes = {_get_hash(product.encode("utf-8")) for line in f if (product := _read_line(line))}
+        _write_hashes(path, hashes)
+    _hashes[key] = hashes
+    return hashes
+
+
+def _write_hashes(path: str, hashes: set[bytes]):
+    """
+    Перезаписывает индекс дубликатов товарного файла.
+    """
+    if not os.path.exists(INDEX_DIR):
+        os.makedirs(INDEX_DIR)
+    hashes_path = get_hashes_path(path)
+    with open(hashes_path + ".tmp", "wb") as f:
+        f.write(b"".join(hashes))
+    os.replace(hashes_path + ".tmp", hashes_path)
+    _hashes[os.path.abspath(path)] = hashes
+
+
+def _append_hashes(path: str, hashes: list[bytes]):
+    """
+    Добавляет хэши в индекс дубликатов товарного файла, если он ведется.
+    """
+    key = os.path.abspath(path)
+    hashes_path = get_hashes_path(path)
+    if not hashes or (key not in _hashes and not os.path.exists(hashes_path)):
+        return
+    _load_hashes(path).update(hashes)
+    with open(hashes_path, "ab") as f:
+        f.write(b"".join(hashes))
+
+
+def _drop_hashes(path: str):
+    """
+    Удаляет индекс дубликатов товарного файла (например, если товарный файл был изменен в обход хранилища).
+    """
+    _hashes.pop(os.path.abspath(path), None)
+    if os.path.exists(get_hashes_path(path)):
+        os.remove(get_hashes_path(path))
+
+
+def _iter_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Разбивает поток байт на непустые строки. Переносы строк \\r\\n и \\r нормализуются в \\n.
+    """
+    rest = b""
+    for chunk in chunks:
+        lines = (rest + chunk).replace(b"\r\n", b"\n").replace(b"\r", b"\n").split(b"\n")
+        rest = lines.pop()
+        yield from (i for i in lines if i)
+    if rest:
+        yield rest
+
+
+def _rewrite(path: str, data: bytes, offset: int, keep_prefix: bool = False):
+    """
+    Атомарно перезаписывает товарный файл: data + содержимое файла после смещения
+    (если keep_prefix - содержимое файла до смещения + data + содержимое файла после смещения).
+    """
+    with open(path, "rb") as f, open(path + ".tmp", "wb") as new_file:
+        left = offset if keep_prefix else 0
+        while left and (chunk := f.read(min(left, 1024 * 1024))):
+            new_file.write(chunk)
+            left -= len(chunk)
+        new_file.write(data)
+        f.seek(offset)
+        while chunk := f.read(1024 * 1024):
+            new_file.write(chunk)
+    os.replace(path + ".tmp", path)
+
+
+def get_lock(path: str) -> threading.RLock:
+    """
+    Возвращает блокировку товарного файла. У каждого товарного файла своя блокировка, поэтому выдача товаров из
+    разных файлов не блокирует друг друга.
+
+    :param path: путь до файла с товарами.
+
+    :return: блокировка товарного файла.
+    """
+    key = os.path.abspath(path)
+    lock = _locks.get(key)
+    if lock is None:
+        with _locks_lock:
+            lock = _locks.setdefault(key, threading.RLock())
+    return lock
+
+
+class ProductsReservation:
+    """
+    Зарезервированные товары. Товары уже помечены в товарном файле как выданные и не будут выданы повторно.
+    После попытки выдачи резерв необходимо подтвердить (:meth:`commit`) или отменить (:meth:`rollback`).
+
+    :param path: путь до файла с товарами.
+    :param products: зарезервированные товары.
+    :param left: оставшееся (не зарезервированное) кол-во товара.
+    """
+    def __init__(self, path: str, products: list[str], left: int):
+        self.path: str = path
+        """Путь до файла с товарами."""
+        self.products: list[str] = products
+        """Зарезервированные товары."""
+        self.left: int = left
+        """Оставшееся кол-во товара на момент резервирования."""
+        self.finished: bool = False
+        """Подтвержден / отменен ли резерв."""
+
+    def commit(self):
+        """
+        Подтверждает выдачу зарезервированных товаров. Товары уже учтены в индексе как выданные и вырезаются из
+        товарного файла при его уплотнении.
+        """
+        with get_lock(self.path):
+            if self.finished:
+                return
+            self.__finish()
+            try:
+                index = _load_index(self.path)
+            except (FileNotFoundError, Utils.exceptions.ProductsFileChangedError):
+                return
+            if not _reservations.get(os.path.abspath(self.path)) and index["offset"] and \
+                    (index["size"] <= COMPACT_SIZE or index["offset"] * 2 >= index["size"]):
+                compact(self.path)
+
+    def rollback(self):
+        """
+        Отменяет резерв: возвращает зарезервированные товары в начало товарного файла.
+        """
+        with get_lock(self.path):
+            if self.finished:
+                return
+            self.__finish()
+            if self.products:
+                add_products(self.path, self.products, at_zero_position=True)
+
+    def __finish(self):
+        self.finished = True
+        reservations = _reservations.get(os.path.abspath(self.path), [])
+        if self in reservations:
+            reservations.remove(self)
+
+    def __enter__(self) -> ProductsReservation:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+
+def count_products(path: str) -> int:
+    """
+    Возвращает кол-во оставшихся товаров в товарном файле.
+    Кол-во берется из кэша индексов и обновляется хранилищем при каждой выдаче / добавлении товаров, поэтому
+    файл перечитывается, только если он был изменен в обход хранилища.
+
+    :param path: путь до файла с товарами.
+
+    :return: кол-во товаров или 0, если файла не существует.
+    """
+    try:
+        with get_lock(path):
+            return _load_index(path)["count"]
+    except (FileNotFoundError, Utils.exceptions.ProductsFileChangedError):
+        return 0
+
+
+def reserve_products(path: str, amount: int = 1) -> ProductsReservation:
+    """
+    Резервирует товар/-ы из товарного файла.
+
+    :param path: путь до файла с товарами.
+    :param amount: кол-во товара.
+
+    :return: резерв товаров.
+    """
+    with get_lock(path):
+        index = _load_index(path)
+        if not index["count"]:
+            raise Utils.exceptions.NoProductsError(path)
+        elif index["count"] < amount:
+            raise Utils.exceptions.NotEnoughProductsError(path, index["count"], amount)
+
+        products = []
+        with open(path, "rb") as f:
+            f.seek(index["offset"])
+            while len(products) < amount and (line := f.readline()):
+                if product := _read_line(line):
+                    products.append(product)
+            offset = f.tell()
+
+        count = index["count"] - len(products)
+        _append_consumed(path, index["consumed"], [_get_hash(i.encode("utf-8")) for i in products])
+        _save_index(path, offset, count, index["consumed"] + len(products))
+        reservation = ProductsReservation(path, products, count)
+        _reservations.setdefault(os.path.abspath(path), []).append(reservation)
+    return reservation
+
+
+def pop_products(path: str, amount: int = 1) -> list[list[str] | int]:
+    """
+    Берет из товарного файла товар/-ы, помечает их как выданные.
+
+    :param path: путь до файла с товарами.
+    :param amount: кол-во товара.
+
+    :return: [[Товар/-ы], оставшееся кол-во товара]
+    """
+    reservation = reserve_products(path, amount)
+    reservation.commit()
+    return [reservation.products, reservation.left]
+
+
+def add_products(path: str, products: list[str], at_zero_position: bool = False):
+    """
+    Добавляет товары в файл с товарами.
+
+    :param path: путь до файла с товарами.
+    :param products: товары.
+    :param at_zero_position: добавить товары в начало товарного файла (например, чтобы вернуть не выданные товары).
+    """
+    with get_lock(path):
+        index = _load_index(path)
+        count = index["count"] + len([i for i in products if i])
+
+        if not at_zero_position:
+            with open(path, "ab") as f:
+                f.write(("\n" + "\n".join(products)).encode("utf-8"))
+            _save_index(path, index["offset"], count, index["consumed"])
+            _append_hashes(path, [_get_hash(i.encode("utf-8")) for i in products if i])
+            return
+
+        offset, consumed = index["offset"], index["consumed"]
+        data = ("\n".join(products) + "\n").encode("utf-8")
+        with open(path, "rb") as f:
+            start = offset - len(data)
+            f.seek(max(0, start - 1))
+            previous = f.read(offset - max(0, start - 1))
+
+        # Если товары - это последние выданные товары, достаточно сдвинуть смещение назад.
+        if start >= 0 and previous.endswith(data) and (start == 0 or previous.startswith(b"\n")):
+            offset = start
+            consumed = max(consumed - len([i for i in products if i]), 0)
+        else:
+            # Товары вставляются сразу после выданной части файла, выданная часть и журнал не меняются.
+            if previous and not previous.endswith(b"\n"):
+                data = b"\n" + data
+            _rewrite(path, data, offset, keep_prefix=True)
+        _save_index(path, offset, count, consumed)
+
+
+def compact(path: str):
+    """
+    Уплотняет товарный файл: удаляет из него выданные товары. Товары незавершенных резервов остаются в выданной
+    части файла (и в журнале выданных товаров), пока резерв не будет подтвержден или отменен.
+    Необходимо вызывать перед тем, как отдать товарный файл пользователю.
+
+    :param path: путь до файла с товарами.
+    """
+    with get_lock(path):
+        index = _load_index(path)
+        reserved = [i for reservation in _reservations.get(os.path.abspath(path), []) for i in reservation.products]
+        if not index["offset"] or (reserved and index["consumed"] == len(reserved)):
+            return
+        data = "".join(f"{i}\n" for i in reserved).encode("utf-8")
+        _rewrite(path, data, index["offset"])
+        _append_consumed(path, 0, [_get_hash(i.encode("utf-8")) for i in reserved])
+        _save_index(path, len(data), index["count"], len(reserved))
+
+
+def import_products(path: str, chunks: Iterable[bytes], replace: bool = False,
+                    deduplicate: bool = False) -> tuple[int, int]:
+    """
+    Потоково импортирует товары в товарный файл (например, при загрузке товарного файла через Telegram).
+    Данные обрабатываются по частям, переносы строк нормализуются, пустые строки отбрасываются.
+
+    Данные сначала записываются во временный файл без блокировки товарного файла (загрузка может быть долгой),
+    блокировка берется только на время слияния с товарным файлом.
+
+    :param path: путь до файла с товарами.
+    :param chunks: части импортируемых данных.
+    :param replace: заменить ли содержимое товарного файла (иначе товары добавляются в конец).
+    :param deduplicate: отбрасывать ли товары, которые уже есть в товарном файле или в импортируемых данных.
+
+    :return: (кол-во добавленных товаров, кол-во отброшенных дубликатов).
+    """
+    if not os.path.exists(INDEX_DIR):
+        os.makedirs(INDEX_DIR)
+    fd, staging = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix=".import", dir=INDEX_DIR)
+    try:
+        added, duplicates, new_hashes = 0, 0, set()
+        with os.fdopen(fd, "wb") as f:
+            buffer = []
+            for line in _iter_lines(chunks):
+                line.decode("utf-8")
+                if deduplicate:
+                    product_hash = _get_hash(line)
+                    if product_hash in new_hashes:
+                        duplicates += 1
+                        continue
+                    new_hashes.add(product_hash)
+                buffer.append(line)
+                if len(buffer) >= 1024:
+                    f.write((b"\n" if added else b"") + b"\n".join(buffer))
+                    added += len(buffer)
+                    buffer = []
+            if buffer:
+                f.write((b"\n" if added else b"") + b"\n".join(buffer))
+                added += len(buffer)
+
+        with get_lock(path):
+            if replace or not os.path.exists(path):
+                os.replace(staging, path)
+                _save_index(path, 0, added)
+                _drop_hashes(path)
+                if deduplicate:
+                    _write_hashes(path, new_hashes)
+                return added, duplicates
+            appended, appended_duplicates = _merge_import(path, staging, added, deduplicate)
+            return appended, duplicates + appended_duplicates
+    finally:
+        if os.path.exists(staging):
+            os.remove(staging)
+
+
+def _merge_import(path: str, staging: str, staged: int, deduplicate: bool) -> tuple[int, int]:
+    """
+    Дописывает товары из временного файла импорта в конец товарного файла (вызывается под блокировкой товарного
+    файла).
+
+    :param staged: кол-во товаров во временном файле.
+
+    :return: (кол-во добавленных товаров, кол-во отброшенных дубликатов).
+    """
+    index = _load_index(path)
+    track = deduplicate or os.path.abspath(path) in _hashes or os.path.exists(get_hashes_path(path))
+    known_hashes = _load_hashes(path) if deduplicate else set()
+
+    added, duplicates, new_hashes = 0, 0, []
+    with open(staging, "rb") as staging_file, open(path, "ab") as f:
+        if not track:
+            # Товары уже нормализованы, поэтому файл импорта можно дописать целиком.
+            if staged:
+                f.write(b"\n")
+                shutil.copyfileobj(staging_file, f, 1024 * 1024)
+            added = staged
+        else:
+            buffer = []
+            for line in staging_file:
+                line = line.rstrip(b"\n")
+                product_hash = _get_hash(line)
+                if deduplicate and product_hash in known_hashes:
+                    duplicates += 1
+                    continue
+                new_hashes.append(product_hash)
+                buffer.append(line)
+                if len(buffer) >= 1024:
+                    f.write(b"\n" + b"\n".join(buffer))
+                    added += len(buffer)
+                    buffer = []
+            if buffer:
+                f.write(b"\n" + b"\n".join(buffer))
+                added += len(buffer)
+
+    _save_index(path, index["offset"], index["count"] + added, index["consumed"])
+    _append_hashes(path, new_hashes)
+    return added, duplicates
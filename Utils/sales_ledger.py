@@ -0,0 +1,181 @@
+"""
+В данном модуле описан локальный журнал продаж (storage/cache/sales_ledger.json).
+
+Журнал хранит все продажи аккаунта ({ID заказа: [время, цена, статус]}) и агрегаты по дням, которые обновляются
+при добавлении / изменении заказа. Синхронизация (:meth:`SalesLedger.sync`) загружает страницы
+https://funpay.com/orders/trade только до первой страницы без новых / измененных заказов, поэтому статистика
+(:meth:`SalesLedger.get_stats`) считается по локальным данным, а не по всей истории продаж.
+"""
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from FunPayAPI.account import Account
+
+from FunPayAPI.common.enums import OrderStatuses
+from FunPayAPI import types
+from datetime import date
+import Utils.persister
+
+import threading
+import logging
+import json
+import time
+import os
+
+
+logger = logging.getLogger("FPV.sales_ledger")
+
+LEDGER_PATH = "storage/cache/sales_ledger.json"
+"""Путь до файла журнала продаж."""
+PERIODS = {"day": 1, "week": 7, "month": 30}
+"""Периоды статистики ({название: кол-во дней, включая сегодняшний})."""
+
+
+class SalesLedger:
+    """
+    Локальный журнал продаж с агрегатами по дням.
+
+    :param path: путь до файла журнала продаж.
+    """
+    def __init__(self, path: str = LEDGER_PATH):
+        self.path: str = path
+        """Путь до файла журнала продаж."""
+        self.orders: dict[str, list] = {}
+        """Продажи ({ID заказа: [время (timestamp), цена, статус (значение OrderStatuses)]})."""
+        self.days: dict[str, list] = {}
+        """Агрегаты по дням ({дата (ГГГГ-ММ-ДД): [кол-во продаж, сумма продаж, кол-во возвратов, сумма возвратов]})."""
+        self.complete: bool = False
+        """Загружена ли вся история продаж."""
+        self.cursor: str | None = None
+        """ID заказа, с которого нужно продолжить не завершенную загрузку всей истории продаж."""
+        self.last_sync: float = 0
+        """Время последней синхронизации."""
+        self.__lock = threading.RLock()
+        self.__sync_lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """
+        Загружает журнал продаж из файла.
+        """
+        with self.__lock:
+            if not os.path.exists(self.path):
+                return
+            with open(self.path, "r", encoding="utf-8") as f:
+                try:
+                    data = json.loads(f.read())
+                except json.decoder.JSONDecodeError:
+                    logger.warning(f"Файл $YELLOW{self.path}$RESET поврежден. Журнал продаж будет загружен заново.")
+                    return
+            self.orders, self.days = data["orders"], data["days"]
+            self.complete, self.cursor, self.last_sync = data["complete"], data["cursor"], data["last_sync"]
+
+    def save(self) -> None:
+        """
+        Сохраняет журнал продаж в файл (отложенно, см. :mod:`Utils.persister`).
+        """
+        with self.__lock:
+            data = json.dumps({"orders": self.orders, "days": self.days, "complete": self.complete,
+                               "cursor": self.cursor, "last_sync": self.last_sync}, ensure_ascii=False)
+        Utils.persister.write_file(self.path, data)
+
+    def update(self, order: types.OrderShortcut) -> bool:
+        """
+        Добавляет заказ в журнал или обновляет его статус. Время и цена уже известного заказа не изменяются.
+
+        :param order: заказ.
+
+        :return: True, если заказ новый или его статус изменился.
+        """
+        with self.__lock:
+            record = self.orders.get(order.id)
+            if record is not None and record[2] == order.status.value:
+                return False
+            if record is not None:
+                self.__aggregate(record, -1)
+                record[2] = order.status.value
+            else:
+                record = [order.date.timestamp(), order.price, order.status.value]
+                self.orders[order.id] = record
+            self.__aggregate(record, 1)
+            return True
+
+    def __aggregate(self, record: list, sign: int) -> None:
+        timestamp, price, status = record
+        key = date.fromtimestamp(timestamp).isoformat()
+        bucket = self.days.setdefault(key, [0, 0.0, 0, 0.0])
+        offset = 2 if status == OrderStatuses.REFUNDED.value else 0
+        bucket[offset] += sign
+        bucket[offset + 1] = round(bucket[offset + 1] + sign * price, 2)
+        if not any(bucket):
+            del self.days[key]
+
+    def sync(self, account: Account, page_delay: int | float = 1) -> int:
+        """
+        Синхронизирует журнал с https://funpay.com/orders/trade.
+
+        Страницы загружаются с начала (с новых заказов) до первой страницы без новых / измененных заказов, на которой
+        уже встретились все заказы, ожидающие выполнения. Если история продаж загружена не полностью, загрузка
+        продолжается с :attr:`cursor` до последней страницы.
+
+        :param account: экземпляр аккаунта.
+        :param page_delay: задержка между загрузкой страниц (в секундах).
+
+        :return: кол-во новых / измененных заказов.
+        """
+        with self.__sync_lock:
+            with self.__lock:
+                unsettled = {i for i, record in self.orders.items() if record[2] == OrderStatuses.PAID.value}
+            changed = 0
+            # Первая загрузка всей истории продаж: каждая загруженная страница - точка продолжения загрузки.
+            tail = not self.complete and self.cursor is None
+            try:
+                # Новые заказы обычно умещаются на 1-2 страницы, поэтому следующие страницы заранее загружаются
+                # только при загрузке всей истории продаж.
+                for next_order_id, orders in account.crawl_sells(prefetch=tail, page_delay=page_delay):
+                    page_changed = self.__update_page(orders, unsettled)
+                    changed += page_changed
+                    if next_order_id is None:
+                        self.complete, self.cursor = True, None
+                    elif tail:
+                        self.cursor = next_order_id
+                    elif not page_changed and not unsettled:
+                        break
+
+                if not self.complete:
+                    # Новые заказы загружены, продолжаем загрузку всей истории продаж.
+                    for next_order_id, orders in account.crawl_sells(self.cursor, page_delay=page_delay):
+                        changed += self.__update_page(orders, unsettled)
+                        self.complete, self.cursor = next_order_id is None, next_order_id
+            finally:
+                self.last_sync = time.time()
+                self.save()
+            if changed:
+                logger.info(f"Журнал продаж синхронизирован. Новых / измененных заказов: $YELLOW{changed}$RESET.")
+            return changed
+
+    def __update_page(self, orders: list[types.OrderShortcut], unsettled: set[str]) -> int:
+        changed = 0
+        for order in orders:
+            unsettled.discard(order.id)
+            changed += self.update(order)
+        return changed
+
+    def get_stats(self) -> dict[str, dict[str, int | float]]:
+        """
+        Возвращает статистику продаж.
+
+        :return: {"sales": {период: кол-во}, "salesPrice": {период: сумма}, "refunds": {период: кол-во},
+            "refundsPrice": {период: сумма}}. Периоды: `day`, `week`, `month` (см. :data:`PERIODS`) и `all`.
+        """
+        stats = {i: {j: 0 for j in [*PERIODS, "all"]} for i in ("sales", "salesPrice", "refunds", "refundsPrice")}
+        today = date.today()
+        with self.__lock:
+            for key, bucket in self.days.items():
+                age = (today - date.fromisoformat(key)).days
+                periods = [i for i, days in PERIODS.items() if 0 <= age < days] + ["all"]
+                for period in periods:
+                    for field, value in zip(stats, bucket):
+                        stats[field][period] += value
+        return stats
@@ -0,0 +1,383 @@
+"""
+В данном модуле описаны хранилища состояния FunPay Vertex (storage/cache): списка уже написавших пользователей,
+черного списка, авторизированных Telegram пользователей, настроек уведомлений и заготовок ответов.
+
+Доступны 2 хранилища: JSON файлы (по умолчанию) и встроенная база данных SQLite (storage/cache/storage.db).
+Хранилище выбирается параметром storageBackend секции Other основного конфига.
+"""
+from __future__ import annotations
+from typing import Any
+
+from abc import ABC, abstractmethod
+import threading
+import logging
+import sqlite3
+import json
+import os
+
+from Utils.persister import persister, atomic_write
+
+
+logger = logging.getLogger("FPV.storage")
+
+CACHE_DIR = "storage/cache"
+"""Папка с кэшем."""
+NAMES = ("old_users", "blacklist", "tg_authorized_users", "notifications", "answer_templates")
+"""Названия хранимых объектов (совпадают с названиями JSON файлов в storage/cache)."""
+
+
+class Storage(ABC):
+    """
+    Базовый класс хранилища. Каждый объект хранится под своим названием; объекты-списки можно изменять
+    по элементам (:meth:`add_items`, :meth:`remove_items`), не перезаписывая весь список.
+    """
+    @abstractmethod
+    def load(self, name: str, default: Any = None) -> Any:
+        """
+        Загружает объект из хранилища.
+
+        :param name: название объекта.
+        :param default: значение по умолчанию (если объекта нет в хранилище).
+
+        :return: объект.
+        """
+
+    @abstractmethod
+    def save(self, name: str, value: Any) -> None:
+        """
+        Сохраняет (перезаписывает) объект в хранилище.
+
+        :param name: название объекта.
+        :param value: объект.
+        """
+
+    def add_items(self, name: str, items: list) -> None:
+        """
+        Добавляет элементы в конец объекта-списка.
+
+        :param name: название объекта-списка.
+        :param items: элементы.
+        """
+        value = self.load(name, [])
+        value.extend(items)
+        self.save(name, value)
+
+    def remove_items(self, name: str, items: list) -> None:
+        """
+        Удаляет элементы из объекта-списка.
+
+        :param name: название объекта-списка.
+        :param items: элементы.
+        """
+        items = set(items)
+        self.save(name, [i for i in self.load(name, []) if i not in items])
+
+    def compact(self, name: str) -> None:
+        """
+        Уплотняет объект в хранилище (если хранилище это поддерживает).
+
+        :param name: название объекта.
+        """
+        pass
+
+    def close(self) -> None:
+        """
+        Закрывает хранилище.
+        """
+        pass
+
+
+class JSONStorage(Storage):
+    """
+    Хранилище в JSON файлах (storage/cache/<название объекта>.json).
+
+    Изменения объектов-списков по элементам не перезаписывают JSON файл, а дописываются в журнал
+    (storage/cache/<название объекта>.journal, 1 строка - 1 изменение). При загрузке журнал применяется к JSON файлу,
+    а после JOURNAL_LIMIT записей журнал сливается с JSON файлом (уплотняется).
+
+    Перезапись объекта (:meth:`save`) выполняется отложенно и атомарно потоком :data:`Utils.persister.persister`:
+    до записи объект хранится в памяти, и повторные перезаписи за окно объединения записываются один раз.
+
+    :param directory: папка с JSON файлами.
+    """
+    JOURNAL_LIMIT = 1000
+    """Кол-во записей в журнале, после которого журнал уплотняется."""
+
+    def __init__(self, directory: str = CACHE_DIR):
+        self.directory: str = directory
+        """Папка с JSON файлами."""
+        self.__lock = threading.RLock()
+        self.__journal_sizes: dict[str, int] = {}
+        self.__pending: dict[str, str] = {}
+        self.__pending_records: dict[str, list[dict]] = {}
+
+    def get_path(self, name: str) -> str:
+        """
+        Возвращает путь до JSON файла объекта.
+
+        :param name: название объекта.
+
+        :return: путь до JSON файла.
+        """
+        return os.path.join(self.directory, f"{name}.json")
+
+    def get_journal_path(self, name: str) -> str:
+        """
+        Возвращает путь до журнала изменений объекта-списка.
+
+        :param name: название объекта.
+
+        :return: путь до журнала.
+        """
+        return os.path.join(self.directory, f"{name}.journal")
+
+    def load(self, name: str, default: Any = None) -> Any:
+        with self.__lock:
+            if name in self.__pending:
+                return self.__get_pending(name)
+
+            path, journal_path = self.get_path(name), self.get_journal_path(name)
+            value = default
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    try:
+                        value = json.loads(f.read())
+                    except json.decoder.JSONDecodeError:
+                        logger.warning(f"Файл $YELLOW{path}$RESET поврежден.")
+
+            if not os.path.exists(journal_path):
+                self.__journal_sizes[name] = 0
+                return value
+
+            value = list(value or [])
+            journal_size = 0
+            with open(journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.decoder.JSONDecodeError:
+                        # Запись могла быть не дописана (например, при аварийном завершении).
+                        logger.warning(f"Пропускаю поврежденную запись в журнале $YELLOW{journal_path}$RESET.")
+                        continue
+                    journal_size += 1
+                    value = self.__apply(value, record)
+            self.__journal_sizes[name] = journal_size
+            return value
+
+    def save(self, name: str, value: Any) -> None:
+        with self.__lock:
+            self.__pending[name] = json.dumps(value, ensure_ascii=False)
+            self.__pending_records[name] = []
+            self.__journal_sizes[name] = 0
+        persister.schedule(os.path.abspath(self.get_path(name)), lambda: self.__write(name))
+
+    def add_items(self, name: str, items: list) -> None:
+        self.__write_journal(name, {"add": items})
+
+    def remove_items(self, name: str, items: list) -> None:
+        self.__write_journal(name, {"remove": items})
+
+    def compact(self, name: str) -> None:
+        """
+        Уплотняет журнал изменений объекта-списка: сливает его с JSON файлом.
+        """
+        with self.__lock:
+            if os.path.exists(self.get_journal_path(name)):
+                self.save(name, self.load(name, []))
+
+    def close(self) -> None:
+        with self.__lock:
+            for name in list(self.__pending):
+                self.__write(name)
+
+    @staticmethod
+    def __apply(value: list, record: dict) -> list:
+        if "add" in record:
+            value.extend(record["add"])
+        elif "remove" in record:
+            items = set(record["remove"])
+            value = [i for i in value if i not in items]
+        return value
+
+    def __write(self, name: str) -> None:
+        with self.__lock:
+            if name not in self.__pending:
+                return
+            if self.__pending_records[name]:
+                self.__pending[name] = json.dumps(self.__get_pending(name), ensure_ascii=False)
+            atomic_write(self.get_path(name), self.__pending[name])
+            # Журнал уже учтен в записанном объекте.
+            if os.path.exists(self.get_journal_path(name)):
+                os.remove(self.get_journal_path(name))
+            del self.__pending[name]
+            del self.__pending_records[name]
+
+    def __get_pending(self, name: str) -> Any:
+        value = json.loads(self.__pending[name])
+        if not self.__pending_records[name]:
+            return value
+        value = list(value or [])
+        for record in self.__pending_records[name]:
+            value = self.__apply(value, record)
+        return value
+
+    def __write_journal(self, name: str, record: dict) -> None:
+        with self.__lock:
+            if name in self.__pending:
+                # Объект еще не записан на диск: изменение применяется к ожидающей записи версии при записи,
+                # чтобы не пересериализовывать весь список на каждое изменение.
+                self.__pending_records[name].append(record)
+                return
+            if name not in self.__journal_sizes:
+                self.load(name)
+            if not os.path.exists(self.directory):
+                os.makedirs(self.directory)
+            with open(self.get_journal_path(name), "a", encoding="utf-8") as f:
+                # Перенос строки перед записью отделяет ее от не дописанной предыдущей записи.
+                f.write("\n" + json.dumps(record, ensure_ascii=False))
+            self.__journal_sizes[name] += 1
+            if self.__journal_sizes[name] >= self.JOURNAL_LIMIT:
+                self.compact(name)
+
+
+class SQLiteStorage(Storage):
+    """
+    Хранилище во встроенной базе данных SQLite (режим WAL).
+    Элементы объектов-списков хранятся отдельными строками, поэтому добавление / удаление элементов не зависит от
+    размера списка.
+
+    :param path: путь до файла базы данных.
+    """
+    def __init__(self, path: str = os.path.join(CACHE_DIR, "storage.db")):
+        self.path: str = path
+        """Путь до файла базы данных."""
+        if os.path.dirname(path) and not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        with self.__lock:
+            self.__connection.execute("PRAGMA journal_mode=WAL")
+            self.__connection.execute("PRAGMA synchronous=NORMAL")
+            self.__connection.execute("CREATE TABLE IF NOT EXISTS objects "
+                                      "(name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self.__connection.execute("CREATE TABLE IF NOT EXISTS list_items "
+                                      "(id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, "
+                                      "value TEXT NOT NULL)")
+            self.__connection.execute("CREATE INDEX IF NOT EXISTS list_items_name_value "
+                                      "ON list_items (name, value)")
+
+    @staticmethod
+    def __dump(value: Any) -> str:
+        return json.dumps(value, ensure_ascii=False)
+
+    def load(self, name: str, default: Any = None) -> Any:
+        with self.__lock:
+            row = self.__connection.execute("SELECT value FROM objects WHERE name = ?", (name, )).fetchone()
+            if row is not None:
+                return json.loads(row[0])
+            rows = self.__connection.execute("SELECT value FROM list_items WHERE name = ? ORDER BY id",
+                                             (name, )).fetchall()
+        if not rows and not isinstance(default, list):
+            return default
+        return [json.loads(i[0]) for i in rows]
+
+    def save(self, name: str, value: Any) -> None:
+        with self.__lock, self.__connection:
+            self.__connection.execute("BEGIN")
+            self.__connection.execute("DELETE FROM objects WHERE name = ?", (name, ))
+            self.__connection.execute("DELETE FROM list_items WHERE name = ?", (name, ))
+            if isinstance(value, list):
+                self.__connection.executemany("INSERT INTO list_items (name, value) VALUES (?, ?)",
+                                              ((name, self.__dump(i)) for i in value))
+            else:
+                self.__connection.execute("INSERT INTO objects (name, value) VALUES (?, ?)",
+                                          (name, self.__dump(value)))
+
+    def add_items(self, name: str, items: list) -> None:
+        with self.__lock, self.__connection:
+            self.__connection.execute("BEGIN")
+            self.__connection.executemany("INSERT INTO list_items (name, value) VALUES (?, ?)",
+                                          ((name, self.__dump(i)) for i in items))
+
+    def remove_items(self, name: str, items: list) -> None:
+        with self.__lock, self.__connection:
+            self.__connection.execute("BEGIN")
+            self.__connection.executemany("DELETE FROM list_items WHERE name = ? AND value = ?",
+                                          ((name, self.__dump(i)) for i in items))
+
+    def migrate_from_json(self, json_storage: JSONStorage, names: tuple[str, ...] = NAMES) -> list[str]:
+        """
+        Однократно переносит объекты из JSON файлов в базу данных. Объекты, которые уже есть в базе данных,
+        не перезаписываются. JSON файлы не удаляются.
+
+        :param json_storage: JSON хранилище.
+        :param names: названия переносимых объектов.
+
+        :return: названия перенесенных объектов.
+        """
+        with self.__lock:
+            if self.__connection.execute("PRAGMA user_version").fetchone()[0]:
+                return []
+
+        migrated = []
+        for name in names:
+            value = json_storage.load(name)
+            if value is None:
+                continue
+            with self.__lock:
+                exists = self.__connection.execute("SELECT 1 FROM objects WHERE name = ? UNION ALL "
+                                                   "SELECT 1 FROM list_items WHERE name = ? LIMIT 1",
+                                                   (name, name)).fetchone()
+            if exists:
+                continue
+            self.save(name, value)
+            migrated.append(name)
+
+        with self.__lock:
+            self.__connection.execute("PRAGMA user_version = 1")
+        if migrated:
+            logger.info(f"Перенес данные из JSON файлов в базу данных $YELLOW{self.path}$RESET: "
+                        f"{', '.join(migrated)}.")
+        return migrated
+
+    def close(self) -> None:
+        with self.__lock:
+            self.__connection.close()
+
+
+BACKENDS = {
+    "json": JSONStorage,
+    "sqlite": SQLiteStorage
+}
+"""Доступные хранилища ({название: класс хранилища})."""
+
+_storage: Storage = JSONStorage()
+
+
+def init_storage(backend: str = "json") -> Storage:
+    """
+    Инициализирует хранилище. При переходе на SQLite переносит в базу данных существующие JSON файлы.
+
+    :param backend: название хранилища (`json` или `sqlite`).
+
+    :return: хранилище.
+    """
+    global _storage
+    storage = BACKENDS[backend]()
+    if isinstance(storage, SQLiteStorage):
+        storage.migrate_from_json(JSONStorage())
+    _storage.close()
+    _storage = storage
+    return storage
+
+
+def get_storage() -> Storage:
+    """
+    Возвращает текущее хранилище.
+
+    :return: хранилище.
+    """
+    return _storage
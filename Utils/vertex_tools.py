@@ -1,13 +1,14 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable, Iterator
 if TYPE_CHECKING:
     from vertex import Vertex
 
 import FunPayAPI.types
 
 from datetime import datetime
-import Utils.exceptions
-import itertools
+import Utils.products_storage
+import Utils.storage
+import Utils.persister
 import psutil
 import json
 import sys
@@ -27,45 +28,119 @@ def count_products(path: str) -> int:
 
     :return: кол-во товара в указанном файле.
     """
-    if not os.path.exists(path):
-        return 0
-    with open(path, "r", encoding="utf-8") as f:
-        products = f.read()
-    products = products.split("\n")
-    products = list(itertools.filterfalse(lambda el: not el, products))
-    return len(products)
+    return Utils.products_storage.count_products(path)
 
 
-def cache_blacklist(blacklist: list[str]) -> None:
+class Blacklist:
     """
-    Кэширует черный список.
+    Черный список. Никнеймы сравниваются без учета регистра за O(1), порядок добавления сохраняется.
+    Методы :meth:`add_users` и :meth:`remove_users` сохраняют изменения в хранилище по элементам, не перезаписывая
+    весь черный список.
 
-    :param blacklist: черный список.
+    :param usernames: никнеймы.
+    """
+    def __init__(self, usernames: Iterable[str] = ()):
+        self.__users: dict[str, str] = {}
+        for username in usernames:
+            self.append(username)
+
+    @staticmethod
+    def normalize(username: str) -> str:
+        """
+        Приводит никнейм к виду, в котором он хранится в индексе черного списка.
+
+        :param username: никнейм.
+
+        :return: нормализованный никнейм.
+        """
+        return username.strip().casefold()
+
+    def __contains__(self, username: str | None) -> bool:
+        return isinstance(username, str) and self.normalize(username) in self.__users
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__users.values())
+
+    def __len__(self) -> int:
+        return len(self.__users)
+
+    def append(self, username: str) -> None:
+        """
+        Добавляет никнейм в черный список без сохранения в хранилище (см. :func:`cache_blacklist`).
+
+        :param username: никнейм.
+        """
+        username = username.strip()
+        if username:
+            self.__users.setdefault(self.normalize(username), username)
+
+    def remove(self, username: str) -> None:
+        """
+        Удаляет никнейм из черного списка без сохранения в хранилище (см. :func:`cache_blacklist`).
+
+        :param username: никнейм.
+        """
+        if username not in self:
+            raise ValueError(f"{username} is not in blacklist")
+        del self.__users[self.normalize(username)]
+
+    def add_users(self, usernames: Iterable[str]) -> list[str]:
+        """
+        Добавляет никнеймы в черный список и сохраняет изменения в хранилище.
+
+        :param usernames: никнеймы.
+
+        :return: добавленные никнеймы (без уже находившихся в черном списке).
+        """
+        added = []
+        for username in usernames:
+            username = username.strip()
+            if not username or username in self:
+                continue
+            self.append(username)
+            added.append(username)
+        if added:
+            Utils.storage.get_storage().add_items("blacklist", added)
+        return added
+
+    def remove_users(self, usernames: Iterable[str]) -> list[str]:
+        """
+        Удаляет никнеймы из черного списка и сохраняет изменения в хранилище.
+
+        :param usernames: никнеймы.
+
+        :return: удаленные никнеймы (в том виде, в котором они хранились в черном списке).
+        """
+        removed = []
+        for username in usernames:
+            if username in self:
+                removed.append(self.__users.pop(self.normalize(username)))
+        if removed:
+            Utils.storage.get_storage().remove_items("blacklist", removed)
+        return removed
+
+
+def cache_blacklist(blacklist: Blacklist | list[str]) -> None:
     """
-    if not os.path.exists("storage/cache"):
-        os.makedirs("storage/cache")
+    Кэширует черный список (перезаписывает весь черный список).
 
-    with open("storage/cache/blacklist.json", "w", encoding="utf-8") as f:
-        f.write(json.dumps(blacklist, indent=4))
+    :param blacklist: черный список.
+    """
+    Utils.storage.get_storage().save("blacklist", list(blacklist))
 
 
-def load_blacklist() -> list[str]:
+def load_blacklist() -> Blacklist:
     """
     Загружает черный список.
 
     :return: черный список.
     """
-    if not os.path.exists("storage/cache/blacklist.json"):
-        return []
-
-    with open("storage/cache/blacklist.json", "r", encoding="utf-8") as f:
-        blacklist = f.read()
-
-        try:
-            blacklist = json.loads(blacklist)
-        except json.decoder.JSONDecodeError:
-            return []
-        return blacklist
+    usernames = Utils.storage.get_storage().load("blacklist", [])
+    blacklist = Blacklist(usernames)
+    if len(blacklist) != len(usernames):
+        # В черном списке были дубликаты (например, никнеймы в разных регистрах).
+        cache_blacklist(blacklist)
+    return blacklist
 
 
 #def cache_disabled_plugins(disabled_plugins: list[str]) -> None:
@@ -97,27 +172,33 @@ def load_blacklist() -> list[str]:
 #            return []
 
 
-def cache_old_users(old_users: list[int]):
+def cache_old_users(old_users: set[int] | list[int]):
     """
-    Сохраняет в кэш список пользователей, которые уже писали на аккаунт.
+    Сохраняет в кэш список пользователей, которые уже писали на аккаунт (перезаписывает весь список).
     """
-    if not os.path.exists("storage/cache"):
-        os.makedirs("storage/cache")
-    with open(f"storage/cache/old_users.json", "w", encoding="utf-8") as f:
-        f.write(json.dumps(old_users, ensure_ascii=False))
+    Utils.storage.get_storage().save("old_users", list(old_users))
 
 
-def load_old_users() -> list[int]:
+def add_old_users(users: list[int]):
     """
-    Загружает из кэша список пользователей, которые уже писали на аккаунт.
+    Добавляет в кэш пользователей, которые впервые написали на аккаунт (без перезаписи всего списка:
+    в JSON хранилище изменения дописываются в журнал, который периодически уплотняется).
 
-    :return: список ID чатов.
+    :param users: список ID чатов.
     """
-    if not os.path.exists(f"storage/cache/old_users.json"):
-        return []
-    with open(f"storage/cache/old_users.json", "r", encoding="utf-8") as f:
-        users = f.read()
-    return json.loads(users)
+    Utils.storage.get_storage().add_items("old_users", users)
+
+
+def load_old_users() -> set[int]:
+    """
+    Загружает из кэша пользователей, которые уже писали на аккаунт.
+    Раньше возвращала список: новых пользователей нужно добавлять через `add` и сохранять :func:`add_old_users`.
+
+    :return: множество ID чатов.
+    """
+    storage = Utils.storage.get_storage()
+    storage.compact("old_users")
+    return set(storage.load("old_users", []))
 
 
 def create_greeting_text(vertex: Vertex):
@@ -200,35 +281,14 @@ def get_month_name(month_number: int) -> str:
 
 def get_products(path: str, amount: int = 1) -> list[list[str] | int] | None:
     """
-    Берет из товарного файла товар/-ы, удаляет их из товарного файла.
+    Берет из товарного файла товар/-ы, помечает их как выданные (см. :mod:`Utils.products_storage`).
 
     :param path: путь до файла с товарами.
     :param amount: кол-во товара.
 
     :return: [[Товар/-ы], оставшееся кол-во товара]
     """
-    with open(path, "r", encoding="utf-8") as f:
-        products = f.read()
-
-    products = products.split("\n")
-
-    # Убираем пустые элементы
-    products = list(itertools.filterfalse(lambda el: not el, products))
-
-    if not products:
-        raise Utils.exceptions.NoProductsError(path)
-
-    elif len(products) < amount:
-        raise Utils.exceptions.NotEnoughProductsError(path, len(products), amount)
-
-    got_products = products[:amount]
-    save_products = products[amount:]
-    amount = len(save_products)
-
-    with open(path, "w", encoding="utf-8") as f:
-        f.write("\n".join(save_products))
-
-    return [got_products, amount]
+    return Utils.products_storage.pop_products(path, amount)
 
 
 def add_products(path: str, products: list[str], at_zero_position=False):
@@ -239,14 +299,74 @@ def add_products(path: str, products: list[str], at_zero_position=False):
     :param products: товары.
     :param at_zero_position: добавить товары в начало товарного файла.
     """
-    if not at_zero_position:
-        with open(path, "a", encoding="utf-8") as f:
-            f.write("\n"+"\n".join(products))
-    else:
-        with open(path, "r", encoding="utf-8") as f:
-            text = f.read()
-        with open(path, "w", encoding="utf-8") as f:
-            f.write("\n".join(products) + "\n" + text)
+    Utils.products_storage.add_products(path, products, at_zero_position)
+
+
+class LotsMatcher:
+    """
+    Поиск названий лотов (секций конфига автовыдачи) в тексте за один проход (алгоритм Ахо-Корасик).
+    Результат совпадает с последовательной проверкой `pattern in text` по списку паттернов:
+    возвращается первый по порядку паттерн, который содержится в тексте.
+
+    :param patterns: паттерны (названия секций) в порядке приоритета.
+    """
+    def __init__(self, patterns: list[str]):
+        self.patterns: list[str] = list(patterns)
+        # Вершины бора: переходы, суффиксные ссылки и минимальный индекс паттерна,
+        # оканчивающегося в вершине (с учетом суффиксных ссылок).
+        self.__goto: list[dict[str, int]] = [{}]
+        self.__fail: list[int] = [0]
+        self.__best: list[int] = [-1]
+
+        for index, pattern in enumerate(self.patterns):
+            node = 0
+            for char in pattern:
+                next_node = self.__goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self.__goto)
+                    self.__goto[node][char] = next_node
+                    self.__goto.append({})
+                    self.__fail.append(0)
+                    self.__best.append(-1)
+                node = next_node
+            if self.__best[node] == -1:
+                self.__best[node] = index
+
+        queue = list(self.__goto[0].values())
+        for node in queue:
+            for char, child in self.__goto[node].items():
+                fail = self.__fail[node]
+                while fail and char not in self.__goto[fail]:
+                    fail = self.__fail[fail]
+                fail = self.__goto[fail].get(char, 0)
+                self.__fail[child] = fail
+                if self.__best[fail] != -1 and (self.__best[child] == -1 or self.__best[fail] < self.__best[child]):
+                    self.__best[child] = self.__best[fail]
+                queue.append(child)
+
+    def find(self, text: str) -> str | None:
+        """
+        Ищет первый по порядку паттерн, содержащийся в тексте.
+
+        :param text: текст (например, описание заказа или лота).
+
+        :return: найденный паттерн или None.
+        """
+        goto, fail, best_by_node = self.__goto, self.__fail, self.__best
+        best = best_by_node[0]
+        if not best:
+            return self.patterns[0]
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            found = best_by_node[node]
+            if found != -1 and (best == -1 or found < best):
+                best = found
+                if not best:
+                    break
+        return self.patterns[best] if best != -1 else None
 
 
 def format_msg_text(text: str, obj: FunPayAPI.types.Message | FunPayAPI.types.ChatShortcut) -> str:
@@ -325,6 +445,7 @@ def restart_program():
     """
     Полный перезапуск FPV.
     """
+    Utils.persister.flush()
     python = sys.executable
     os.execl(python, python, *sys.argv)
     try:
@@ -341,6 +462,7 @@ def shut_down():
     """
     Полное отключение FPV.
     """
+    Utils.persister.flush()
     try:
         process = psutil.Process()
         process.terminate()
@@ -0,0 +1,107 @@
+"""
+Бенчмарк памяти и времени создания событий Runner'а (FunPayAPI.updater.events) на 100 000 событий новых сообщений.
+
+Сравниваются:
+ - events.NewMessageEvent (__slots__ + слот __dict__ для атрибутов, добавляемых хэндлерами);
+ - __slots__ с перехватом __setattr__ / __getattr__ (доп. атрибуты - в отдельном словаре);
+ - класс без __slots__ (как до перевода событий на __slots__).
+Для каждого варианта замеряются время создания события, память на событие (tracemalloc), а также время и память,
+если хэндлеры добавляют к событию 2 атрибута (как хэндлеры автовыдачи).
+
+Запуск из корня проекта: python benchmarks/events_memory.py
+"""
+from typing import Any
+import tracemalloc
+import argparse
+import time
+import gc
+
+import fixtures  # noqa: F401 (добавляет корень проекта в sys.path)
+from FunPayAPI.updater import events
+from FunPayAPI.common.enums import EventTypes
+from FunPayAPI import types
+
+
+class OverrideEvent:
+    __slots__ = ("runner_tag", "type", "time", "_extra", "message", "stack")
+
+    def __init__(self, runner_tag: str, message_obj: types.Message, stack=None):
+        self.runner_tag = runner_tag
+        self.type = EventTypes.NEW_MESSAGE
+        self.time = time.time()
+        self.message = message_obj
+        self.stack = stack
+
+    def __getattr__(self, name: str):
+        try:
+            return object.__getattribute__(self, "_extra")[name]
+        except (AttributeError, KeyError):
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name: str, value: Any):
+        try:
+            object.__setattr__(self, name, value)
+        except AttributeError:
+            try:
+                extra = object.__getattribute__(self, "_extra")
+            except AttributeError:
+                extra = {}
+                object.__setattr__(self, "_extra", extra)
+            extra[name] = value
+
+
+class DictEvent:
+    def __init__(self, runner_tag: str, message_obj: types.Message, stack=None):
+        self.runner_tag = runner_tag
+        self.type = EventTypes.NEW_MESSAGE
+        self.time = time.time()
+        self.message = message_obj
+        self.stack = stack
+
+
+VARIANTS = {"events.NewMessageEvent": events.NewMessageEvent, "__setattr__ override": OverrideEvent,
+            "without __slots__": DictEvent}
+
+
+def measure(cls, amount: int, extra: bool) -> tuple[float, float]:
+    """
+    :return: (время создания события в мкс, память на событие в байтах).
+    """
+    message = types.Message(1, "text", 1, "user", None, 1, None, determine_msg_type=False)
+    gc.collect()
+    start = time.perf_counter()
+    items = [cls("tag", message) for _ in range(amount)]
+    if extra:
+        for i in items:
+            setattr(i, "config_section_name", "lot")
+            setattr(i, "delivered", True)
+    elapsed = time.perf_counter() - start
+    del items
+
+    gc.collect()
+    tracemalloc.start()
+    items = [cls("tag", message) for _ in range(amount)]
+    if extra:
+        for i in items:
+            setattr(i, "config_section_name", "lot")
+            setattr(i, "delivered", True)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return elapsed / amount * 10 ** 6, memory / amount
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=100000, help="кол-во событий")
+    args = parser.parse_args()
+
+    print(f"Событий: {args.events}.")
+    print(f"{'variant':<24} {'us/event':>9} {'bytes/event':>12} {'+2 attrs, us':>13} {'+2 attrs, bytes':>16}")
+    for name, cls in VARIANTS.items():
+        plain_time, plain_memory = measure(cls, args.events, False)
+        extra_time, extra_memory = measure(cls, args.events, True)
+        print(f"{name:<24} {plain_time:>9.2f} {plain_memory:>12.0f} {extra_time:>13.2f} {extra_memory:>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
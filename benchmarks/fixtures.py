@@ -0,0 +1,142 @@
+"""
+Сохраненные страницы FunPay (benchmarks/pages) и аккаунт, который вместо запросов к FunPay отдает эти страницы.
+Используется бенчмарками и проверками парсинга (запускаются из корня проекта, без доступа к FunPay).
+
+Страницы воспроизводят разметку FunPay, которую читают парсеры FunPayAPI (ники, ID и тексты вымышленные).
+Аккаунт страниц: VertexSeller (ID 1000001); подкатегория лотов 201, пользователь 2000042, заказ ABCD1234,
+чат 87654321.
+"""
+from __future__ import annotations
+from typing import Any, Callable
+
+from datetime import datetime
+import enum
+import sys
+import os
+import re
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from FunPayAPI.account import Account
+from FunPayAPI.common.enums import SubCategoryTypes
+from FunPayAPI import types
+import requests
+
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pages")
+"""Папка с сохраненными страницами."""
+
+ROUTES = [
+    (r"^$", "main.html"),
+    (r"^lots/\d+/$", "lots.html"),
+    (r"^users/\d+/$", "user.html"),
+    (r"^orders/trade", "orders_trade.html"),
+    (r"^orders/\w+/$", "order.html"),
+    (r"^chat/history", "chat_history.json"),
+    (r"^chat/", "chat.html"),
+    (r"^runner/$", "chat_bookmarks.json")
+]
+"""Страницы, которые отдаются на запросы ([(регулярное выражение адреса (без https://funpay.com/), страница)])."""
+
+SCENARIOS: dict[str, Callable[[Account], Any]] = {
+    "main": lambda account: FixtureAccount(html_parser=account.html_parser).get(),
+    "lots": lambda account: account.get_subcategory_public_lots(SubCategoryTypes.COMMON, 201),
+    "user": lambda account: account.get_user(2000042),
+    "orders_trade": lambda account: account.get_sells(),
+    "order": lambda account: account.get_order("ABCD1234"),
+    "chat": lambda account: account.get_chat(87654321),
+    "chat_bookmarks": lambda account: account.request_chats()
+}
+"""Разбор каждой страницы методами аккаунта ({название: функция, принимающая аккаунт}).
+"main" создает новый аккаунт, т.к. категории парсятся только при первом получении главной страницы."""
+
+_pages: dict[str, bytes] = {}
+
+
+def load_page(name: str) -> bytes:
+    """
+    Загружает сохраненную страницу.
+
+    :param name: название файла страницы.
+
+    :return: содержимое страницы.
+    """
+    if name not in _pages:
+        with open(os.path.join(PAGES_DIR, name), "rb") as f:
+            _pages[name] = f.read()
+    return _pages[name]
+
+
+def make_response(content: bytes, link: str = "https://funpay.com/") -> requests.Response:
+    """
+    Создает ответ requests с указанным содержимым (статус 200, кука PHPSESSID).
+    """
+    response = requests.Response()
+    response.status_code = 200
+    response._content = content
+    response.encoding = "utf-8"
+    response.url = link
+    response.cookies.set("PHPSESSID", "fixture")
+    return response
+
+
+class FixtureAccount(Account):
+    """
+    Аккаунт, отвечающий на запросы сохраненными страницами (см. :data:`ROUTES`).
+
+    :param kwargs: аргументы :class:`FunPayAPI.account.Account` (кроме golden_key).
+    """
+    def __init__(self, **kwargs):
+        super().__init__("fixture", **kwargs)
+
+    def method(self, request_method, api_method, headers, payload, exclude_phpsessid=False,
+               raise_not_200=False) -> requests.Response:
+        path = api_method.removeprefix("https://funpay.com").lstrip("/")
+        for pattern, name in ROUTES:
+            if re.search(pattern, path):
+                return make_response(load_page(name), f"https://funpay.com/{path}")
+        raise LookupError(f"Нет сохраненной страницы для {api_method}.")
+
+
+def load_account(**kwargs) -> FixtureAccount:
+    """
+    Создает аккаунт и получает сохраненную главную страницу (категории и данные аккаунта).
+
+    :param kwargs: аргументы :class:`FunPayAPI.account.Account` (кроме golden_key).
+
+    :return: инициализированный аккаунт.
+    """
+    return FixtureAccount(**kwargs).get()
+
+
+def snapshot(obj: Any) -> Any:
+    """
+    Приводит результат парсинга к сравниваемому виду (словари, списки и строки). HTML код не учитывается.
+    Категории и подкатегории представляются ID и названием (иначе граф категорий зацикливается).
+    """
+    if isinstance(obj, types.SubCategory):
+        return f"SubCategory({obj.id}, {obj.name!r}, {obj.type.name}, {obj.category.id})"
+    if isinstance(obj, types.Category):
+        return {"id": obj.id, "name": obj.name, "subcategories": [snapshot(i) for i in obj.get_subcategories()]}
+    if isinstance(obj, Account):
+        return {"id": obj.id, "username": obj.username, "currency": obj.currency, "csrf_token": obj.csrf_token,
+                "active_sales": obj.active_sales, "active_purchases": obj.active_purchases,
+                "categories": [snapshot(i) for i in obj.categories]}
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    if isinstance(obj, enum.Enum):
+        return obj.name
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, (list, tuple)):
+        return [snapshot(i) for i in obj]
+    if isinstance(obj, dict):
+        return {str(key): snapshot(value) for key, value in obj.items()}
+
+    names = [name for cls in type(obj).__mro__ for name in getattr(cls, "__slots__", ())]
+    names.extend(getattr(obj, "__dict__", {}))
+    result = {name: snapshot(getattr(obj, name)) for name in names
+              if not name.startswith("_") and name != "html" and hasattr(obj, name)}
+    if isinstance(obj, types.UserProfile):
+        result["lots"] = snapshot(obj.get_lots())
+    return result
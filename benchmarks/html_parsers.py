@@ -0,0 +1,74 @@
+"""
+Бенчмарк бэкендов парсинга HTML (Account.html_parser) и проверка совпадения результатов парсинга разными бэкендами.
+
+Каждая сохраненная страница (benchmarks/pages, см. benchmarks/fixtures.py) разбирается методами аккаунта
+с каждым установленным бэкендом. Результаты (без HTML кода) сравниваются с результатами html.parser,
+затем замеряется кол-во разобранных страниц в секунду.
+
+Запуск из корня проекта: python benchmarks/html_parsers.py
+"""
+import importlib.util
+import argparse
+import time
+import sys
+
+from fixtures import SCENARIOS, load_account, snapshot
+from FunPayAPI.common.utils import HTML_PARSERS
+
+
+def get_backends() -> list[str]:
+    backends = []
+    for name, module in HTML_PARSERS.items():
+        if module and importlib.util.find_spec(module) is None:
+            print(f"{name}: модуль {module} не установлен, пропускаю.")
+            continue
+        backends.append(name)
+    return backends
+
+
+def check_parity(backends: list[str]) -> int:
+    """
+    Сравнивает результаты парсинга каждой страницы разными бэкендами с результатами html.parser.
+
+    :return: кол-во несовпадений.
+    """
+    expected = {name: snapshot(scenario(load_account())) for name, scenario in SCENARIOS.items()}
+    mismatches = 0
+    for backend in backends[1:]:
+        account = load_account(html_parser=backend)
+        for name, scenario in SCENARIOS.items():
+            if snapshot(scenario(account)) != expected[name]:
+                mismatches += 1
+                print(f"Несовпадение: страница {name}, бэкенд {backend}.")
+    return mismatches
+
+
+def benchmark(backends: list[str], duration: float):
+    print(f"{'page':<16}" + "".join(f"{i + ', pages/s':>20}" for i in backends))
+    for name, scenario in SCENARIOS.items():
+        row = f"{name:<16}"
+        for backend in backends:
+            account = load_account(html_parser=backend)
+            pages, start = 0, time.perf_counter()
+            while (elapsed := time.perf_counter() - start) < duration:
+                scenario(account)
+                pages += 1
+            row += f"{pages / elapsed:>20.1f}"
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--duration", type=float, default=2, help="время замера каждой страницы (в секундах)")
+    args = parser.parse_args()
+
+    backends = get_backends()
+    mismatches = check_parity(backends)
+    print(f"Проверка совпадения результатов с html.parser: {len(SCENARIOS)} страниц, бэкенды {', '.join(backends)}, "
+          f"несовпадений: {mismatches}.")
+    benchmark(backends, args.duration)
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Бенчмарк памяти режимов хранения HTML кода в объектах FunPayAPI (Account.html_retention: full, compressed, none).
+
+Для каждого режима сохраненные страницы (benchmarks/pages) разбираются методами аккаунта, пока не наберется заданное
+кол-во сообщений, заказов (OrderShortcut) и лотов (LotShortcut), как если бы бот хранил их в памяти.
+Память, занятая этими объектами, замеряется tracemalloc; время разбора замеряется отдельным проходом без
+tracemalloc (он замедляет выделение памяти в несколько раз).
+
+Запуск из корня проекта: python benchmarks/html_retention.py
+"""
+import tracemalloc
+import argparse
+import time
+import gc
+
+from fixtures import load_account
+from FunPayAPI.common.enums import SubCategoryTypes
+
+MODES = ("full", "compressed", "none")
+
+
+def collect(mode: str, messages: int, orders: int, lots: int, trace: bool) -> dict[str, float]:
+    account = load_account(html_retention=mode)
+    gc.collect()
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    objects = {"messages": [], "orders": [], "lots": []}
+    while len(objects["messages"]) < messages:
+        objects["messages"].extend(account.get_chat_history(87654321))
+    while len(objects["orders"]) < orders:
+        objects["orders"].extend(account.get_sells()[1])
+    while len(objects["lots"]) < lots:
+        objects["lots"].extend(account.get_subcategory_public_lots(SubCategoryTypes.COMMON, 201))
+    elapsed = time.perf_counter() - start
+    memory = 0
+    if trace:
+        gc.collect()
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+    return {"memory": memory, "time": elapsed, "objects": sum(len(i) for i in objects.values())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--messages", type=int, default=10000, help="кол-во сообщений")
+    parser.add_argument("--orders", type=int, default=2000, help="кол-во заказов")
+    parser.add_argument("--lots", type=int, default=1500, help="кол-во лотов")
+    args = parser.parse_args()
+
+    print(f"Сообщений: {args.messages}, заказов: {args.orders}, лотов: {args.lots}.")
+    print(f"{'mode':<12} {'memory, MB':>11} {'bytes/object':>13} {'parse time, s':>14}")
+    for mode in MODES:
+        result = collect(mode, args.messages, args.orders, args.lots, True)
+        elapsed = collect(mode, args.messages, args.orders, args.lots, False)["time"]
+        print(f"{mode:<12} {result['memory'] / 2 ** 20:>11.2f} {result['memory'] / result['objects']:>13.0f} "
+              f"{elapsed:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
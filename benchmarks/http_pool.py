@@ -0,0 +1,143 @@
+"""
+Нагрузочный тест пула соединений аккаунта (FunPayAPI.common.pool.AccountingHTTPAdapter) на локальном сервере-заглушке.
+
+Заглушка (http.server) отвечает на любой запрос небольшой страницей; установка каждого нового соединения задерживается
+(имитация TCP + TLS рукопожатия с FunPay). Запросы к https://funpay.com адаптер перенаправляет на заглушку.
+Несколько потоков одновременно вызывают Account.method; для каждого размера пула тест выполняется без предварительного
+открытия соединений и после AccountingHTTPAdapter.warm_up. Выводятся счетчики пула (запросы при занятом пуле,
+открытые и повторно использованные соединения) и время ответа.
+
+Запуск из корня проекта: python benchmarks/http_pool.py
+"""
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+import statistics
+import threading
+import argparse
+import time
+import sys
+
+import fixtures  # noqa: F401 (добавляет корень проекта в sys.path)
+from FunPayAPI.account import Account
+from FunPayAPI.common.limiter import RateLimiter
+from FunPayAPI.common.enums import RequestPriorities
+from FunPayAPI.common.pool import AccountingHTTPAdapter
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    handshake: float = 0.05
+    """Задержка установки соединения (в секундах)."""
+    delay: float = 0.01
+    """Задержка ответа (в секундах)."""
+    body = b"<html><body>ok</body></html>"
+
+    def setup(self):
+        time.sleep(self.handshake)
+        super().setup()
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        self.do_HEAD()
+        self.wfile.write(self.body)
+
+    do_POST = do_GET
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+class StubAdapter(AccountingHTTPAdapter):
+    """
+    Адаптер, отправляющий запросы к https://funpay.com на сервер-заглушку.
+    """
+    def __init__(self, stub_url: str, *args, **kwargs):
+        self.stub_url = stub_url
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, *args, **kwargs):
+        request.url = request.url.replace("https://funpay.com", self.stub_url, 1)
+        return super().send(request, *args, **kwargs)
+
+    def warm_up(self, url: str, *args, **kwargs) -> int:
+        return super().warm_up(url.replace("https://funpay.com", self.stub_url, 1), *args, **kwargs)
+
+
+def run(stub_url: str, pool_size: int, threads: int, requests_per_thread: int, warm_up: bool) -> dict:
+    account = Account("stub", pool_size=pool_size)
+    account.adapter = StubAdapter(stub_url, pool_size, max_retries=0)
+    account.session.mount("https://", account.adapter)
+    # Ограничитель частоты не должен влиять на замер пула.
+    account.limiter = RateLimiter(10 ** 6, 10 ** 6, [("default", r"", 10 ** 6, 10 ** 6, RequestPriorities.NORMAL)])
+    if warm_up:
+        account.warm_up(pool_size)
+
+    barrier = threading.Barrier(threads)
+
+    def worker() -> tuple[list[float], int]:
+        latencies, errors = [], 0
+        barrier.wait()
+        for _ in range(requests_per_thread):
+            start = time.perf_counter()
+            response = account.method("get", "chat/", {}, {})
+            latencies.append(time.perf_counter() - start)
+            errors += response.status_code != 200
+        return latencies, errors
+
+    with ThreadPoolExecutor(threads, thread_name_prefix="stress") as executor:
+        results = [i.result() for i in [executor.submit(worker) for _ in range(threads)]]
+    latencies = sorted(i for result in results for i in result[0])
+    first = [result[0][0] for result in results]
+    stats = account.adapter.get_stats()
+    account.session.close()
+    return {"exhausted": stats["exhausted"], "connections": stats["connections"], "reused": stats["reused"],
+            "errors": sum(result[1] for result in results), "first": statistics.mean(first),
+            "p50": latencies[len(latencies) // 2], "p95": latencies[int(len(latencies) * 0.95)],
+            "max": latencies[-1]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--threads", type=int, default=16, help="кол-во одновременно отправляющих запросы потоков")
+    parser.add_argument("--requests", type=int, default=20, help="кол-во запросов в каждом потоке")
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[4, 10, 16], help="размеры пула")
+    parser.add_argument("--handshake", type=float, default=0.05, help="задержка установки соединения (в секундах)")
+    parser.add_argument("--delay", type=float, default=0.01, help="задержка ответа (в секундах)")
+    args = parser.parse_args()
+
+    StubHandler.handshake, StubHandler.delay = args.handshake, args.delay
+    server = StubServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stub_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"Потоков: {args.threads}, запросов в потоке: {args.requests}, установка соединения: "
+          f"{args.handshake * 1000:.0f} мс, ответ: {args.delay * 1000:.0f} мс.")
+    print(f"{'pool':>4} {'warm_up':>7} {'exhausted':>9} {'connections':>11} {'reused':>6} {'first, ms':>9} "
+          f"{'p50, ms':>8} {'p95, ms':>8} {'max, ms':>8}")
+    errors = 0
+    for pool_size in args.pool_sizes:
+        for warm_up in (False, True):
+            result = run(stub_url, pool_size, args.threads, args.requests, warm_up)
+            errors += result["errors"]
+            print(f"{pool_size:>4} {'yes' if warm_up else 'no':>7} {result['exhausted']:>9} "
+                  f"{result['connections']:>11} {result['reused']:>6} {result['first'] * 1000:>9.1f} "
+                  f"{result['p50'] * 1000:>8.1f} {result['p95'] * 1000:>8.1f} {result['max'] * 1000:>8.1f}")
+    server.shutdown()
+    if errors:
+        print(f"Ответов с кодом != 200: {errors}.")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Бенчмарк поиска секций конфига автовыдачи по названию лота (Utils.vertex_tools.LotsMatcher) и проверка
+совпадения результатов с последовательной проверкой `pattern in text` по секциям конфига.
+
+Проверка совпадения: случайные паттерны и тексты из маленького алфавита (много пересечений, вложенных паттернов
+и паттернов, являющихся суффиксами друг друга), а также пустые паттерны и дубликаты.
+Бенчмарк: конфиги из 100 / 1000 / 5000 секций, поиск по названиям лотов (найденным и не найденным),
+сравнение с последовательной проверкой.
+
+Запуск из корня проекта: python benchmarks/lots_matcher.py
+"""
+import argparse
+import random
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Utils.vertex_tools import LotsMatcher
+
+
+WORDS = ("Аккаунт", "Steam", "Ключ", "Подписка", "месяц", "Premium", "Gold", "x2", "Global", "RU", "Навсегда",
+         "Telegram", "Discord", "Nitro", "1000", "монет", "🔥", "Автовыдача", "Gift", "Фарм")
+
+
+def linear_find(patterns: list[str], text: str) -> str | None:
+    return next((pattern for pattern in patterns if pattern in text), None)
+
+
+def check_parity(iterations: int, seed: int) -> int:
+    """
+    Сравнивает результаты LotsMatcher с последовательной проверкой на случайных данных.
+
+    :return: кол-во несовпадений.
+    """
+    rand = random.Random(seed)
+    mismatches = 0
+    for _ in range(iterations):
+        alphabet = "ab" if rand.random() < 0.5 else "abc "
+        patterns = ["".join(rand.choices(alphabet, k=rand.randint(0 if rand.random() < 0.05 else 1, 6)))
+                    for _ in range(rand.randint(0, 12))]
+        if patterns and rand.random() < 0.2:
+            patterns.append(rand.choice(patterns))
+        matcher = LotsMatcher(patterns)
+        for _ in range(10):
+            text = "".join(rand.choices(alphabet, k=rand.randint(0, 20)))
+            if matcher.find(text) != linear_find(patterns, text):
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"Несовпадение: patterns={patterns!r}, text={text!r}, "
+                          f"LotsMatcher={matcher.find(text)!r}, linear={linear_find(patterns, text)!r}")
+    return mismatches
+
+
+def make_sections(rand: random.Random, amount: int) -> list[str]:
+    sections = set()
+    while len(sections) < amount:
+        sections.add(" ".join(rand.choices(WORDS, k=rand.randint(2, 4))) + f" #{rand.randint(0, amount * 10)}")
+    return list(sections)
+
+
+def benchmark(sizes: list[int], lookups: int, seed: int) -> int:
+    """
+    Замеряет время поиска и сверяет результаты с последовательной проверкой.
+
+    :return: кол-во несовпадений.
+    """
+    rand = random.Random(seed)
+    mismatches = 0
+    print(f"{'sections':>8} {'build, ms':>10} {'linear, us':>11} {'matcher, us':>12} {'speedup':>8}")
+    for size in sizes:
+        sections = make_sections(rand, size)
+        texts = []
+        for _ in range(lookups):
+            if rand.random() < 0.5:
+                texts.append(f"{rand.choice(WORDS)} {rand.choice(sections)}, {rand.choice(WORDS)}")
+            else:
+                texts.append(" ".join(rand.choices(WORDS, k=rand.randint(3, 8))))
+
+        start = time.perf_counter()
+        matcher = LotsMatcher(sections)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = [linear_find(sections, text) for text in texts]
+        linear = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = [matcher.find(text) for text in texts]
+        indexed = time.perf_counter() - start
+
+        mismatches += sum(a != b for a, b in zip(expected, found))
+        print(f"{size:>8} {build * 1000:>10.2f} {linear / lookups * 10 ** 6:>11.2f} "
+              f"{indexed / lookups * 10 ** 6:>12.2f} {linear / indexed:>7.1f}x")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000], help="кол-во секций конфига")
+    parser.add_argument("--lookups", type=int, default=2000, help="кол-во поисков для каждого размера конфига")
+    parser.add_argument("--parity", type=int, default=5000, help="кол-во случайных наборов паттернов для проверки")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    mismatches = check_parity(args.parity, args.seed)
+    print(f"Проверка совпадения с последовательной проверкой: {args.parity} наборов паттернов, "
+          f"несовпадений: {mismatches}.")
+    mismatches += benchmark(args.sizes, args.lookups, args.seed)
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Бенчмарк извлечения данных из HTML сообщений (FunPayAPI.common.utils.MessageHTMLExtractor) и проверка совпадения
+с извлечением через дерево BeautifulSoup, которое использовалось раньше.
+
+Для каждого сообщения сохраненной истории чата (benchmarks/pages/chat_history.json) сравниваются ник и бейдж автора,
+ссылка на изображение, текст сообщения и текст системного сообщения. Затем замеряется время обработки сообщения
+обоими способами.
+
+Запуск из корня проекта: python benchmarks/message_extractor.py
+"""
+import argparse
+import time
+import json
+import sys
+
+from fixtures import load_page
+from FunPayAPI.common.utils import MessageHTMLExtractor
+from bs4 import BeautifulSoup
+
+FIELDS = ("author_div_found", "author", "badge", "image_link", "text", "alert_text")
+
+
+def extract_bs4(html: str, backend: str = "html.parser") -> dict:
+    """
+    Извлекает данные из HTML сообщения так же, как Account._Account__parse_messages до MessageHTMLExtractor.
+    """
+    parser = BeautifulSoup(html, backend)
+    author_div = parser.find("div", {"class": "media-user-name"})
+    badge = author_div.find("span") if author_div else None
+    image_link = parser.find("a", {"class": "chat-img-link"})
+    alert = parser.find("div", {"class": "alert alert-with-icon alert-info"})
+    text = parser.find("div", {"class": "chat-msg-text"})
+    return {"author_div_found": author_div is not None,
+            "author": author_div.find("a").text.strip() if author_div else None,
+            "badge": badge.text if badge else None,
+            "image_link": image_link.get("href") if image_link else None,
+            "text": text.text if text else None,
+            "alert_text": alert.text.strip() if alert else None}
+
+
+def extract(html: str) -> dict:
+    extractor = MessageHTMLExtractor().extract(html)
+    result = {field: getattr(extractor, field) for field in FIELDS}
+    result["author"] = result["author"].strip() if result["author"] is not None else None
+    result["alert_text"] = result["alert_text"].strip() if result["alert_text"] is not None else None
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rounds", type=int, default=50, help="кол-во проходов по сообщениям для замера")
+    args = parser.parse_args()
+
+    messages = [i["html"] for i in json.loads(load_page("chat_history.json"))["chat"]["messages"]]
+    mismatches = 0
+    for html in messages:
+        expected, found = extract_bs4(html), extract(html)
+        if expected != found:
+            mismatches += 1
+            print(f"Несовпадение: {html[:100]!r}...\n  bs4: {expected}\n  extractor: {found}")
+    print(f"Проверка совпадения с BeautifulSoup: {len(messages)} сообщений, несовпадений: {mismatches}.")
+
+    timings = {}
+    for name, func in (("bs4 (html.parser)", extract_bs4), ("bs4 (lxml)", lambda html: extract_bs4(html, "lxml")),
+                       ("MessageHTMLExtractor", extract)):
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            for html in messages:
+                func(html)
+        timings[name] = (time.perf_counter() - start) / (args.rounds * len(messages))
+    print(f"{'method':<22} {'us/message':>11} {'messages/s':>11}")
+    for name, timing in timings.items():
+        print(f"{name:<22} {timing * 10 ** 6:>11.1f} {1 / timing:>11.0f}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
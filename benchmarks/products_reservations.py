@@ -0,0 +1,114 @@
+"""
+Стресс-тест хранилища товаров автовыдачи (Utils.products_storage): параллельные резервы товаров из одних и тех же
+товарных файлов, как при одновременных выдачах из хэндлеров и Telegram бота.
+
+Потоки резервируют 1-3 товара из случайного товарного файла и подтверждают резерв или (с заданной вероятностью)
+отменяют его, пока товары не закончатся. После теста проверяется, что:
+ - ни один товар не выдан дважды;
+ - выданные товары вместе с оставшимися в файле совпадают с исходными;
+ - кол-во товаров из индекса (count_products) совпадает с кол-вом товаров в файле.
+
+Запуск из корня проекта: python benchmarks/products_reservations.py
+"""
+from collections import Counter
+import threading
+import argparse
+import tempfile
+import random
+import shutil
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Utils import products_storage
+import Utils.exceptions
+
+
+def worker(paths: list[str], delivered: dict[str, list[str]], stats: Counter, stats_lock: threading.Lock,
+           rollback_chance: float, seed: int):
+    rand = random.Random(seed)
+    paths = list(paths)
+    local = Counter()
+    while paths:
+        path = rand.choice(paths)
+        amount = rand.randint(1, 3)
+        try:
+            reservation = products_storage.reserve_products(path, amount)
+        except Utils.exceptions.NoProductsError:
+            paths.remove(path)
+            continue
+        except Utils.exceptions.NotEnoughProductsError:
+            local["not_enough"] += 1
+            continue
+        if rand.random() < rollback_chance:
+            reservation.rollback()
+            local["rollbacks"] += 1
+            continue
+        reservation.commit()
+        local["commits"] += 1
+        delivered[path].extend(reservation.products)
+    with stats_lock:
+        stats.update(local)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--threads", type=int, default=16, help="кол-во потоков")
+    parser.add_argument("--files", type=int, default=4, help="кол-во товарных файлов")
+    parser.add_argument("--products", type=int, default=2000, help="кол-во товаров в каждом файле")
+    parser.add_argument("--rollback", type=float, default=0.2, help="вероятность отмены резерва")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="fpv_products_bench_")
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        os.makedirs("storage/products")
+        initial = {}
+        for i in range(args.files):
+            path = f"storage/products/{i}.txt"
+            initial[path] = [f"key-{i}-{j}" for j in range(args.products)]
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(initial[path]))
+
+        delivered = {path: [] for path in initial}
+        stats, stats_lock = Counter(), threading.Lock()
+        threads = [threading.Thread(target=worker,
+                                    args=(list(initial), delivered, stats, stats_lock, args.rollback, i))
+                   for i in range(args.threads)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        errors = []
+        for path, products in initial.items():
+            with open(path, "r", encoding="utf-8") as f:
+                left = [i for i in f.read().split("\n") if i]
+            duplicates = [i for i, count in Counter(delivered[path]).items() if count > 1]
+            if duplicates:
+                errors.append(f"{path}: товары выданы повторно: {duplicates[:5]}")
+            if Counter(delivered[path]) + Counter(left) != Counter(products):
+                errors.append(f"{path}: выданные и оставшиеся товары не совпадают с исходными")
+            if products_storage.count_products(path) != len(left):
+                errors.append(f"{path}: count_products = {products_storage.count_products(path)}, "
+                              f"в файле {len(left)}")
+
+        reservations = stats["commits"] + stats["rollbacks"]
+        print(f"Потоков: {args.threads}, файлов: {args.files}, товаров: {args.files * args.products}.")
+        print(f"Резервов: {reservations} (подтверждено {stats['commits']}, отменено {stats['rollbacks']}) "
+              f"за {elapsed:.2f} с ({reservations / elapsed:.0f} / с).")
+        for error in errors:
+            print(error)
+        sys.exit(1 if errors else 0)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
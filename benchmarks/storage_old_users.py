@@ -0,0 +1,78 @@
+"""
+Бенчмарк хранилищ состояния (Utils.storage): стоимость добавления пользователя в список уже написавших пользователей
+(old_users) в зависимости от размера списка. Стоимость записи не должна расти с размером списка.
+
+Для каждого хранилища (json, sqlite) и размера списка (10^3, 10^4, 10^5) список заполняется, затем замеряется время
+добавления пользователей по одному (как в хэндлере новых сообщений). Для сравнения замеряется перезапись всего списка.
+Макс. время - уплотнение журнала (раз в JSONStorage.JOURNAL_LIMIT добавлений). После замера список загружается
+заново и сверяется с ожидаемым.
+
+Запуск из корня проекта: python benchmarks/storage_old_users.py
+"""
+import statistics
+import argparse
+import tempfile
+import shutil
+import time
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Utils import storage, persister
+
+
+def measure(backend: str, size: int, adds: int) -> dict[str, float]:
+    directory = tempfile.mkdtemp(prefix="fpv_storage_bench_")
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        os.makedirs(storage.CACHE_DIR)
+        with open(os.path.join(storage.CACHE_DIR, "old_users.json"), "w", encoding="utf-8") as f:
+            f.write(json.dumps(list(range(size))))
+        current = storage.init_storage(backend)
+        current.compact("old_users")
+        current.load("old_users", [])
+        persister.flush()
+
+        timings = []
+        for user in range(size, size + adds):
+            start = time.perf_counter()
+            current.add_items("old_users", [user])
+            timings.append(time.perf_counter() - start)
+        persister.flush()
+
+        users = list(range(size + adds))
+        start = time.perf_counter()
+        persister.atomic_write(os.path.join(storage.CACHE_DIR, "rewrite.json"), json.dumps(users))
+        rewrite = time.perf_counter() - start
+
+        storage.init_storage("json")  # Закрывает текущее хранилище.
+        reloaded = storage.init_storage(backend).load("old_users", [])
+        assert sorted(reloaded) == users, f"{backend}: список после перезагрузки не совпадает с ожидаемым"
+        storage.get_storage().close()
+        timings.sort()
+        return {"mean": statistics.mean(timings), "p99": timings[int(len(timings) * 0.99) - 1],
+                "max": timings[-1], "rewrite": rewrite}
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--adds", type=int, default=2000, help="кол-во добавлений для каждого размера списка")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10 ** 3, 10 ** 4, 10 ** 5])
+    args = parser.parse_args()
+
+    print(f"{'backend':<8} {'size':>8} {'mean, ms':>10} {'p99, ms':>10} {'max, ms':>10} {'rewrite, ms':>12}")
+    for backend in storage.BACKENDS:
+        for size in args.sizes:
+            result = measure(backend, size, args.adds)
+            print(f"{backend:<8} {size:>8} {result['mean'] * 1000:>10.3f} {result['p99'] * 1000:>10.3f} "
+                  f"{result['max'] * 1000:>10.3f} {result['rewrite'] * 1000:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -81,7 +81,13 @@ default_config = {
     "Other": {
         "watermark": "",
         "requestsDelay": "4",
-        "language": "ru"
+        "language": "ru",
+        "htmlParser": "html.parser",
+        "chatRequestsConcurrency": "1",
+        "htmlRetention": "full",
+        "deduplicateProducts": "0",
+        "storageBackend": "json",
+        "connectionPoolSize": "10"
     }
 }
 
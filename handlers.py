@@ -14,7 +14,7 @@ from FunPayAPI.updater.events import *
 
 
 from tg_bot import utils, keyboards
-from Utils import vertex_tools
+from Utils import vertex_tools, products_storage
 from locales.localizer import Localizer
 from threading import Thread
 import configparser
@@ -71,8 +71,8 @@ def save_init_chats_handler(c: Vertex, e: InitialChatEvent):
     Кэширует существующие чаты (чтобы не отправлять приветственные сообщения).
     """
     if c.MAIN_CFG["Greetings"].getboolean("cacheInitChats") and e.chat.id not in c.old_users:
-        c.old_users.append(e.chat.id)
-        vertex_tools.cache_old_users(c.old_users)
+        c.old_users.add(e.chat.id)
+        vertex_tools.add_old_users([e.chat.id])
 
 
 # NEW MESSAGE / LAST CHAT MESSAGE CHANGED
@@ -150,8 +150,8 @@ def add_old_user_handler(c: Vertex, e: NewMessageEvent | LastChatMessageChangedE
 
     if chat_id in c.old_users:
         return
-    c.old_users.append(chat_id)
-    vertex_tools.cache_old_users(c.old_users)
+    c.old_users.add(chat_id)
+    vertex_tools.add_old_users([chat_id])
 
 
 def send_response_handler(c: Vertex, e: NewMessageEvent | LastChatMessageChangedEvent):
@@ -377,7 +377,7 @@ def test_auto_delivery_handler(c: Vertex, e: NewMessageEvent | LastChatMessageCh
     html = ORDER_HTML_TEMPLATE.replace("$username", chat_name).replace("$lot_name", lot_name).replace("$date", date_text)
 
     fake_order = OrderShortcut("ADTEST", lot_name, 0.0, chat_name, 000000, types.OrderStatuses.PAID,
-                               date, "Авто-выдача, Тест", html)
+                               date, "Авто-выдача, Тест", html, date_left="только что")
 
     fake_event = NewOrderEvent(e.runner_tag, fake_order)
     c.run_handlers(c.new_order_handlers, (c, fake_event,))
@@ -406,10 +406,8 @@ def get_lot_config_by_name(c: Vertex, name: str) -> configparser.SectionProxy |
 
     :return: секцию конфига или None.
     """
-    for i in c.AD_CFG.sections():
-        if i in name:
-            return c.AD_CFG[i]
-    return None
+    section_name = c.get_ad_matcher().find(name)
+    return c.AD_CFG[section_name] if section_name is not None else None
 
 
 def check_products_amount(config_obj: configparser.SectionProxy) -> int:
@@ -446,13 +444,8 @@ def log_new_order_handler(c: Vertex, e: NewOrderEvent, *args):
 
 
 def setup_event_attributes_handler(c: Vertex, e: NewOrderEvent, *args):
-    config_section_name = None
-    config_section_obj = None
-    for lot_name in c.AD_CFG:
-        if lot_name in e.order.description:
-            config_section_obj = c.AD_CFG[lot_name]
-            config_section_name = lot_name
-            break
+    config_section_name = c.get_ad_matcher().find(e.order.description)
+    config_section_obj = c.AD_CFG[config_section_name] if config_section_name is not None else None
 
     attributes = {"config_section_name": config_section_name, "config_section_obj": config_section_obj,
                   "delivered": False, "delivery_text": None, "goods_delivered": 0, "goods_left": None,
@@ -499,14 +492,15 @@ def deliver_goods(c: Vertex, e: NewOrderEvent, *args):
     cfg_obj = getattr(e, "config_section_obj")
     delivery_text = vertex_tools.format_order_text(cfg_obj["response"], e.order)
 
-    amount, goods_left, products = 1, -1, []
+    amount, goods_left, reservation = 1, -1, None
     try:
         if file_name := cfg_obj.get("productsFileName"):
             if c.multidelivery_enabled and not cfg_obj.getboolean("disableMultiDelivery"):
                 amount_re = AMOUNT_EXPRESSION.findall(e.order.description)
                 amount = int(amount_re[0].split(" ")[0]) if amount_re else 1
-            products, goods_left = vertex_tools.get_products(f"storage/products/{file_name}", amount)
-            delivery_text = delivery_text.replace("$product", "\n".join(products).replace("\\n", "\n"))
+            reservation = products_storage.reserve_products(f"storage/products/{file_name}", amount)
+            goods_left = reservation.left
+            delivery_text = delivery_text.replace("$product", "\n".join(reservation.products).replace("\\n", "\n"))
     except Exception as exc:
         logger.error(f"Произошла ошибка при получении товаров для заказа $YELLOW{e.order.id}: {str(exc)}$RESET")
         logger.debug("TRACEBACK", exc)
@@ -519,9 +513,11 @@ def deliver_goods(c: Vertex, e: NewOrderEvent, *args):
         logger.error(f"Не удалось отправить товар для ордера $YELLOW{e.order.id}$RESET.")
         setattr(e, "error", 1)
         setattr(e, "error_text", f"Не удалось отправить сообщение с товаром для заказа {e.order.id}.")
-        if file_name and products:
-            vertex_tools.add_products(f"storage/products/{file_name}", products, at_zero_position=True)
+        if reservation:
+            reservation.rollback()
     else:
+        if reservation:
+            reservation.commit()
         logger.info(f"Товар для заказа {e.order.id} выдан.")
         setattr(e, "delivered", True)
         setattr(e, "delivery_text", delivery_text)
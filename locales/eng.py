@@ -213,6 +213,21 @@ sys_info = """<b><u>Data summary</u></b>
     Uptime:  <code>{}</code>
     Chat ID:  <code>{}</code>"""
 
+api_stats = """<b><u>FunPay requests</u></b> (since <code>{}</code>)
+
+{}
+
+<b>Other:</b>
+    429 responses:  <code>{}</code>
+    Connections opened / reused:  <code>{}</code> / <code>{}</code>
+    Connection pool exhausted:  <code>{}</code> times (max concurrent requests: <code>{}</code>)
+    Cache (hits / misses):  <code>{}</code> / <code>{}</code>
+    Coalesced identical requests:  <code>{}</code>"""
+api_stats_method = "<b>{}</b>: <code>{}</code> req., p50 <code>{}</code> s, p95 <code>{}</code> s, " \
+                   "<code>{}</code> KB, statuses: <code>{}</code>, retries: <code>{}</code> (<code>{}</code> s)"
+api_stats_empty = "❌ No requests to FunPay yet."
+api_stats_exported = "📊 FunPay request metrics."
+
 act_blacklist = """Enter the username you want to add to the blacklist."""
 already_blacklisted = "❌ <code>{}</code> is already on the blacklist."
 user_blacklisted = "✅ <code>{}</code> is blacklisted."
@@ -220,6 +235,9 @@ act_unban = "Enter the username you want to remove from the blacklist."
 not_blacklisted = "❌ <code>{}</code> is not blacklisted."
 user_unbanned = "✅ <code>{}</code> is no longer blacklisted."
 blacklist_empty = "❌ Blacklist is empty."
+blacklist_exported = "📋 Blacklisted users: <code>{}</code>."
+act_import_blacklist = "Send a text file with the usernames you want to blacklist (one per line or comma-separated)."
+blacklist_imported = "✅ Blacklisted: <code>{}</code>. Already on the blacklist: <code>{}</code>."
 
 act_edit_watermark = "Enter a new watermark text. If you want to remove the watermark, send <code>-</code>."
 watermark_changed = "✅ The message watermark has been changed."
@@ -314,6 +332,7 @@ gf_uses = "Used in lots"
 gf_send_new_goods = "Enter the goods you want to add to goods file.\n\nEach new line (<code>Shift+Enter</code>) is a new item."
 gf_add_goods_err = "❌ Failed to add new goods."
 gf_new_goods = "✅ <code>{}</code> item(s) added to <code>storage/products/{}</code>."
+gf_duplicates_skipped = "♻️ Duplicates skipped: <code>{}</code>."
 gf_empty_error = "❌ File storage/products/{} is empty."
 gf_linked_err = "❌ File <code>storage/products/{}</code> is linked to one ore more lots.\n"\
                 "Before deleting this goods file, unlink it from all lots."
@@ -374,12 +393,16 @@ cmd_upload_img = "upload an image to FunPay"
 cmd_ban = "add user to the blacklist"
 cmd_unban = "delete user from blacklist"
 cmd_black_list = "blacklist"
+cmd_import_black_list = "blacklist users from a file"
+cmd_export_black_list = "download the blacklist as a file"
 cmd_watermark = "change message watermark"
 cmd_logs = "download current log-file"
 cmd_del_logs = "delete old log-files"
 cmd_about = "about current version"
 cmd_old_orders = "sends a list of open orders that are more than 24 hours old"
 cmd_sys = "system load information"
+cmd_api_stats = "FunPay request statistics"
+cmd_export_api_stats = "download FunPay request metrics as a file"
 cmd_keyboard = "open keyboard"
 cmd_change_cookie = "change golden_key cookie"
 cmd_restart = "restart FPV"
@@ -416,6 +439,7 @@ exc_param_cant_be_empty = "The value of the option \"{}\" cannot be empty."
 exc_param_value_invalid = "Invalid value of the option \"{}\". Possible values: {}. Current value: \"{}\"."
 exc_goods_file_not_found = "Specified goods file \"{}\" not found."
 exc_goods_file_is_empty = "No items in goods file \"{}\"."
+exc_goods_file_changed = "Goods file \"{}\" was modified, delivered items cannot be determined. Delivery is stopped."
 exc_not_enough_items = "Not enough items in goods file \"{}\". Requested: {}, available: {}."
 exc_no_product_var = "\"productsFileName\" is specified, but the $product variable is not in \"response\"."
 exc_no_section = "Section does not exists."
@@ -436,6 +460,7 @@ log_access_granted = "$MAGENTA@{} (ID: {})$RESET gained access to the control pa
 log_new_ad_key = "$MAGENTA@{} (ID: {})$RESET created a key to deliver $YELLOW{}$RESET: $CYAN{}$RESET."
 log_user_blacklisted = "$MAGENTA@{} (ID: {})$RESET has blacklisted $YELLOW{}$RESET."
 log_user_unbanned = "$MAGENTA@{} (ID: {})$RESET has removed $YELLOW{}$RESET from the blacklist."
+log_blacklist_imported = "$MAGENTA@{} (ID: {})$RESET has blacklisted $YELLOW{}$RESET users from a file."
 log_watermark_changed = "$MAGENTA@{} (ID: {})$RESET changed the message watermark to YELLOW{}$RESET."
 log_watermark_deleted = "$MAGENTA@{} (ID: {})$RESET deleted the message watermark."
 log_greeting_changed = "$MAGENTA@{} (ID: {})$RESET changed the greeting text to $YELLOW{}$RESET."
@@ -480,6 +505,7 @@ crd_proxy_err = "Failed to connect to the proxy. Make sure that the data is ente
 crd_proxy_success = "Proxy verified successfully! Requests to FunPay will be sent from the IP address $YELLOW{}$RESET."
 crd_acc_get_timeout_err = "Failed to load account data: Timeout exceeded."
 crd_acc_get_unexpected_err = "An unexpected error occurred while retrieving account information."
+crd_warm_up_err = "Failed to open connections to FunPay in advance ({}). They will be opened by the first requests."
 crd_try_again_in_n_secs = "The next attempt is in {} seconds(-s)..."
 crd_getting_profile_data = "Getting lots and categories data..."
 crd_profile_get_timeout_err = "Failed to load account lots data: timeout exceeded."
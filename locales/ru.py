@@ -213,6 +213,21 @@ sys_info = """<b><u>Сводка данных</u></b>
     Аптайм:  <code>{}</code>
     ID чата:  <code>{}</code>"""
 
+api_stats = """<b><u>Запросы к FunPay</u></b> (с <code>{}</code>)
+
+{}
+
+<b>Прочее:</b>
+    Ответов 429:  <code>{}</code>
+    Соединений открыто / переиспользовано:  <code>{}</code> / <code>{}</code>
+    Все соединения пула заняты:  <code>{}</code> раз (макс. запросов одновременно: <code>{}</code>)
+    Кэш (попадания / промахи):  <code>{}</code> / <code>{}</code>
+    Объединено одинаковых запросов:  <code>{}</code>"""
+api_stats_method = "<b>{}</b>: <code>{}</code> зап., p50 <code>{}</code> с, p95 <code>{}</code> с, " \
+                   "<code>{}</code> КБ, статусы: <code>{}</code>, повторы: <code>{}</code> (<code>{}</code> с)"
+api_stats_empty = "❌ Запросов к FunPay еще не было."
+api_stats_exported = "📊 Метрики запросов к FunPay."
+
 act_blacklist = """Введи имя пользователя, которого хочешь добавить в ЧС."""
 already_blacklisted = "❌ <code>{}</code> уже находится в ЧС."
 user_blacklisted = "✅ <code>{}</code> добавлен в ЧС."
@@ -220,6 +235,10 @@ act_unban = "Введи имя пользователя, которого хоч
 not_blacklisted = "❌ <code>{}</code> не в ЧС."
 user_unbanned = "✅ <code>{}</code> удален из ЧС."
 blacklist_empty = "❌ Черный список пуст."
+blacklist_exported = "📋 Пользователей в ЧС: <code>{}</code>."
+act_import_blacklist = "Отправь текстовый файл с никнеймами пользователей, которых хочешь добавить в ЧС " \
+                       "(по одному в строке или через запятую)."
+blacklist_imported = "✅ Добавлено в ЧС: <code>{}</code>. Уже были в ЧС: <code>{}</code>."
 
 act_edit_watermark = "Введи новый текст водяного знака. Если нужно удалить водяной знак, отправь <code>-</code>."
 watermark_changed = "✅ Водяной знак сообщений изменен."
@@ -315,6 +334,7 @@ gf_uses = "Используется в лотах"
 gf_send_new_goods = "Отправь товары, которые хочешь добавить в товарный файл.\n\nКаждая новая строка (<code>Shift+Enter</code>) - новый товар."
 gf_add_goods_err = "❌ Не удалось добавить товары в файл."
 gf_new_goods = "✅ <code>{}</code> товар(-а / -ов) добавлен(-о) в файл  <code>storage/products/{}</code>."
+gf_duplicates_skipped = "♻️ Пропущено дубликатов: <code>{}</code>."
 gf_empty_error = "❌ Файл storage/products/{} пуст."
 gf_linked_err = "❌ Файл <code>storage/products/{}</code> привязан к одному или нескольким лотам.\n"\
                 "Перед удалением этого товарного файла отвяжи его от всех лотов."
@@ -382,12 +402,16 @@ cmd_upload_img = "выгрузить изображение на FunPay"
 cmd_ban = "добавить пользователя в ЧС"
 cmd_unban = "удалить пользователя из ЧС"
 cmd_black_list = "черный список"
+cmd_import_black_list = "добавить пользователей в ЧС из файла"
+cmd_export_black_list = "выгрузить черный список файлом"
 cmd_watermark = "изменить водяной знак сообщений"
 cmd_logs = "загрузить текущий лог-файл"
 cmd_del_logs = "удалить старые лог-файлы"
 cmd_about = "об текущей версии"
 cmd_old_orders = "отправляет список открытых заказов, которым более 24 часов"
 cmd_sys = "информация о нагрузке на систему"
+cmd_api_stats = "статистика запросов к FunPay"
+cmd_export_api_stats = "выгрузить метрики запросов к FunPay файлом"
 cmd_keyboard = "открыть клавиатуру"
 cmd_change_cookie = "меняет golden_key куки"
 cmd_restart = "перезапустить FPV"
@@ -425,6 +449,7 @@ exc_param_cant_be_empty = "Значение параметра \"{}\" не мо
 exc_param_value_invalid = "Недопустимое значение параметра \"{}\". Допустимые значения: {}. Текущее значение: \"{}\"."
 exc_goods_file_not_found = "Указанный товарный файл \"{}\" не найден."
 exc_goods_file_is_empty = "В файле \"{}\" отсутствуют товары."
+exc_goods_file_changed = "Файл \"{}\" был изменен, выданные товары невозможно определить. Выдача остановлена."
 exc_not_enough_items = "В файле \"{}\" недостаточно товаров. Запрошено: {}, доступно: {}."
 exc_no_product_var = "Указан \"productsFileName\", но в параметре \"response\" отсутствует переменная $product."
 exc_no_section = "Секция отсутствует."
@@ -446,6 +471,7 @@ log_access_granted = "$MAGENTA@{} (ID: {})$RESET получил доступ к
 log_new_ad_key = "$MAGENTA@{} (ID: {})$RESET создал ключ для выдачи $YELLOW{}$RESET: $CYAN{}$RESET."
 log_user_blacklisted = "$MAGENTA@{} (ID: {})$RESET добавил $YELLOW{}$RESET в ЧС."
 log_user_unbanned = "$MAGENTA@{} (ID: {})$RESET удалил $YELLOW{}$RESET из ЧС."
+log_blacklist_imported = "$MAGENTA@{} (ID: {})$RESET добавил в ЧС $YELLOW{}$RESET пользователей из файла."
 log_watermark_changed = "$MAGENTA@{} (ID: {})$RESET изменил водяной знак сообщений на YELLOW{}$RESET."
 log_watermark_deleted = "$MAGENTA@{} (ID: {})$RESET удалил водяной знак сообщений."
 log_greeting_changed = "$MAGENTA@{} (ID: {})$RESET изменил текст приветствия на $YELLOW{}$RESET."
@@ -490,6 +516,7 @@ crd_proxy_err = "Не удалось подключиться к прокси. 
 crd_proxy_success = "Прокси успешно проверен! Запросы к FunPay будут отправлять с IP-адреса $YELLOW{}$RESET."
 crd_acc_get_timeout_err = "Не удалось загрузить данные об аккаунте: превышен тайм-аут ожидания."
 crd_acc_get_unexpected_err = "Произошла непредвиденная ошибка при получении данных аккаунта."
+crd_warm_up_err = "Не удалось заранее открыть соединения с FunPay ({}). Соединения будут открыты при первых запросах."
 crd_try_again_in_n_secs = "Повторю попытку через {} секунд(-у/-ы)..."
 crd_getting_profile_data = "Получаю данные о лотах и категориях..."
 crd_profile_get_timeout_err = "Не удалось загрузить данные о лотах аккаунта: превышен тайм-аут ожидания."
@@ -407,6 +407,11 @@ Callback для активации режима ввода никнейма FunP
 User-state: ожидается сообщение с никнеймом FunPay пользователя для удаления его из ЧС.
 """
 
+IMPORT_BLACKLIST = "import_blacklist"
+"""
+User-state: ожидается текстовый файл с никнеймами FunPay пользователей для добавления их в ЧС.
+"""
+
 
 SHUT_DOWN = "37"
 """
@@ -14,10 +14,9 @@ from tg_bot import utils, keyboards as kb, CBT, MENU_CFG
 from tg_bot.static_keyboards import CLEAR_STATE_BTN
 from telebot.types import InlineKeyboardMarkup as K, InlineKeyboardButton as B, Message, CallbackQuery
 
-from Utils import vertex_tools
+from Utils import vertex_tools, products_storage
 from locales.localizer import Localizer
 
-import itertools
 import random
 import string
 import logging
@@ -502,7 +501,6 @@ $product""")
             return
 
         file_name = files[file_index]
-        products = list(itertools.filterfalse(lambda el: not el, m.text.strip().split("\n")))
 
         if prev_page == 0:
             back_btn = B(_("gl_back"), callback_data=f"{CBT.EDIT_PRODUCTS_FILE}:{file_index}:{offset}")
@@ -515,21 +513,22 @@ $product""")
         add_more_btn = B(_("gf_add_more"),
                          callback_data=f"{CBT.ADD_PRODUCTS_TO_FILE}:{file_index}:{el_index}:{offset}:{prev_page}")
 
-        products_text = "\n".join(products)
-
         try:
-            with open(f"storage/products/{file_name}", "a", encoding="utf-8") as f:
-                f.write("\n")
-                f.write(products_text)
+            added, duplicates = products_storage.import_products(
+                f"storage/products/{file_name}", [m.text.encode("utf-8")],
+                deduplicate=crd.MAIN_CFG["Other"].getboolean("deduplicateProducts"))
         except:
             logger.debug("TRACEBACK", exc_info=True)
             keyboard = K().row(back_btn, try_again_btn)
             bot.reply_to(m, _("gf_add_goods_err"), reply_markup=keyboard)
             return
 
-        logger.info(_("log_gf_new_goods", m.from_user.username, m.from_user.id, len(products), file_name))
+        logger.info(_("log_gf_new_goods", m.from_user.username, m.from_user.id, added, file_name))
         keyboard = K().row(back_btn, add_more_btn)
-        bot.reply_to(m, _("gf_new_goods", len(products), file_name), reply_markup=keyboard)
+        text = _("gf_new_goods", added, file_name)
+        if duplicates:
+            text += "\n" + _("gf_duplicates_skipped", duplicates)
+        bot.reply_to(m, text, reply_markup=keyboard)
 
     def send_products_file(c: CallbackQuery):
         """
@@ -543,6 +542,7 @@ $product""")
             return
 
         file_name = files[file_index]
+        products_storage.compact(f"storage/products/{file_name}")
         with open(f"storage/products/{file_name}", "r", encoding="utf-8") as f:
             data = f.read().strip()
             if not data:
@@ -73,11 +73,15 @@ class TGBot:
             "ban": _("cmd_ban"),
             "unban": _("cmd_unban"),
             "black_list": _("cmd_black_list"),
+            "import_black_list": _("cmd_import_black_list"),
+            "export_black_list": _("cmd_export_black_list"),
             "watermark": _("cmd_watermark"),
             "logs": _("cmd_logs"),
             "del_logs": _("cmd_del_logs"),
             "about": _("cmd_about"),
             "sys": _("cmd_sys"),
+            "api_stats": _("cmd_api_stats"),
+            "export_api_stats": _("cmd_export_api_stats"),
             "old_orders": _("cmd_old_orders"),
             "keyboard": _("cmd_keyboard"),
             "change_cookie": _("cmd_change_cookie"),
@@ -437,8 +441,7 @@ class TGBot:
             self.bot.send_message(m.chat.id, _("already_blacklisted", nickname))
             return
 
-        self.vertex.blacklist.append(nickname)
-        vertex_tools.cache_blacklist(self.vertex.blacklist)
+        self.vertex.blacklist.add_users([nickname])
         logger.info(_("log_user_blacklisted", m.from_user.username, m.from_user.id, nickname))
         self.bot.send_message(m.chat.id, _("user_blacklisted", nickname))
 
@@ -458,8 +461,7 @@ class TGBot:
         if nickname not in self.vertex.blacklist:
             self.bot.send_message(m.chat.id, _("not_blacklisted", nickname))
             return
-        self.vertex.blacklist.remove(nickname)
-        vertex_tools.cache_blacklist(self.vertex.blacklist)
+        self.vertex.blacklist.remove_users([nickname])
         logger.info(_("log_user_unbanned", m.from_user.username, m.from_user.id, nickname))
         self.bot.send_message(m.chat.id, _("user_unbanned", nickname))
 
@@ -471,8 +473,32 @@ class TGBot:
             self.bot.send_message(m.chat.id, _("blacklist_empty"))
             return
         blacklist = ", ".join(f"<code>{i}</code>" for i in self.vertex.blacklist)
+        if len(blacklist) > 4096:
+            self.export_ban_list(m)
+            return
         self.bot.send_message(m.chat.id, blacklist)
 
+    def export_ban_list(self, m: Message):
+        """
+        Отправляет ЧС файлом (1 строка - 1 никнейм).
+        """
+        if not self.vertex.blacklist:
+            self.bot.send_message(m.chat.id, _("blacklist_empty"))
+            return
+        if not os.path.exists("storage/cache"):
+            os.makedirs("storage/cache")
+        with open("storage/cache/blacklist.txt", "w", encoding="utf-8") as f:
+            f.write("\n".join(self.vertex.blacklist))
+        with open("storage/cache/blacklist.txt", "r", encoding="utf-8") as f:
+            self.bot.send_document(m.chat.id, f, caption=_("blacklist_exported", len(self.vertex.blacklist)))
+
+    def act_import_ban_list(self, m: Message):
+        """
+        Активирует режим ожидания файла с никнеймами для добавления в ЧС.
+        """
+        result = self.bot.send_message(m.chat.id, _("act_import_blacklist"), reply_markup=skb.CLEAR_STATE_BTN())
+        self.set_state(m.chat.id, result.id, m.from_user.id, CBT.IMPORT_BLACKLIST)
+
     def act_edit_watermark(self, m: Message):
         """
         Активирует режим ввода вотемарки сообщений.
@@ -546,6 +572,41 @@ class TGBot:
                                            psutil.Process().memory_info().rss // 1048576,
                                            vertex_tools.time_to_str(uptime), m.chat.id))
 
+    def send_api_stats(self, m: Message):
+        """
+        Отправляет статистику запросов к FunPay.
+        """
+        metrics = self.vertex.account.get_metrics()
+        if not metrics["methods"]:
+            self.bot.send_message(m.chat.id, _("api_stats_empty"))
+            return
+        methods = "\n".join(
+            _("api_stats_method", name, stats["requests"], stats["latency"]["p50"], stats["latency"]["p95"],
+              round((stats["sent"] + stats["received"]) / 1024, 1),
+              ", ".join(f"{status}: {count}" for status, count in stats["statuses"].items()) or "-",
+              stats["retries"], round(stats["retry_time"], 1))
+            for name, stats in metrics["methods"].items())
+        pool, cache = metrics["pool"], metrics["cache"].values()
+        text = _("api_stats", time.strftime("%d.%m.%Y %H:%M:%S", time.localtime(metrics["since"])), methods,
+                 sum(metrics["throttled"].values()), pool["connections"], pool["reused"], pool["exhausted"],
+                 pool["peak_in_flight"], sum(i["hits"] for i in cache), sum(i["misses"] for i in cache),
+                 metrics["coalesced"])
+        if len(text) > 4096:
+            self.export_api_stats(m)
+            return
+        self.bot.send_message(m.chat.id, text)
+
+    def export_api_stats(self, m: Message):
+        """
+        Отправляет метрики запросов к FunPay файлом (JSON).
+        """
+        if not os.path.exists("storage/cache"):
+            os.makedirs("storage/cache")
+        with open("storage/cache/api_stats.json", "w", encoding="utf-8") as f:
+            f.write(json.dumps(self.vertex.account.get_metrics(), indent=4, ensure_ascii=False))
+        with open("storage/cache/api_stats.json", "r", encoding="utf-8") as f:
+            self.bot.send_document(m.chat.id, f, caption=_("api_stats_exported"))
+
     def restart_vertex(self, m: Message):
         """
         Перезапускает вертекс.
@@ -967,6 +1028,8 @@ class TGBot:
         self.msg_handler(self.act_unban, commands=["unban"])
         self.msg_handler(self.unban, func=lambda m: self.check_state(m.chat.id, m.from_user.id, CBT.UNBAN))
         self.msg_handler(self.send_ban_list, commands=["black_list"])
+        self.msg_handler(self.export_ban_list, commands=["export_black_list"])
+        self.msg_handler(self.act_import_ban_list, commands=["import_black_list"])
         self.msg_handler(self.act_edit_watermark, commands=["watermark"])
         self.msg_handler(self.edit_watermark,
                          func=lambda m: self.check_state(m.chat.id, m.from_user.id, CBT.EDIT_WATERMARK))
@@ -974,6 +1037,8 @@ class TGBot:
         self.msg_handler(self.del_logs, commands=["del_logs"])
         self.msg_handler(self.about, commands=["about"])
         self.msg_handler(self.send_system_info, commands=["sys"])
+        self.msg_handler(self.send_api_stats, commands=["api_stats"])
+        self.msg_handler(self.export_api_stats, commands=["export_api_stats"])
         self.msg_handler(self.restart_vertex, commands=["restart"])
         self.msg_handler(self.ask_power_off, commands=["power_off"])
         self.cbq_handler(self.send_review_reply_text, lambda c: c.data.startswith(f"{CBT.SEND_REVIEW_REPLY_TEXT}:"))
@@ -9,6 +9,7 @@ if TYPE_CHECKING:
     from vertex import Vertex
 
 from tg_bot import CBT, static_keyboards
+from Utils import persister
 from telebot import types
 import logging
 import os
@@ -51,6 +52,7 @@ def init_config_loader_cp(vertex: Vertex, *args):
         back_button = types.InlineKeyboardMarkup()\
             .add(types.InlineKeyboardButton(_("gl_back"), callback_data="config_loader"))
 
+        persister.flush()  # Конфиг мог быть изменен, но еще не записан.
         if not os.path.exists(path):
             bot.answer_callback_query(c.id, _("cfg_not_found_err", path), show_alert=True)
             return
@@ -8,16 +8,23 @@ if TYPE_CHECKING:
     from vertex import Vertex
     from tg_bot.bot import TGBot
 
-from Utils import config_loader as cfg_loader, exceptions as excs, vertex_tools
+from Utils import config_loader as cfg_loader, exceptions as excs, products_storage
 from telebot.types import InlineKeyboardButton as Button
 from tg_bot import utils, keyboards, CBT
 from tg_bot.static_keyboards import CLEAR_STATE_BTN
-from telebot import types
+from telebot import types, apihelper
+from locales.localizer import Localizer
+from typing import Iterator
+import requests
 import logging
+import codecs
+import re
 import os
 
 
 logger = logging.getLogger("TGBot")
+localizer = Localizer()
+_ = localizer.translate
 
 
 def check_file(tg: TGBot, msg: types.Message) -> bool:
@@ -73,6 +80,27 @@ def download_file(tg: TGBot, msg: types.Message, file_name: str = "temp_file.txt
     return True
 
 
+def iter_file_chunks(tg: TGBot, msg: types.Message, chunk_size: int = 65536) -> Iterator[bytes]:
+    """
+    Потоково скачивает выгруженный файл по частям (не загружая его в память целиком).
+
+    :param tg: экземпляр TG бота.
+
+    :param msg: экземпляр сообщения.
+
+    :param chunk_size: размер части (в байтах).
+
+    :return: генератор частей файла.
+    """
+    file_info = tg.bot.get_file(msg.document.file_id)
+    url = (apihelper.FILE_URL or "https://api.telegram.org/file/bot{0}/{1}").format(tg.bot.token,
+                                                                                 file_info.file_path)
+    with requests.get(url, stream=True, proxies=apihelper.proxy,
+                      timeout=(apihelper.CONNECT_TIMEOUT, apihelper.READ_TIMEOUT)) as response:
+        response.raise_for_status()
+        yield from response.iter_content(chunk_size)
+
+
 def init_uploader(vertex: Vertex):
     tg = vertex.telegram
     bot = tg.bot
@@ -90,14 +118,18 @@ def init_uploader(vertex: Vertex):
         tg.clear_state(m.chat.id, m.from_user.id, True)
         if not check_file(tg, m):
             return
-        if not download_file(tg, m, m.document.file_name,
-                             custom_path=f"storage/products"):
-            return
 
+        bot.send_message(m.chat.id, "⏬ Загружаю файл...")
         try:
-            products_count = vertex_tools.count_products(f"storage/products/{utils.escape(m.document.file_name)}")
+            products_count, duplicates = products_storage.import_products(
+                f"storage/products/{m.document.file_name}", iter_file_chunks(tg, m), replace=True,
+                deduplicate=vertex.MAIN_CFG["Other"].getboolean("deduplicateProducts"))
+        except UnicodeDecodeError:
+            bot.send_message(m.chat.id, "❌ Файл с товарами должен быть в кодировке UTF-8.")
+            logger.debug("TRACEBACK", exc_info=True)
+            return
         except:
-            bot.send_message(m.chat.id, "❌ Произошла ошибка при подсчете товаров.")
+            bot.send_message(m.chat.id, "❌ Произошла ошибка при загрузке файла.")
             logger.debug("TRACEBACK", exc_info=True)
             return
 
@@ -111,9 +143,41 @@ def init_uploader(vertex: Vertex):
 
         bot.send_message(m.chat.id,
                          f"✅ Файл с товарами <code>storage/products/{m.document.file_name}</code> успешно загружен. "
-                         f"Товаров в файле: <code>{products_count}.</code>",
+                         f"Товаров в файле: <code>{products_count}.</code>" +
+                         (f" Пропущено дубликатов: <code>{duplicates}</code>." if duplicates else ""),
                          reply_markup=keyboard)
 
+    def upload_blacklist(m: types.Message):
+        """
+        Добавляет в ЧС пользователей из файла (никнеймы через пробел, запятую, точку с запятой или с новой строки).
+        """
+        tg.clear_state(m.chat.id, m.from_user.id, True)
+        if not check_file(tg, m):
+            return
+
+        bot.send_message(m.chat.id, "⏬ Загружаю файл...")
+        decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        usernames, tail = [], ""
+        try:
+            for chunk in iter_file_chunks(tg, m):
+                # Последний никнейм части может быть не дочитан - переносим его в следующую часть.
+                *names, tail = re.split(r"[\s,;]+", tail + decoder.decode(chunk))
+                usernames.extend(i for i in names if i)
+            usernames.extend(i for i in re.split(r"[\s,;]+", tail + decoder.decode(b"", final=True)) if i)
+        except UnicodeDecodeError:
+            bot.send_message(m.chat.id, "❌ Файл должен быть в кодировке UTF-8.")
+            logger.debug("TRACEBACK", exc_info=True)
+            return
+        except:
+            bot.send_message(m.chat.id, "❌ Произошла ошибка при загрузке файла.")
+            logger.debug("TRACEBACK", exc_info=True)
+            return
+
+        added = vertex.blacklist.add_users(usernames)
+        logger.info(_("log_blacklist_imported", m.from_user.username, m.from_user.id, len(added)))
+        skipped = len({vertex.blacklist.normalize(i) for i in usernames}) - len(added)
+        bot.send_message(m.chat.id, _("blacklist_imported", len(added), skipped))
+
     def act_upload_main_config(c: types.CallbackQuery):
         result = bot.send_message(c.message.chat.id, "Отправьте мне основной конфиг.",
                                   reply_markup=CLEAR_STATE_BTN())
@@ -321,6 +385,7 @@ def init_uploader(vertex: Vertex):
     tg.file_handler("upload_auto_response_config", upload_auto_response_config)
     tg.file_handler("upload_auto_delivery_config", upload_auto_delivery_config)
     tg.file_handler("upload_main_config", upload_main_config)
+    tg.file_handler(CBT.IMPORT_BLACKLIST, upload_blacklist)
     tg.file_handler(CBT.SEND_FP_MESSAGE, send_funpay_image)
     tg.file_handler(CBT.UPLOAD_IMAGE, upload_image)
 
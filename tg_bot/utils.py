@@ -9,6 +9,7 @@ if TYPE_CHECKING:
 from locales.localizer import Localizer
 from telebot.types import InlineKeyboardMarkup as K, InlineKeyboardButton as B
 import configparser
+import contextlib
 import datetime
 import os.path
 import json
@@ -16,15 +17,15 @@ import time
 import json
 from os.path import exists
 from FunPayAPI.common.utils import RegularExpressions
-from bs4 import BeautifulSoup as bs
 import tg_bot.CBT
-from bs4 import BeautifulSoup
 from FunPayAPI.account import Account
 from FunPayAPI.types import OrderStatuses
 from FunPayAPI.updater.events import *
 localizer = Localizer()
 _ = localizer.translate
 import Utils.vertex_tools
+import Utils.storage
+import Utils.persister
 from tg_bot import CBT
 import re
 
@@ -69,11 +70,7 @@ def load_authorized_users() -> list[int]:
 
     :return: список из id авторизированных пользователей.
     """
-    if not os.path.exists("storage/cache/tg_authorized_users.json"):
-        return []
-    with open("storage/cache/tg_authorized_users.json", "r", encoding="utf-8") as f:
-        data = f.read()
-    return json.loads(data)
+    return Utils.storage.get_storage().load("tg_authorized_users", [])
 
 
 def load_notification_settings() -> dict:
@@ -82,10 +79,7 @@ def load_notification_settings() -> dict:
 
     :return: настройки Telegram уведомлений.
     """
-    if not os.path.exists("storage/cache/notifications.json"):
-        return {}
-    with open("storage/cache/notifications.json", "r", encoding="utf-8") as f:
-        return json.loads(f.read())
+    return Utils.storage.get_storage().load("notifications", {})
 
 
 def load_answer_templates() -> list[str]:
@@ -94,10 +88,7 @@ def load_answer_templates() -> list[str]:
 
     :return: шаблоны ответов из кэша.
     """
-    if not os.path.exists("storage/cache/answer_templates.json"):
-        return []
-    with open("storage/cache/answer_templates.json", "r", encoding="utf-8") as f:
-        return json.loads(f.read())
+    return Utils.storage.get_storage().load("answer_templates", [])
 
 
 def save_authorized_users(users: list[int]) -> None:
@@ -106,10 +97,7 @@ def save_authorized_users(users: list[int]) -> None:
 
     :param users: список id авторизированных пользователей.
     """
-    if not os.path.exists("storage/cache/"):
-        os.makedirs("storage/cache/")
-    with open("storage/cache/tg_authorized_users.json", "w", encoding="utf-8") as f:
-        f.write(json.dumps(users))
+    Utils.storage.get_storage().save("tg_authorized_users", users)
 
 
 def save_notification_settings(settings: dict) -> None:
@@ -118,10 +106,7 @@ def save_notification_settings(settings: dict) -> None:
 
     :param settings: настройки Telegram-уведомлений.
     """
-    if not os.path.exists("storage/cache/"):
-        os.makedirs("storage/cache/")
-    with open("storage/cache/notifications.json", "w", encoding="utf-8") as f:
-        f.write(json.dumps(settings))
+    Utils.storage.get_storage().save("notifications", settings)
 
 
 def save_answer_templates(templates: list[str]) -> None:
@@ -130,10 +115,7 @@ def save_answer_templates(templates: list[str]) -> None:
 
     :param templates: список шаблонов.
     """
-    if not os.path.exists("storage/cache/"):
-        os.makedirs("storage/cache")
-    with open("storage/cache/answer_templates.json", "w", encoding="utf-8") as f:
-        f.write(json.dumps(templates))
+    Utils.storage.get_storage().save("answer_templates", templates)
 
 
 def escape(text: str) -> str:
@@ -236,12 +218,21 @@ def generate_profile_text(vertex: Vertex) -> str:
 <i>Обновлено:</i>  <code>{time.strftime('%H:%M:%S', time.localtime(account.last_update))}</code>"""
 
 ORDER_CONFIRMED = {}
+if exists("storage/cache/advProfileStat.json"):
+    with open("storage/cache/advProfileStat.json", "r", encoding="utf-8") as f:
+        ORDER_CONFIRMED = json.loads(f.read())
 
 def message_hook(vertex: Vertex, event: NewMessageEvent):
     if event.message.type not in [MessageTypes.ORDER_CONFIRMED, MessageTypes.ORDER_CONFIRMED_BY_ADMIN, MessageTypes.ORDER_REOPENED, MessageTypes.REFUND]:
         return
-    if event.message.type not in [MessageTypes.ORDER_REOPENED, MessageTypes.REFUND] and bs(event.message.html, "html.parser").find("a").text == vertex.account.username:
-        return
+    if event.message.type not in [MessageTypes.ORDER_REOPENED, MessageTypes.REFUND]:
+        if event.message.html is not None:
+            first_user = vertex.account.parse_html(event.message.html).find("a").text
+        else:  # HTML не хранится (Account.html_retention == "none")
+            first_user = (event.message.text or "").split(" ")[1:2]
+            first_user = first_user[0] if first_user else None
+        if first_user == vertex.account.username:
+            return
 
     id = RegularExpressions().ORDER_ID.findall(str(event.message))[0][1:]
 
@@ -250,8 +241,8 @@ def message_hook(vertex: Vertex, event: NewMessageEvent):
             del ORDER_CONFIRMED[id]
     else:
         ORDER_CONFIRMED[id] = {"time": time.time(), "price": vertex.account.get_order(id).sum}
-        with open("storage/cache/advProfileStat.json", "w", encoding="UTF-8") as f:
-            f.write(json.dumps(ORDER_CONFIRMED, indent=4, ensure_ascii=False))
+        Utils.persister.write_file("storage/cache/advProfileStat.json",
+                                   json.dumps(ORDER_CONFIRMED, indent=4, ensure_ascii=False))
 
 def extract_float(text):
     cleaned_text = re.sub(r'[^\d.,]', '', text)
@@ -274,7 +265,7 @@ def get_sales(account: Account, start_from: str | None = None, include_paid: boo
     response = account.method("post" if start_from else "get", link, {}, filters, raise_not_200=True)
     html_response = response.content.decode()
 
-    parser = bs(html_response, "html.parser")
+    parser = account.parse_html(html_response)
     check_user = parser.find("div", {"class": "content-account content-account-login"})
 
     next_order_id = parser.find("input", {"type": "hidden", "name": "continue"})
@@ -321,32 +312,22 @@ def get_sales(account: Account, start_from: str | None = None, include_paid: boo
     return next_order_id, sells
 
 def generate_adv_profile(vertex: Vertex) -> str:
+    """
+    Генерирует текст с дополнительной статистикой аккаунта. Перед вызовом необходимо обновить баланс
+    (:attr:`Vertex.balance`). Статистика продаж берется из журнала продаж, который синхронизируется только
+    с новыми / измененными заказами (см. :class:`Utils.sales_ledger.SalesLedger`).
+
+    :return: сгенерированный текст с дополнительной статистикой аккаунта.
+    """
     account = vertex.account
-    balance = vertex.balance
-    if balance.total_eur != 0:
-        currency = "€"
-        balance.balance.total_eur
-    elif balance.total_eur != 0:
-        currency = "$"
-        balance.balance.total_eur
-    elif balance.total_eur != 0:
-        currency = "₽"
-        balance.balance.total_eur
+    if vertex.balance.total_eur:
+        currency, balance, available = "€", vertex.balance.total_eur, vertex.balance.available_eur
+    elif vertex.balance.total_usd:
+        currency, balance, available = "$", vertex.balance.total_usd, vertex.balance.available_usd
     else:
-        balance = 0
-        currency = "₽"
-    if exists("storage/cache/advProfileStat.json"):
-        with open("storage/cache/advProfileStat.json", "r", encoding="utf-8") as f:
-            global ORDER_CONFIRMED
-            ORDER_CONFIRMED = json.loads(f.read())
-    sales = {"day": 0, "week": 0, "month": 0, "all": 0}
-    salesPrice = {"day": 0.0, "week": 0.0, "month": 0.0, "all": 0.0}
-    refunds = {"day": 0, "week": 0, "month": 0, "all": 0}
-    refundsPrice = {"day": 0.0, "week": 0.0, "month": 0.0, "all": 0.0}
-    canWithdraw = {"now": 0.0, "hour": 0.0, "day": 0.0, "2day": 0.0}
-
-    account.get()
+        currency, balance, available = "₽", vertex.balance.total_rub, vertex.balance.available_rub
 
+    canWithdraw = {"now": available, "hour": 0.0, "day": 0.0, "2day": 0.0}
     for order in ORDER_CONFIRMED.copy():
         if time.time() - ORDER_CONFIRMED[order]["time"] > 172800:
             del ORDER_CONFIRMED[order]
@@ -358,71 +339,10 @@ def generate_adv_profile(vertex: Vertex) -> str:
         else:
             canWithdraw["2day"] += ORDER_CONFIRMED[order]["price"]
 
-    randomLotPageLink = bs(account.method("get", "https://funpay.com/lots/693/", {}, {}).text, "html.parser").find("a", {"class": "tc-item"})["href"]
-    randomLotPageParse = bs(account.method("get", randomLotPageLink, {}, {}).text, "html.parser")
-
-    balance = randomLotPageParse.select_one(".badge-balance").text.split(" ")[0]
-    currency = randomLotPageParse.select_one(".badge-balance").text.split(" ")[1]
-
-    canWithdraw["now"] = randomLotPageParse.find("select", {"class": "form-control input-lg selectpicker"})["data-balance-rub"]
-    if currency == "$":
-        canWithdraw["now"] = randomLotPageParse.find("select", {"class": "form-control input-lg selectpicker"})["data-balance-usd"]
-    elif currency == "€":
-        canWithdraw["now"] = randomLotPageParse.find("select", {"class": "form-control input-lg selectpicker"})["data-balance-eur"]
-
-    next_order_id, all_sales = get_sales(account)
-
-    while next_order_id != None:
-        time.sleep(1)
-        next_order_id, new_sales = get_sales(account, start_from=next_order_id)
-        all_sales += new_sales
-
-    for sale in all_sales:
-        if sale.status == OrderStatuses.REFUNDED:
-            refunds["all"] += 1
-            refundsPrice["all"] += sale.price
-        else:
-            sales["all"] += 1
-            salesPrice["all"] += sale.price
-
-        upperDate = bs(sale.html, "html.parser").find("div", {"class": "tc-date-time"}).text
-        date = bs(sale.html, "html.parser").find("div", {"class": "tc-date-left"}).text
-
-        if "сегодня" in upperDate or "сьогодні" in upperDate or "today" in upperDate:
-            if sale.status == OrderStatuses.REFUNDED:
-                refunds["day"] += 1
-                refunds["week"] += 1
-                refunds["month"] += 1
-                refundsPrice["day"] += sale.price
-                refundsPrice["week"] += sale.price
-                refundsPrice["month"] += sale.price
-            else:
-                sales["day"] += 1
-                sales["week"] += 1
-                sales["month"] += 1
-                salesPrice["day"] += sale.price
-                salesPrice["week"] += sale.price
-                salesPrice["month"] += sale.price
-        elif "день" in date or "дня" in date or "дней" in date or "дні" in date or "day" in date or "час" in date or "hour" in date or "годин" in date:
-            if sale.status == OrderStatuses.REFUNDED:
-                refunds["week"] += 1
-                refunds["month"] += 1
-                refundsPrice["week"] += sale.price
-                refundsPrice["month"] += sale.price
-            else:
-                sales["week"] += 1
-                sales["month"] += 1
-                salesPrice["week"] += sale.price
-                salesPrice["month"] += sale.price
-        elif "недел" in date or "тижд" in date or "week" in date:
-            if sale.status == OrderStatuses.REFUNDED:
-                refunds["month"] += 1
-                refundsPrice["month"] += sale.price
-            else:
-                sales["month"] += 1
-                salesPrice["month"] += sale.price
-
-
+    vertex.sales_ledger.sync(account)
+    stats = vertex.sales_ledger.get_stats()
+    sales, salesPrice = stats["sales"], stats["salesPrice"]
+    refunds, refundsPrice = stats["refunds"], stats["refundsPrice"]
 
     return f"""Статистика аккаунта <b><i>{account.username}</i></b>
 
@@ -431,7 +351,7 @@ def generate_adv_profile(vertex: Vertex) -> str:
 <b>Незавершенных заказов:</b> <code>{account.active_sales}</code>
 
 <b>Доступно для вывода</b>
-<b>Сейчас:</b> <code>{canWithdraw["now"].split('.')[0]} {currency}</code>
+<b>Сейчас:</b> <code>{int(canWithdraw["now"])} {currency}</code>
 <b>Через час:</b> <code>+{"{:.1f}".format(canWithdraw["hour"])} {currency}</code>
 <b>Через день:</b> <code>+{"{:.1f}".format(canWithdraw["day"])} {currency}</code>
 <b>Через 2 дня:</b> <code>+{"{:.1f}".format(canWithdraw["2day"])} {currency}</code>
@@ -450,30 +370,23 @@ def generate_adv_profile(vertex: Vertex) -> str:
 
 <i>Обновлено:</i>  <code>{time.strftime('%H:%M:%S', time.localtime(account.last_update))}</code>"""
 
+def get_old_orders(orders: list[types.OrderShortcut]) -> list[str]:
+    """
+    Отбирает из списка заказов заказы, оплаченные более суток назад (по времени с оплаты, которое показывает FunPay).
+    :param orders: список заказов.
+    :return: список ID старых заказов (с '#').
+    """
+    return [f"#{i.id}" for i in orders
+            if i.date_left is not None and not any(map(i.date_left.__contains__, ["сек", "мин", "час", "тол"]))]
+
 def get_orders(acc: Account, start_from: str) -> tuple[str | None, list[str]]:
     """
     Получает список ордеров на аккаунте.
     :return: Список с заказами.
     """
-    attempts = 3
-    while attempts:
-        try:
-            result = acc.get_sells(start_from=start_from or None, state="paid")
-            break
-        except:
-            attempts -= 1
-            time.sleep(1)
-    else:
-        raise Exception
-    orders = result[1]
-    old_orders = []
-    for i in orders:
-        parser = BeautifulSoup(i.html, "html.parser")
-        time_text = parser.find("div", {"class": "tc-date-left"}).text
-        if any(map(time_text.__contains__, ["сек", "мин", "час", "тол"])):
-            continue
-        old_orders.append(parser.find("div", {"class": "tc-order"}).text)
-    return result[0], old_orders
+    with contextlib.closing(acc.crawl_sells(start_from=start_from or None, prefetch=False, state="paid")) as pages:
+        next_order_id, orders = next(pages)
+    return next_order_id, get_old_orders(orders)
 
 def get_all_old_orders(acc: Account) -> list[str]:
     """
@@ -481,13 +394,9 @@ def get_all_old_orders(acc: Account) -> list[str]:
     :param acc: экземпляр аккаунта.
     :return: список старых заказов.
     """
-    start_from = ""
     old_orders = []
-    while start_from is not None:
-        result = get_orders(acc, start_from)
-        start_from = result[0]
-        old_orders.extend(result[1])
-        time.sleep(1)
+    for next_order_id, orders in acc.crawl_sells(page_delay=1, state="paid"):
+        old_orders.extend(get_old_orders(orders))
     return old_orders
 
 def generate_lot_info_text(lot_obj: configparser.SectionProxy) -> str:
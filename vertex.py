@@ -8,6 +8,7 @@ from types import ModuleType
 import Utils.exceptions
 from uuid import UUID
 import importlib.util
+import io
 import configparser
 import itertools
 import requests
@@ -22,7 +23,7 @@ import FunPayAPI
 import handlers
 from locales.localizer import Localizer
 
-from Utils import vertex_tools
+from Utils import vertex_tools, storage, persister, sales_ledger
 import tg_bot.bot
 
 from threading import Thread
@@ -109,7 +110,8 @@ class Vertex(object):
 
         # Конфиги
         self.MAIN_CFG = main_config
-        self.AD_CFG = auto_delivery_config
+        self.__ad_cfg = auto_delivery_config
+        self.__ad_matcher = vertex_tools.LotsMatcher(self.__ad_cfg.sections())
         self.AR_CFG = auto_response_config
         self.RAW_AR_CFG = raw_auto_response_config
 
@@ -130,7 +132,10 @@ class Vertex(object):
 
         self.account = FunPayAPI.Account(self.MAIN_CFG["FunPay"]["golden_key"],
                                          self.MAIN_CFG["FunPay"]["user_agent"],
-                                         proxy=self.proxy)
+                                         proxy=self.proxy,
+                                         html_parser=self.MAIN_CFG["Other"]["htmlParser"],
+                                         html_retention=self.MAIN_CFG["Other"]["htmlRetention"],
+                                         pool_size=self.MAIN_CFG["Other"].getint("connectionPoolSize"))
         self.runner: FunPayAPI.Runner | None = None
         self.telegram: tg_bot.bot.TGBot | None = None
 
@@ -148,15 +153,18 @@ class Vertex(object):
         self.curr_profile_last_tag: str | None = None
         # Тег последнего event'а, после которого обновлялось состояние лотов.
         self.last_state_change_tag: str | None = None
+        storage.init_storage(self.MAIN_CFG["Other"]["storageBackend"])  # Хранилище storage/cache.
         self.blacklist = vertex_tools.load_blacklist()  # ЧС.
-        self.old_users = vertex_tools.load_old_users()  # Уже написавшие пользователи.
+        # Уже написавшие пользователи (множество, раньше - список: добавлять через add, а не append).
+        self.old_users: set[int] = vertex_tools.load_old_users()
+        self.sales_ledger = sales_ledger.SalesLedger()  # Журнал продаж (для доп. статистики в TG ПУ).
 
         # Хэндлеры
         self.pre_init_handlers = []
         self.post_init_handlers = []
         self.pre_start_handlers = []
         self.post_start_handlers = []
-        self.pre_stop_handlers = []
+        self.pre_stop_handlers = [persister.flush]  # Запись отложенных файлов.
         self.post_stop_handlers = []
 
         self.init_message_handlers = []
@@ -202,6 +210,11 @@ class Vertex(object):
         """
         Инициализирует класс аккаунта (self.account)
         """
+        try:  # Соединения для первых запросов Runner'а, поднятия лотов и Telegram-ПУ.
+            self.account.warm_up(3)
+        except Exception as e:
+            logger.warning(_("crd_warm_up_err", e))
+            logger.debug("TRACEBACK", exc_info=True)
         while True:
             try:
                 self.account.get()
@@ -543,7 +556,8 @@ class Vertex(object):
             Thread(target=self.telegram.run, daemon=True).start()
 
         self.__init_account()
-        self.runner = FunPayAPI.Runner(self.account, self.old_mode_enabled)
+        self.runner = FunPayAPI.Runner(self.account, self.old_mode_enabled,
+                                       chat_requests_concurrency=int(self.MAIN_CFG["Other"]["chatRequestsConcurrency"]))
         self.__update_profile()
         self.run_handlers(self.post_init_handlers, (self, ))
         return self
@@ -575,7 +589,7 @@ class Vertex(object):
         Останавливает вертекс. Не используется.
         """
         self.run_id += 1
-        self.run_handlers(self.pre_start_handlers, (self, ))
+        self.run_handlers(self.pre_stop_handlers, (self, ))
         self.run_handlers(self.post_stop_handlers, (self, ))
 
     def update_lots_and_categories(self):
@@ -585,6 +599,29 @@ class Vertex(object):
         result = self.__update_profile(infinite_polling=False, attempts=3, update_main_profile=False)
         return result
 
+    @property
+    def AD_CFG(self) -> ConfigParser:
+        """Конфиг автовыдачи. При замене конфига поисковик его секций пересобирается."""
+        return self.__ad_cfg
+
+    @AD_CFG.setter
+    def AD_CFG(self, config: ConfigParser):
+        self.__ad_cfg = config
+        self.update_ad_matcher()
+
+    def get_ad_matcher(self) -> vertex_tools.LotsMatcher:
+        """
+        Возвращает поисковик секций конфига автовыдачи.
+        """
+        return self.__ad_matcher
+
+    def update_ad_matcher(self) -> None:
+        """
+        Пересобирает поисковик секций конфига автовыдачи. Вызывается при замене и сохранении конфига автовыдачи
+        (:meth:`save_config`); если секции конфига изменяются без сохранения, метод нужно вызвать вручную.
+        """
+        self.__ad_matcher = vertex_tools.LotsMatcher(self.AD_CFG.sections())
+
     def switch_msg_get_mode(self):
         self.MAIN_CFG["FunPay"]["oldMsgGetMode"] = str(int(not self.old_mode_enabled))
         self.save_config(self.MAIN_CFG, "configs/_main.cfg")
@@ -596,13 +633,17 @@ class Vertex(object):
     @staticmethod
     def save_config(config: configparser.ConfigParser, file_path: str) -> None:
         """
-        Сохраняет конфиг в указанный файл.
+        Сохраняет конфиг в указанный файл. Запись выполняется отложенно и атомарно (см. :mod:`Utils.persister`).
 
         :param config: объект конфига.
         :param file_path: путь до файла, в который нужно сохранить конфиг.
         """
-        with open(file_path, "w", encoding="utf-8") as f:
-            config.write(f)
+        text = io.StringIO()
+        config.write(text)
+        persister.write_file(file_path, text.getvalue())
+        vertex = getattr(Vertex, "instance", None)
+        if vertex is not None and config is getattr(vertex, "AD_CFG", None):
+            vertex.update_ad_matcher()
 
     # Загрузка плагинов
     @staticmethod